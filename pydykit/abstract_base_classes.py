@@ -1,10 +1,12 @@
 import abc
-from typing import Callable, Iterator
+from typing import TYPE_CHECKING, Callable, Iterator
 
 import numpy as np
 import numpy.typing as npt
 
-from . import results
+if TYPE_CHECKING:
+    # Avoid circular import, as results depend on utils, which depend on this module
+    from . import results
 
 
 class Integrator(abc.ABC):
@@ -25,7 +27,7 @@ class Integrator(abc.ABC):
 class Simulator(abc.ABC):
 
     @abc.abstractmethod
-    def run(self) -> results.Result:
+    def run(self) -> "results.Result":
         pass
 
 
@@ -71,6 +73,18 @@ class AbstractMultiBodySystem(System):
     def kinetic_energy_gradient_from_momentum(self):
         pass
 
+    @abc.abstractmethod
+    def kinetic_energy_hessian_from_momentum(self):
+        pass
+
+    @abc.abstractmethod
+    def kinetic_energy_mixed_hessian_from_momentum(self):
+        pass
+
+    @abc.abstractmethod
+    def inverse_mass_matrix_derivative(self, vector):
+        pass
+
     @abc.abstractmethod
     def kinetic_energy_gradient_from_velocity(self):
         pass
@@ -83,6 +97,10 @@ class AbstractMultiBodySystem(System):
     def external_potential_gradient(self):
         pass
 
+    @abc.abstractmethod
+    def external_potential_hessian(self):
+        pass
+
     @abc.abstractmethod
     def internal_potential(self):
         pass
@@ -91,6 +109,10 @@ class AbstractMultiBodySystem(System):
     def internal_potential_gradient(self):
         pass
 
+    @abc.abstractmethod
+    def internal_potential_hessian(self):
+        pass
+
     @abc.abstractmethod
     def potential_energy(self):
         pass
@@ -99,6 +121,10 @@ class AbstractMultiBodySystem(System):
     def potential_energy_gradient(self):
         pass
 
+    @abc.abstractmethod
+    def potential_energy_hessian(self):
+        pass
+
     @abc.abstractmethod
     def total_energy(self):
         pass
@@ -111,6 +137,10 @@ class AbstractMultiBodySystem(System):
     def constraint_gradient(self):
         pass
 
+    @abc.abstractmethod
+    def constraint_hessian(self, multiplier):
+        pass
+
     @abc.abstractmethod
     def constraint_velocity(self):
         pass
@@ -119,6 +149,10 @@ class AbstractMultiBodySystem(System):
     def dissipation_matrix(self):
         pass
 
+    @abc.abstractmethod
+    def dissipation_matrix_derivative(self, vector):
+        pass
+
     @abc.abstractmethod
     def rayleigh_dissipation(self):
         pass
@@ -195,7 +229,8 @@ class AbstractQuasiLinearDAESystem(System):
 
 
 class TimeStep(abc.ABC):
-    pass
+    # Allows subclasses to be free of instance dictionaries
+    __slots__ = ()
 
 
 class TimeStepper(abc.ABC):
@@ -215,7 +250,7 @@ class Manager(abc.ABC):
     simulator: Simulator = NotImplemented
     integrator: Integrator = NotImplemented
     system: System = NotImplemented
-    result: results.Result = NotImplemented
+    result: "results.Result" = NotImplemented
 
 
 class DiscreteGradient(abc.ABC):
@@ -235,3 +270,32 @@ class DiscreteGradient(abc.ABC):
     ) -> np.ndarray:
         """Compute the discrete gradient."""
         pass
+
+
+class MassOperator(abc.ABC):
+    """Abstract base class for symmetric positive definite mass matrices stored in structured form."""
+
+    # Let numpy defer binary operations to the operator
+    __array_ufunc__ = None
+
+    @property
+    @abc.abstractmethod
+    def shape(self) -> tuple[int, int]:
+        pass
+
+    @abc.abstractmethod
+    def solve(self, rhs: npt.ArrayLike) -> np.ndarray:
+        """Solve mass_matrix @ x = rhs."""
+        pass
+
+    @abc.abstractmethod
+    def inverse(self) -> "MassOperator":
+        pass
+
+    @abc.abstractmethod
+    def to_sparse(self):
+        pass
+
+    @abc.abstractmethod
+    def toarray(self) -> np.ndarray:
+        pass
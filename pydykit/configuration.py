@@ -1,4 +1,4 @@
-from typing import Union
+from typing import Optional, Union
 
 from pydantic import BaseModel
 
@@ -8,28 +8,43 @@ from .models_integrators import (
     MidpointDAE,
     MidpointMultibody,
     MidpointPH,
+    Rattle,
+    StoermerVerlet,
 )
-from .models_simulators import OneStep
+from .models_results import Result, StreamingResult
+from .models_simulators import Ensemble, OneStep
 from .models_system_dae import ChemicalReactor, Lorenz
-from .models_system_multibody import ParticleSystem, RigidBodyRotatingQuaternions
+from .models_system_multibody import (
+    MultiRigidBodyQuaternions,
+    ParticleSystem,
+    RigidBodyRotatingQuaternions,
+)
 from .models_system_port_hamiltonian import Pendulum2D
-from .models_time_steppers import FixedIncrement, FixedIncrementHittingEnd
+from .models_time_steppers import (
+    AdaptiveIncrement,
+    FixedIncrement,
+    FixedIncrementHittingEnd,
+)
 
 
 class Configuration(BaseModel):
     system: Union[
         ParticleSystem,
         RigidBodyRotatingQuaternions,
+        MultiRigidBodyQuaternions,
         Pendulum2D,
         Lorenz,
         ChemicalReactor,
     ]
-    simulator: OneStep
+    simulator: Union[OneStep, Ensemble]
     integrator: Union[
         MidpointPH,
         DiscreteGradientPHDAE,
         MidpointMultibody,
         DiscreteGradientMultibody,
         MidpointDAE,
+        StoermerVerlet,
+        Rattle,
     ]
-    time_stepper: Union[FixedIncrement, FixedIncrementHittingEnd]
+    time_stepper: Union[FixedIncrement, FixedIncrementHittingEnd, AdaptiveIncrement]
+    result: Optional[Union[Result, StreamingResult]] = None
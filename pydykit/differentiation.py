@@ -0,0 +1,385 @@
+"""
+Differentiation engines approximating or computing the tangent of residual functions.
+
+Central differences need 2n evaluations and are limited by cancellation.
+The complex step needs n evaluations and is accurate to machine precision.
+Forward-mode dual numbers propagate all n directional derivatives at once and need a single evaluation.
+Both latter engines require the evaluated functions to be complex-safe,
+i.e., to be composed of analytic operations without writing into preallocated real arrays.
+Systems and integrators declare this by the attribute `complex_safe`.
+"""
+
+import numpy as np
+import numpy.lib.mixins
+
+from . import utils
+
+
+def get_tangent(
+    func,
+    state,
+    engine="central_differences",
+    is_vectorized=False,
+    executor=None,
+    sparsity_pattern=None,
+    colors=None,
+):
+    if engine == "central_differences" and sparsity_pattern is not None:
+        return utils.get_colored_numerical_tangent(
+            func=func,
+            state=state,
+            sparsity_pattern=sparsity_pattern,
+            colors=colors,
+        )
+    elif engine == "central_differences":
+        return utils.get_numerical_tangent(
+            func=func,
+            state=state,
+            is_vectorized=is_vectorized,
+            executor=executor,
+        )
+    elif engine == "complex_step":
+        return get_complex_step_tangent(
+            func=func,
+            state=state,
+            is_vectorized=is_vectorized,
+        )
+    elif engine == "dual_numbers":
+        return get_dual_tangent(func=func, state=state)
+    else:
+        raise utils.PydykitException(f"Unknown differentiation engine {engine}")
+
+
+def get_complex_step_tangent(func, state, step_size=1e-20, is_vectorized=False):
+    state_dimension = state.shape[-1]
+
+    if is_vectorized:
+        # Stack all n perturbed states along a new leading axis
+        offsets = np.moveaxis(
+            np.broadcast_to(
+                1j * step_size * np.eye(state_dimension),
+                state.shape[:-1] + (state_dimension, state_dimension),
+            ),
+            -2,
+            0,
+        )
+        function_values = func(next_state=state + offsets)
+        return np.moveaxis(np.imag(function_values), 0, -1) / step_size
+
+    complex_state = state.astype(np.complex128)
+    columns = []
+    for index in range(state_dimension):
+        complex_state[..., index] += 1j * step_size
+        columns.append(np.imag(func(next_state=complex_state)) / step_size)
+        complex_state[..., index] = state[..., index]
+
+    return np.stack(columns, axis=-1)
+
+
+def get_dual_tangent(func, state):
+    function_value = func(next_state=Dual.seed(state))
+
+    if isinstance(function_value, Dual):
+        return function_value.derivative
+
+    # Function does not depend on state
+    function_value = np.asarray(function_value)
+    return np.zeros(function_value.shape + (state.shape[-1],))
+
+
+class Dual(numpy.lib.mixins.NDArrayOperatorsMixin):
+    """
+    Forward-mode dual number array.
+
+    Holds a value of arbitrary shape and its derivatives with respect to
+    nbr_directions seed directions, stored along an additional trailing axis.
+    """
+
+    def __init__(self, value, derivative):
+        self.value = np.asarray(value)
+        self.derivative = np.asarray(derivative)
+
+    @classmethod
+    def seed(cls, state):
+        """Derivative of state with respect to itself, i.e., identity along the last axis"""
+        state_dimension = state.shape[-1]
+        return cls(
+            value=state,
+            derivative=np.broadcast_to(
+                np.eye(state_dimension), state.shape + (state_dimension,)
+            ),
+        )
+
+    @property
+    def nbr_directions(self):
+        return self.derivative.shape[-1]
+
+    @property
+    def shape(self):
+        return self.value.shape
+
+    @property
+    def ndim(self):
+        return self.value.ndim
+
+    @property
+    def T(self):
+        return Dual(self.value.T, np.moveaxis(self.derivative.T, 0, -1))
+
+    def __len__(self):
+        return len(self.value)
+
+    def __repr__(self):
+        return f"Dual(value={self.value!r}, derivative={self.derivative!r})"
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        return Dual(self.value[key], self.derivative[key + (slice(None),)])
+
+    def reshape(self, *shape):
+        value = self.value.reshape(*shape)
+        return Dual(
+            value, self.derivative.reshape(value.shape + (self.nbr_directions,))
+        )
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if (method != "__call__") or kwargs:
+            return NotImplemented
+
+        if ufunc in DERIVATIVES_UNARY:
+            (x,) = inputs
+            return Dual(
+                ufunc(x.value),
+                DERIVATIVES_UNARY[ufunc](x.value)[..., np.newaxis] * x.derivative,
+            )
+
+        if ufunc in DERIVATIVES_BINARY:
+            return DERIVATIVES_BINARY[ufunc](*inputs)
+
+        return NotImplemented
+
+    def __array_function__(self, func, types, args, kwargs):
+        if func not in ARRAY_FUNCTIONS:
+            return NotImplemented
+        return ARRAY_FUNCTIONS[func](*args, **kwargs)
+
+
+def value_of(x):
+    return x.value if isinstance(x, Dual) else np.asarray(x)
+
+
+def derivative_of(x, nbr_directions):
+    if isinstance(x, Dual):
+        return x.derivative
+    return np.zeros(np.shape(x) + (nbr_directions,))
+
+
+def get_nbr_directions(*items):
+    return next(item.nbr_directions for item in items if isinstance(item, Dual))
+
+
+def expand(x):
+    return value_of(x)[..., np.newaxis]
+
+
+def add(a, b):
+    n = get_nbr_directions(a, b)
+    return Dual(value_of(a) + value_of(b), derivative_of(a, n) + derivative_of(b, n))
+
+
+def subtract(a, b):
+    n = get_nbr_directions(a, b)
+    return Dual(value_of(a) - value_of(b), derivative_of(a, n) - derivative_of(b, n))
+
+
+def multiply(a, b):
+    n = get_nbr_directions(a, b)
+    return Dual(
+        value_of(a) * value_of(b),
+        derivative_of(a, n) * expand(b) + expand(a) * derivative_of(b, n),
+    )
+
+
+def true_divide(a, b):
+    n = get_nbr_directions(a, b)
+    value = value_of(a) / value_of(b)
+    return Dual(
+        value,
+        (derivative_of(a, n) - value[..., np.newaxis] * derivative_of(b, n))
+        / expand(b),
+    )
+
+
+def power(a, b):
+    if isinstance(b, Dual):
+        raise utils.PydykitException("Dual numbers do not support dual exponents")
+    b = np.asarray(b)
+    return Dual(
+        value_of(a) ** b,
+        (b * value_of(a) ** (b - 1))[..., np.newaxis] * a.derivative,
+    )
+
+
+def matmul(a, b):
+    a_value, b_value = value_of(a), value_of(b)
+
+    if (a_value.ndim < 2) or (b_value.ndim < 2):
+        raise utils.PydykitException(
+            "Dual numbers support matmul of stacked matrices only, see utils.matvec"
+        )
+
+    # Move directions to the front to obtain stacks of matrices
+    terms = []
+    if isinstance(a, Dual):
+        terms.append(np.moveaxis(a.derivative, -1, 0) @ b_value)
+    if isinstance(b, Dual):
+        terms.append(a_value @ np.moveaxis(b.derivative, -1, 0))
+
+    return Dual(a_value @ b_value, np.moveaxis(sum(terms), 0, -1))
+
+
+DERIVATIVES_UNARY = {
+    np.negative: lambda x: -np.ones_like(x),
+    np.positive: lambda x: np.ones_like(x),
+    np.sin: np.cos,
+    np.cos: lambda x: -np.sin(x),
+    np.tan: lambda x: 1.0 / np.cos(x) ** 2,
+    np.exp: np.exp,
+    np.log: lambda x: 1.0 / x,
+    np.sqrt: lambda x: 0.5 / np.sqrt(x),
+    np.square: lambda x: 2.0 * x,
+    np.tanh: lambda x: 1.0 - np.tanh(x) ** 2,
+}
+
+DERIVATIVES_BINARY = {
+    np.add: add,
+    np.subtract: subtract,
+    np.multiply: multiply,
+    np.true_divide: true_divide,
+    np.power: power,
+    np.matmul: matmul,
+}
+
+
+def as_duals(items, nbr_directions):
+    return [
+        (
+            item
+            if isinstance(item, Dual)
+            else Dual(item, derivative_of(item, nbr_directions))
+        )
+        for item in items
+    ]
+
+
+def derivative_axis(axis):
+    # Derivatives carry an additional trailing axis
+    return axis - 1 if axis < 0 else axis
+
+
+def stack(arrays, axis=0):
+    duals = as_duals(arrays, get_nbr_directions(*arrays))
+    return Dual(
+        np.stack([item.value for item in duals], axis=axis),
+        np.stack([item.derivative for item in duals], axis=derivative_axis(axis)),
+    )
+
+
+def concatenate(arrays, axis=0):
+    duals = as_duals(arrays, get_nbr_directions(*arrays))
+    return Dual(
+        np.concatenate([item.value for item in duals], axis=axis),
+        np.concatenate([item.derivative for item in duals], axis=derivative_axis(axis)),
+    )
+
+
+def broadcast_arrays(*args):
+    shape = np.broadcast_shapes(*[np.shape(value_of(item)) for item in args])
+    return [
+        (
+            Dual(
+                np.broadcast_to(item.value, shape),
+                np.broadcast_to(item.derivative, shape + (item.nbr_directions,)),
+            )
+            if isinstance(item, Dual)
+            else np.broadcast_to(item, shape)
+        )
+        for item in args
+    ]
+
+
+def moveaxis(a, source, destination):
+    return Dual(
+        np.moveaxis(a.value, source, destination),
+        np.moveaxis(
+            a.derivative, derivative_axis(source), derivative_axis(destination)
+        ),
+    )
+
+
+def swapaxes(a, axis1, axis2):
+    return Dual(
+        np.swapaxes(a.value, axis1, axis2),
+        np.swapaxes(a.derivative, derivative_axis(axis1), derivative_axis(axis2)),
+    )
+
+
+def expand_dims(a, axis):
+    return Dual(
+        np.expand_dims(a.value, axis),
+        np.expand_dims(a.derivative, derivative_axis(axis)),
+    )
+
+
+def reshape(a, shape):
+    return a.reshape(shape)
+
+
+def sum_(a, axis=None):
+    if axis is None:
+        axis = tuple(range(a.ndim))
+    axes = np.atleast_1d(axis)
+    return Dual(
+        np.sum(a.value, axis=axis),
+        np.sum(a.derivative, axis=tuple(derivative_axis(int(item)) for item in axes)),
+    )
+
+
+def solve(a, b):
+    # x = A^-1 b and dx = A^-1 (db - dA x)
+    n = get_nbr_directions(a, b)
+    a_value, b_value = value_of(a), value_of(b)
+
+    if b_value.ndim < 2:
+        raise utils.PydykitException(
+            "Dual numbers support solve with stacked right-hand sides only, see utils.solve"
+        )
+
+    x = np.linalg.solve(a_value, b_value)
+
+    rhs = derivative_of(b, n)
+    if isinstance(a, Dual):
+        rhs = rhs - np.moveaxis(
+            np.moveaxis(a.derivative, -1, 0) @ x,
+            0,
+            -1,
+        )
+
+    # Solve for all directions at once by flattening them into the columns of the right-hand side
+    derivative = np.linalg.solve(a_value, rhs.reshape(rhs.shape[:-2] + (-1,)))
+    derivative = derivative.reshape(derivative.shape[:-1] + rhs.shape[-2:])
+    return Dual(x, derivative)
+
+
+ARRAY_FUNCTIONS = {
+    np.stack: stack,
+    np.concatenate: concatenate,
+    np.broadcast_arrays: broadcast_arrays,
+    np.moveaxis: moveaxis,
+    np.swapaxes: swapaxes,
+    np.expand_dims: expand_dims,
+    np.reshape: reshape,
+    np.sum: sum_,
+    np.linalg.solve: solve,
+}
@@ -1,9 +1,12 @@
 import numpy as np
 
-from . import abstract_base_classes
+from . import abstract_base_classes, utils
 
 
 class GonzalezDiscreteGradient(abstract_base_classes.DiscreteGradient):
+    def __init__(self):
+        self.kernel = Gonzalez_discrete_gradient
+
     def compute(
         self,
         system_n,
@@ -18,12 +21,12 @@ class GonzalezDiscreteGradient(abstract_base_classes.DiscreteGradient):
     ) -> np.ndarray:
         func_n = getattr(system_n, func_name)()
         func_n1 = getattr(system_n1, func_name)()
-        midpoint_jacobian = getattr(system_n05, jacobian_name)()
+        midpoint_jacobian = utils.to_dense(getattr(system_n05, jacobian_name)())
         midpoint_jacobian, func_n, func_n1 = adjust_midpoint_jacobian(
             midpoint_jacobian, func_n, func_n1
         )
 
-        return Gonzalez_discrete_gradient(
+        return self.kernel(
             func_n,
             func_n1,
             midpoint_jacobian,
@@ -34,6 +37,9 @@ class GonzalezDiscreteGradient(abstract_base_classes.DiscreteGradient):
 
 
 class GonzalezDecomposedDiscreteGradient(abstract_base_classes.DiscreteGradient):
+    def __init__(self):
+        self.kernel = Gonzalez_discrete_gradient
+
     def compute(
         self,
         system_n,
@@ -54,7 +60,9 @@ class GonzalezDecomposedDiscreteGradient(abstract_base_classes.DiscreteGradient)
         for index in range(nbr_func_parts):
             func_n = getattr(system_n, f"{func_name}_{index+1}")()
             func_n1 = getattr(system_n1, f"{func_name}_{index+1}")()
-            midpoint_jacobian = getattr(system_n05, f"{jacobian_name}_{index+1}")()
+            midpoint_jacobian = utils.to_dense(
+                getattr(system_n05, f"{jacobian_name}_{index+1}")()
+            )
             midpoint_jacobian, func_n, func_n1 = adjust_midpoint_jacobian(
                 midpoint_jacobian, func_n, func_n1
             )
@@ -62,7 +70,7 @@ class GonzalezDecomposedDiscreteGradient(abstract_base_classes.DiscreteGradient)
             part_argument_n = system_n.decompose_state()[func_parts_n[index]]
             part_argument_n1 = system_n1.decompose_state()[func_parts_n1[index]]
 
-            contribution = Gonzalez_discrete_gradient(
+            contribution = self.kernel(
                 func_n,
                 func_n1,
                 midpoint_jacobian,
@@ -76,6 +84,77 @@ class GonzalezDecomposedDiscreteGradient(abstract_base_classes.DiscreteGradient)
         return np.concatenate(discrete_gradient, axis=0)
 
 
+class GonzalezElementwiseDiscreteGradient(abstract_base_classes.DiscreteGradient):
+    """
+    Gonzalez discrete gradient applied separately to each element of a system composed of two-node elements.
+
+    Increments and denominators are local to the relative vector of each element, such that
+    the discrete gradient of one element is not affected by the motion of other elements.
+    Functions which the system does not decompose are treated by the global Gonzalez discrete gradient.
+    """
+
+    def __init__(self):
+        # Elements are processed as stacked arguments
+        self.kernel = Gonzalez_discrete_gradient_batched
+
+    def compute(
+        self,
+        system_n,
+        system_n1,
+        system_n05,
+        func_name: str,
+        jacobian_name: str,
+        argument_n: np.ndarray,
+        argument_n1: np.ndarray,
+        increment_tolerance: float = 1e-12,
+        **kwargs,
+    ) -> np.ndarray:
+        if not hasattr(system_n, "get_element_decomposition"):
+            raise utils.PydykitException(
+                f"{type(system_n).__name__} does not provide an element decomposition, "
+                + "which is required by the Gonzalez_elementwise discrete gradient."
+            )
+
+        decomposition = system_n.get_element_decomposition(func_name)
+
+        if decomposition is None:
+            return GonzalezDiscreteGradient().compute(
+                system_n=system_n,
+                system_n1=system_n1,
+                system_n05=system_n05,
+                func_name=func_name,
+                jacobian_name=jacobian_name,
+                argument_n=argument_n,
+                argument_n1=argument_n1,
+                increment_tolerance=increment_tolerance,
+            )
+
+        start, end = decomposition["start"], decomposition["end"]
+        vectors_n, vectors_n1 = (
+            system_n.get_relative_vectors(q=argument, start=start, end=end)
+            for argument in [argument_n, argument_n1]
+        )
+        vectors_n05 = 0.5 * (vectors_n + vectors_n1)
+
+        element_discrete_gradients = self.kernel(
+            decomposition["values"](vectors_n)[:, np.newaxis],
+            decomposition["values"](vectors_n1)[:, np.newaxis],
+            decomposition["gradients"](vectors_n05)[:, np.newaxis, :],
+            vectors_n,
+            vectors_n1,
+            increment_tolerance,
+        )[:, 0, :]
+
+        if decomposition["is_vector_valued"]:
+            return system_n.assemble_element_rows(
+                element_vectors=element_discrete_gradients, start=start, end=end
+            )
+
+        return system_n.assemble_element_vectors(
+            element_vectors=element_discrete_gradients, start=start, end=end
+        )
+
+
 class DiscreteGradientFactory:
     """Factory for creating discrete gradient instances."""
 
@@ -85,6 +164,8 @@ class DiscreteGradientFactory:
             return GonzalezDiscreteGradient()
         elif type == "Gonzalez_decomposed":
             return GonzalezDecomposedDiscreteGradient()
+        elif type == "Gonzalez_elementwise":
+            return GonzalezElementwiseDiscreteGradient()
         else:
             raise ValueError(f"Unsupported discrete gradient type: {type}")
 
@@ -123,31 +204,55 @@ def Gonzalez_discrete_gradient(
     argument_n,
     argument_n1,
     denominator_tolerance,
+    out=None,
 ):
     """Compute the discrete gradient using the Gonzalez approach."""
-    discrete_gradient = midpoint_jacobian
-    increment = argument_n1 - argument_n
-    denominator = increment.T @ increment
+    return Gonzalez_discrete_gradient_batched(
+        func_n,
+        func_n1,
+        midpoint_jacobian,
+        argument_n,
+        argument_n1,
+        denominator_tolerance,
+        out=out,
+    ).squeeze()
 
-    if denominator > denominator_tolerance:
 
-        for index in range(midpoint_jacobian.shape[0]):
-            discrete_gradient[index, :] += (
-                (
-                    func_n1[index]
-                    - func_n[index]
-                    - np.dot(midpoint_jacobian[index, :], increment)
-                )
-                / denominator
-                * increment.T
-            )
+def Gonzalez_discrete_gradient_batched(
+    func_n,
+    func_n1,
+    midpoint_jacobian,
+    argument_n,
+    argument_n1,
+    denominator_tolerance,
+    out=None,
+):
+    """
+    Compute the Gonzalez discrete gradient for stacked arguments.
 
-        result = discrete_gradient
+    Shapes are (..., nbr_functions) for the function values, (..., nbr_functions, dim) for
+    the midpoint Jacobian and (..., dim) for the arguments.
+    The rank-one correction is applied to all rows at once and written to out,
+    which must not overlap the midpoint Jacobian. The midpoint Jacobian is not modified.
+    Apart from out, only arrays of the size of the arguments and function values are allocated.
+    """
+    increment = np.subtract(argument_n1, argument_n)
+    denominator = np.einsum("...i,...i->...", increment, increment)[..., np.newaxis]
+    correction = func_n1 - func_n - utils.matvec(midpoint_jacobian, increment)
 
-    else:
-        result = midpoint_jacobian
+    # Fall back to the midpoint Jacobian for small increments
+    is_corrected = denominator > denominator_tolerance
+    np.divide(correction, denominator, out=correction, where=is_corrected)
+    correction *= is_corrected
 
-    return result.squeeze()
+    if out is None:
+        out = np.empty_like(
+            midpoint_jacobian,
+            dtype=np.result_type(midpoint_jacobian, correction, increment),
+        )
+
+    np.multiply(correction[..., :, np.newaxis], increment[..., np.newaxis, :], out=out)
+    return np.add(out, midpoint_jacobian, out=out)
 
 
 def adjust_midpoint_jacobian(midpoint_jacobian, func_n, func_n1):
@@ -159,3 +264,84 @@ def adjust_midpoint_jacobian(midpoint_jacobian, func_n, func_n1):
             np.array([func_n1]),
         )
     return midpoint_jacobian, func_n, func_n1
+
+
+def Gonzalez_discrete_gradient_derivative(
+    func_n,
+    func_n1,
+    jacobian_n1,
+    midpoint_jacobian,
+    midpoint_hessian,
+    argument_n,
+    argument_n1,
+    denominator_tolerance,
+):
+    """Compute the derivative of the Gonzalez discrete gradient of a scalar-valued function with respect to argument_n1."""
+    increment = argument_n1 - argument_n
+    denominator = increment.T @ increment
+
+    derivative = 0.5 * midpoint_hessian
+
+    if denominator > denominator_tolerance:
+
+        correction = func_n1 - func_n - np.dot(midpoint_jacobian, increment)
+        correction_gradient = (
+            jacobian_n1 - midpoint_jacobian - 0.5 * midpoint_hessian @ increment
+        )
+
+        derivative = (
+            derivative
+            + np.outer(increment, correction_gradient) / denominator
+            - 2.0 * correction / denominator**2 * np.outer(increment, increment)
+            + correction / denominator * np.eye(len(increment))
+        )
+
+    return derivative
+
+
+def Gonzalez_discrete_gradient_state_derivative(
+    func_n,
+    func_n1,
+    jacobian_n1,
+    midpoint_jacobian,
+    midpoint_hessian,
+    argument_n,
+    argument_n1,
+    argument_indices,
+    denominator_tolerance,
+):
+    """
+    Compute the derivative of the Gonzalez discrete gradient of a scalar-valued function with respect to the state at n1.
+
+    The argument consists of the state entries argument_indices and midpoint_hessian is the derivative of the
+    midpoint Jacobian with respect to the complete state. The function is assumed to depend on its argument only.
+    """
+    dim_state = midpoint_hessian.shape[-1]
+
+    def embed(matrix):
+        # Columns of the argument within the state
+        embedded = np.zeros(matrix.shape[:-1] + (dim_state,))
+        embedded[..., argument_indices] = matrix
+        return embedded
+
+    increment = argument_n1 - argument_n
+    denominator = increment.T @ increment
+
+    derivative = 0.5 * midpoint_hessian
+
+    if denominator > denominator_tolerance:
+
+        correction = func_n1 - func_n - np.dot(midpoint_jacobian, increment)
+        correction_gradient = (
+            embed(jacobian_n1 - midpoint_jacobian)
+            - 0.5 * midpoint_hessian.T @ increment
+        )
+
+        derivative = (
+            derivative
+            + np.outer(increment, correction_gradient) / denominator
+            - 2.0 * correction / denominator**2 * np.outer(increment, embed(increment))
+            + correction / denominator * embed(np.eye(len(increment)))
+        )
+
+    return derivative
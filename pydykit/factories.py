@@ -5,22 +5,33 @@ from .integrators import (
     MidpointDAE,
     MidpointMultibody,
     MidpointPH,
+    Rattle,
+    StoermerVerlet,
 )
-from .simulators import OneStep
+from .results import Result, StreamingResult
+from .simulators import Ensemble, OneStep
 from .systems_dae import ChemicalReactor, Lorenz
-from .systems_multi_body import ParticleSystem, RigidBodyRotatingQuaternions
+from .systems_multi_body import (
+    MultiRigidBodyQuaternions,
+    ParticleSystem,
+    RigidBodyRotatingQuaternions,
+)
 from .systems_port_hamiltonian import Pendulum2D
-from .time_steppers import FixedIncrement, FixedIncrementHittingEnd
+from .time_steppers import AdaptiveIncrement, FixedIncrement, FixedIncrementHittingEnd
 
 registered_systems = {
     "ParticleSystem": ParticleSystem,
     "RigidBodyRotatingQuaternions": RigidBodyRotatingQuaternions,
+    "MultiRigidBodyQuaternions": MultiRigidBodyQuaternions,
     "Pendulum2D": Pendulum2D,
     "Lorenz": Lorenz,
     "ChemicalReactor": ChemicalReactor,
 }
 
-registered_simulators = {"OneStep": OneStep}
+registered_simulators = {
+    "OneStep": OneStep,
+    "Ensemble": Ensemble,
+}
 
 registered_integrators = {
     "MidpointPH": MidpointPH,
@@ -28,11 +39,19 @@ registered_integrators = {
     "MidpointMultibody": MidpointMultibody,
     "DiscreteGradientMultibody": DiscreteGradientMultibody,
     "MidpointDAE": MidpointDAE,
+    "StoermerVerlet": StoermerVerlet,
+    "Rattle": Rattle,
+}
+
+registered_results = {
+    "Result": Result,
+    "StreamingResult": StreamingResult,
 }
 
 registered_timesteppers = {
     "FixedIncrement": FixedIncrement,
     "FixedIncrementHittingEnd": FixedIncrementHittingEnd,
+    "AdaptiveIncrement": AdaptiveIncrement,
 }
 
 
@@ -69,6 +88,11 @@ class TimeStepperFactory(Factory):
         return self.create(key, **kwargs)
 
 
+class ResultFactory(Factory):
+    def get(self, key, **kwargs):
+        return self.create(key, **kwargs)
+
+
 system_factory = SystemFactory()
 for key, constructor in registered_systems.items():
     system_factory.register_constructor(key=key, constructor=constructor)
@@ -87,6 +111,11 @@ time_stepper_factory = TimeStepperFactory()
 for key, constructor in registered_timesteppers.items():
     time_stepper_factory.register_constructor(key=key, constructor=constructor)
 
+# Results are created per run, see Manager.create_result, and are therefore not part of `factories`
+result_factory = ResultFactory()
+for key, constructor in registered_results.items():
+    result_factory.register_constructor(key=key, constructor=constructor)
+
 factories = dict(
     system=system_factory,
     simulator=simulator_factory,
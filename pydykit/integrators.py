@@ -1,20 +1,160 @@
+import concurrent.futures
+
 import numpy as np
+import scipy.sparse
 
-from . import abstract_base_classes, discrete_gradients, utils
+from . import (
+    abstract_base_classes,
+    differentiation,
+    discrete_gradients,
+    mass_operators,
+    utils,
+)
 
 
 class IntegratorCommon(abstract_base_classes.Integrator):
 
-    def __init__(self, manager):
+    # Quantities of the system, which are memoized at the start and end of a time step
+    step_invariant_quantities = ()
+
+    def __init__(
+        self,
+        manager,
+        numerical_tangent_workers: int = None,
+        differentiation_engine: str = "central_differences",
+    ):
         self.manager = manager
+        self.numerical_tangent_workers = numerical_tangent_workers
+        self.numerical_tangent_executor = None
+        self.differentiation_engine = differentiation_engine
+        self.tangent_coloring = None
+        self.system_view_cache = utils.SystemViewCache(
+            quantities=self.step_invariant_quantities
+        )
+
+    @property
+    def is_vectorized(self):
+        # Residuum can be evaluated on stacked states at once
+        return getattr(self, "supports_batched_states", False) and getattr(
+            self.manager.system, "supports_batched_states", False
+        )
 
     def get_tangent(self, state):
         # will be used if no analytical tangent has been implemented
-        return utils.get_numerical_tangent(
+        if self.differentiation_engine != "central_differences":
+            self.validate_complex_safety()
+
+        sparsity_pattern, colors = self.get_tangent_coloring()
+
+        return differentiation.get_tangent(
             func=self.get_residuum,
             state=state.copy(),
+            engine=self.differentiation_engine,
+            is_vectorized=self.is_vectorized,
+            executor=self.get_numerical_tangent_executor(),
+            sparsity_pattern=sparsity_pattern,
+            colors=colors,
+        )
+
+    def get_numerical_tangent_executor(self):
+        # Threads are started on first use and shared by all numerical tangents of the integrator
+        if (
+            self.numerical_tangent_workers is not None
+            and self.numerical_tangent_executor is None
+        ):
+            self.numerical_tangent_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.numerical_tangent_workers
+            )
+
+        return self.numerical_tangent_executor
+
+    def get_numerical_derivative(self, func, state):
+        """
+        Central differences of parts of analytical tangents, which are not available in closed form.
+        Columns are evaluated by the configured numerical tangent workers.
+        """
+        return differentiation.get_tangent(
+            func=func,
+            state=np.array(state, dtype=float),
+            executor=self.get_numerical_tangent_executor(),
         )
 
+    def get_tangent_block_sizes(self):
+        # Tangents without known block structure
+        return None
+
+    def get_system_derivative(self, system, name, evaluate, **kwargs):
+        """
+        Derivative of a system quantity with respect to the state of the system.
+        Uses the system hook `name`, if available, and finite differences of
+        evaluate(system) otherwise, e.g., if the hook is missing or returns None.
+        """
+        derivative = getattr(system, name, lambda **kwargs: None)(**kwargs)
+
+        if derivative is None:
+            derivative = self.get_numerical_derivative(
+                func=lambda next_state: evaluate(system.view(state=next_state)),
+                state=system.state,
+            )
+
+        return utils.to_dense(derivative)
+
+    def get_step_system_views(self, next_state):
+        """
+        Views of the system at the start, the midpoint and the end of the current time step.
+        Within a time step, the start-of-step view and its memoized quantities are shared
+        by all Newton iterations and finite-difference probes.
+        """
+        system = self.manager.system
+        state_n = system.state
+
+        system_n = self.system_view_cache.get_start_view(system=system, state=state_n)
+        system_n1 = self.system_view_cache.get_end_view(system=system, state=next_state)
+        system_n05 = system.view(state=0.5 * (state_n + next_state))
+
+        return system_n, system_n05, system_n1
+
+    def get_tangent_sparsity_pattern(self):
+        """
+        Residuals of integrators which evaluate the system at states of one time step only
+        couple those state components, which are coupled within the system.
+        Integrators mixing all components, e.g., by discrete gradients of Gonzalez type,
+        have to return None, i.e., a dense pattern.
+        """
+        if not getattr(self, "preserves_state_coupling", False):
+            return None
+
+        if not hasattr(self.manager.system, "state_coupling_pattern"):
+            return None
+
+        if self.manager.system.state.ndim > 1:
+            # Coloring is restricted to single states
+            return None
+
+        return self.manager.system.state_coupling_pattern()
+
+    def get_tangent_coloring(self):
+        # Topology is fixed, such that the coloring is computed once per system
+        system = self.manager.system
+        if (self.tangent_coloring is None) or (self.tangent_coloring[0] is not system):
+            sparsity_pattern = self.get_tangent_sparsity_pattern()
+            colors = (
+                None
+                if sparsity_pattern is None
+                else utils.color_columns(sparsity_pattern)
+            )
+            self.tangent_coloring = (system, sparsity_pattern, colors)
+
+        return self.tangent_coloring[1:]
+
+    def validate_complex_safety(self):
+        for obj in [self, self.manager.system]:
+            if not getattr(obj, "complex_safe", False):
+                raise utils.PydykitException(
+                    f"{type(obj).__name__} is not complex-safe and does therefore not"
+                    + f" support differentiation engine {self.differentiation_engine}"
+                )
+
     def postprocess(self, next_state):
         pass
 
@@ -22,6 +162,9 @@ class IntegratorCommon(abstract_base_classes.Integrator):
 class MidpointPH(IntegratorCommon):
 
     parametrization = ["state"]
+    supports_batched_states = True
+    complex_safe = True
+    preserves_state_coupling = True
 
     def get_residuum(self, next_state):
 
@@ -33,7 +176,7 @@ class MidpointPH(IntegratorCommon):
 
         # create midpoint state and all corresponding discrete-time systems
         state_n05 = 0.5 * (state_n + state_n1)
-        system_n, system_n1, system_n05 = utils.get_system_copies_with_desired_states(
+        system_n, system_n1, system_n05 = utils.get_system_views_with_desired_states(
             system=self.manager.system,
             states=[
                 state_n,
@@ -52,10 +195,9 @@ class MidpointPH(IntegratorCommon):
         j_matrix_n05 = system_n05.structure_matrix()
         r_matrix_n05 = system_n05.dissipation_matrix()
 
-        residuum = (
-            e_n05 @ (state_n1 - state_n)
-            - time_step_size * (j_matrix_n05 - r_matrix_n05) @ costate
-        )
+        residuum = utils.matvec(
+            e_n05, state_n1 - state_n
+        ) - time_step_size * utils.matvec(j_matrix_n05 - r_matrix_n05, costate)
 
         return residuum
 
@@ -69,7 +211,7 @@ class MidpointPH(IntegratorCommon):
         time_step_size = current_step.increment
         state_midpoint = 0.5 * (current_state + next_state)
 
-        system_n, system_n05, system_n1 = utils.get_system_copies_with_desired_states(
+        system_n, system_n05, system_n1 = utils.get_system_views_with_desired_states(
             system=self.manager.system,
             states=[current_state, state_midpoint, next_state],
         )
@@ -77,7 +219,53 @@ class MidpointPH(IntegratorCommon):
         r_matrix_n05 = system_n05.dissipation_matrix()
         costates = system_n05.costates()
 
-        return time_step_size * np.dot(costates, r_matrix_n05 @ costates)
+        return time_step_size * np.sum(
+            costates * utils.matvec(r_matrix_n05, costates), axis=-1
+        )
+
+    def get_tangent(self, state):
+
+        if self.differentiation_engine != "central_differences":
+            # automatic differentiation has been requested explicitly
+            return super().get_tangent(state=state)
+
+        # state_n1 is the argument which changes in calling function solver, state_n is the current state of the system
+        state_n = self.manager.system.state
+        state_n1 = state
+
+        step_size = self.manager.time_stepper.current_step.increment
+
+        # create midpoint state and all corresponding discrete-time systems
+        state_n05 = 0.5 * (state_n + state_n1)
+        system_n, system_n1, system_n05 = utils.get_system_views_with_desired_states(
+            system=self.manager.system,
+            states=[
+                state_n,
+                state_n1,
+                state_n05,
+            ],
+        )
+
+        costate = self.get_discrete_costate(
+            system_n=system_n, system_n1=system_n1, system_n05=system_n05
+        )
+
+        # the gradient is evaluated at the midpoint
+        hessian_n05 = self.get_system_derivative(
+            system=system_n05,
+            name="hamiltonian_differential_hessian",
+            evaluate=lambda system: system.hamiltonian_differential_gradient(),
+        )
+
+        return assemble_port_hamiltonian_tangent(
+            integrator=self,
+            system_n05=system_n05,
+            system_n1=system_n1,
+            increment=state_n1 - state_n,
+            costate=costate,
+            gradient_derivative=0.5 * hessian_n05,
+            step_size=step_size,
+        )
 
     def get_discrete_costate(
         self,
@@ -86,12 +274,13 @@ class MidpointPH(IntegratorCommon):
         system_n05,
     ):
 
-        E_11_n05 = system_n05.nonsingular_descriptor_matrix()
         DH_n05 = system_n05.hamiltonian_differential_gradient()
 
-        differential_costate = np.linalg.solve(E_11_n05.T, DH_n05)
+        differential_costate = system_n05.solve_nonsingular_descriptor_transpose(
+            DH_n05[..., np.newaxis]
+        )[..., 0]
         algebraic_costate = system_n1.get_algebraic_costate()
-        costate = np.concatenate([differential_costate, algebraic_costate], axis=0)
+        costate = np.concatenate([differential_costate, algebraic_costate], axis=-1)
 
         return costate
 
@@ -99,9 +288,10 @@ class MidpointPH(IntegratorCommon):
 class DiscreteGradientPHDAE(IntegratorCommon):
 
     parametrization = ["state"]
+    step_invariant_quantities = ("hamiltonian", "hamiltonian_1", "hamiltonian_2")
 
-    def __init__(self, manager, increment_tolerance, discrete_gradient_type):
-        super().__init__(manager)
+    def __init__(self, manager, increment_tolerance, discrete_gradient_type, **kwargs):
+        super().__init__(manager, **kwargs)
         self.increment_tolerance = increment_tolerance
         self.discrete_gradient_type = discrete_gradient_type
 
@@ -109,11 +299,9 @@ class DiscreteGradientPHDAE(IntegratorCommon):
 
         time_step_size = self.manager.time_stepper.current_step.increment
         current_state = self.manager.system.state
-        state_midpoint = 0.5 * (current_state + next_state)
 
-        system_n, system_n05, system_n1 = utils.get_system_copies_with_desired_states(
-            system=self.manager.system,
-            states=[current_state, state_midpoint, next_state],
+        system_n, system_n05, system_n1 = self.get_step_system_views(
+            next_state=next_state
         )
         costate = self.get_discrete_costate(
             system_n=system_n,
@@ -132,34 +320,128 @@ class DiscreteGradientPHDAE(IntegratorCommon):
 
         return residuum
 
-    def get_discrete_costate(
+    def get_tangent(self, state):
+
+        if self.differentiation_engine != "central_differences":
+            # automatic differentiation has been requested explicitly
+            return super().get_tangent(state=state)
+
+        time_step_size = self.manager.time_stepper.current_step.increment
+
+        system_n, system_n05, system_n1 = self.get_step_system_views(next_state=state)
+        costate = self.get_discrete_costate(
+            system_n=system_n,
+            system_n1=system_n1,
+            system_n05=system_n05,
+        )
+
+        return assemble_port_hamiltonian_tangent(
+            integrator=self,
+            system_n05=system_n05,
+            system_n1=system_n1,
+            increment=state - system_n.state,
+            costate=costate,
+            gradient_derivative=self.get_discrete_gradient_derivative(
+                system_n=system_n,
+                system_n1=system_n1,
+                system_n05=system_n05,
+            ),
+            step_size=time_step_size,
+        )
+
+    def get_discrete_gradient_derivative(
         self,
         system_n,
         system_n1,
         system_n05,
     ):
+        """
+        Derivative of the discrete gradient of the Hamiltonian with respect to the state at n1.
+        Falls back to finite differences, if the system does not provide the Hessians of all parts.
+        """
+        if self.discrete_gradient_type == "Gonzalez":
+            parts = [
+                (
+                    "hamiltonian",
+                    "hamiltonian_differential_gradient",
+                    "hamiltonian_differential_hessian",
+                    lambda system: system.get_differential_state(),
+                )
+            ]
+        else:
+            parts = [
+                (
+                    f"hamiltonian_{index+1}",
+                    f"hamiltonian_differential_gradient_{index+1}",
+                    f"hamiltonian_differential_hessian_{index+1}",
+                    lambda system, name=name: system.decompose_state()[name],
+                )
+                for index, name in enumerate(system_n.differential_state_composition)
+            ]
+
+        derivatives = []
+
+        for func_name, jacobian_name, hessian_name, get_argument in parts:
+            midpoint_hessian = getattr(system_n05, hessian_name, lambda: None)()
+
+            if midpoint_hessian is None:
+                return self.get_numerical_discrete_gradient_derivative(
+                    system_n=system_n,
+                    state=system_n1.state,
+                )
+
+            derivatives.append(
+                discrete_gradients.Gonzalez_discrete_gradient_state_derivative(
+                    func_n=getattr(system_n, func_name)(),
+                    func_n1=getattr(system_n1, func_name)(),
+                    jacobian_n1=getattr(system_n1, jacobian_name)(),
+                    midpoint_jacobian=getattr(system_n05, jacobian_name)(),
+                    midpoint_hessian=midpoint_hessian,
+                    argument_n=get_argument(system_n),
+                    argument_n1=get_argument(system_n1),
+                    argument_indices=utils.get_state_indices(
+                        system=system_n, get_entries=get_argument
+                    ),
+                    denominator_tolerance=self.increment_tolerance,
+                )
+            )
 
-        differential_state_n = system_n.get_differential_state()
-        differential_state_n1 = system_n1.get_differential_state()
+        return np.concatenate(derivatives, axis=0)
+
+    def get_numerical_discrete_gradient_derivative(self, system_n, state):
+
+        def discrete_gradient(next_state):
+            system_n05, system_n1 = utils.get_system_views_with_desired_states(
+                system=self.manager.system,
+                states=[0.5 * (system_n.state + next_state), next_state],
+            )
+            return self.get_discrete_gradient(
+                system_n=system_n,
+                system_n1=system_n1,
+                system_n05=system_n05,
+            )
+
+        return self.get_numerical_derivative(
+            func=discrete_gradient,
+            state=state,
+        )
 
-        E_11_n05 = system_n05.nonsingular_descriptor_matrix()
+    def get_discrete_costate(
+        self,
+        system_n,
+        system_n1,
+        system_n05,
+    ):
 
-        DGH = discrete_gradients.discrete_gradient(
+        DGH = self.get_discrete_gradient(
             system_n=system_n,
             system_n1=system_n1,
             system_n05=system_n05,
-            func_name="hamiltonian",
-            jacobian_name="hamiltonian_differential_gradient",
-            argument_n=differential_state_n,
-            argument_n1=differential_state_n1,
-            type=self.discrete_gradient_type,
-            increment_tolerance=self.increment_tolerance,
-            nbr_func_parts=system_n.nbr_hamiltonian_parts,
-            func_parts_n=system_n.differential_state_composition,
-            func_parts_n1=system_n1.differential_state_composition,
         )
 
-        differential_costate = np.linalg.solve(E_11_n05.T, DGH)
+        differential_costate = system_n05.solve_nonsingular_descriptor_transpose(
+            DGH[..., np.newaxis]
+        )[..., 0]
         algebraic_costate = system_n1.get_algebraic_costate()
         costate = np.concatenate(
             [
@@ -171,6 +453,31 @@ class DiscreteGradientPHDAE(IntegratorCommon):
 
         return costate
 
+    def get_discrete_gradient(
+        self,
+        system_n,
+        system_n1,
+        system_n05,
+    ):
+
+        differential_state_n = system_n.get_differential_state()
+        differential_state_n1 = system_n1.get_differential_state()
+
+        return discrete_gradients.discrete_gradient(
+            system_n=system_n,
+            system_n1=system_n1,
+            system_n05=system_n05,
+            func_name="hamiltonian",
+            jacobian_name="hamiltonian_differential_gradient",
+            argument_n=differential_state_n,
+            argument_n1=differential_state_n1,
+            type=self.discrete_gradient_type,
+            increment_tolerance=self.increment_tolerance,
+            nbr_func_parts=system_n.nbr_hamiltonian_parts,
+            func_parts_n=system_n.differential_state_composition,
+            func_parts_n1=system_n1.differential_state_composition,
+        )
+
     def dissipated_work(
         self,
         current_state,
@@ -181,7 +488,7 @@ class DiscreteGradientPHDAE(IntegratorCommon):
         time_step_size = current_step.increment
         state_midpoint = 0.5 * (current_state + next_state)
 
-        system_n, system_n05, system_n1 = utils.get_system_copies_with_desired_states(
+        system_n, system_n05, system_n1 = utils.get_system_views_with_desired_states(
             system=self.manager.system,
             states=[current_state, state_midpoint, next_state],
         )
@@ -205,6 +512,11 @@ class MidpointMultibody(IntegratorCommon):
         "multiplier",
     ]
 
+    def get_tangent_block_sizes(self):
+        # Position, momentum and multiplier blocks, see MultiBodySystem.decompose_state
+        system = self.manager.system
+        return [system.nbr_dof, system.nbr_dof, system.nbr_constraints]
+
     def get_residuum(self, next_state):
 
         # state_n1 is the argument which changes in calling function solver, state_n is the current state of the system
@@ -217,7 +529,7 @@ class MidpointMultibody(IntegratorCommon):
         # create midpoint state and all corresponding discrete-time systems
         state_n05 = 0.5 * (state_n + state_n1)
 
-        system_n, system_n1, system_n05 = utils.get_system_copies_with_desired_states(
+        system_n, system_n1, system_n05 = utils.get_system_views_with_desired_states(
             system=self.manager.system,
             states=[
                 state_n,
@@ -230,8 +542,9 @@ class MidpointMultibody(IntegratorCommon):
         try:
             inv_mass_matrix_n05 = system_n05.inverse_mass_matrix()
         except AttributeError:
-            mass_matrix_n05 = system_n05.mass_matrix()
-            inv_mass_matrix_n05 = np.linalg.inv(mass_matrix_n05)
+            inv_mass_matrix_n05 = mass_operators.as_mass_operator(
+                system_n05.mass_matrix()
+            ).inverse()
 
         # constraint
         G_n05 = system_n05.constraint_gradient()
@@ -258,7 +571,7 @@ class MidpointMultibody(IntegratorCommon):
             - p_n
             + step_size * (DV_int_n05 + DV_ext_n05)
             + step_size * DTq_n05
-            + step_size * D_n05 @ inv_mass_matrix_n05 @ p_n05
+            + step_size * D_n05 @ (inv_mass_matrix_n05 @ p_n05)
         )
 
         if self.manager.system.nbr_constraints == 0:
@@ -284,6 +597,63 @@ class MidpointMultibody(IntegratorCommon):
 
         return residuum
 
+    def get_tangent(self, state):
+        # state_n1 is the argument which changes in calling function solver, state_n is the current state of the system
+        state_n = self.manager.system.state
+        state_n1 = state
+
+        # read time step size
+        step_size = self.manager.time_stepper.current_step.increment
+
+        # create midpoint state and all corresponding discrete-time systems
+        state_n05 = 0.5 * (state_n + state_n1)
+
+        system_n1, system_n05 = utils.get_system_views_with_desired_states(
+            system=self.manager.system,
+            states=[
+                state_n1,
+                state_n05,
+            ],
+        )
+
+        inv_mass_matrix_n05 = system_n05.inverse_mass_matrix()
+        D_n05 = system_n05.dissipation_matrix()
+
+        p_n05 = system_n05.decompose_state()["momentum"]
+        lambd_n05 = system_n05.decompose_state()["multiplier"]
+        v_n05 = inv_mass_matrix_n05 @ p_n05
+
+        # derivatives with respect to the midpoint position
+        d_inv_mass_p_n05 = system_n05.inverse_mass_matrix_derivative(vector=p_n05)
+        d_force_n05 = (
+            system_n05.potential_energy_hessian()
+            + system_n05.kinetic_energy_hessian_from_momentum()
+            + system_n05.dissipation_matrix_derivative(vector=v_n05)
+            + D_n05 @ d_inv_mass_p_n05
+        )
+
+        if self.manager.system.nbr_constraints > 0:
+            d_force_n05 = d_force_n05 + system_n05.constraint_hessian(
+                multiplier=lambd_n05
+            )
+
+        # chain rule: d(state_n05) / d(state_n1) = 0.5
+        return assemble_multibody_tangent(
+            tangent_qq=-0.5 * step_size * d_inv_mass_p_n05,
+            tangent_qp=-0.5 * step_size * inv_mass_matrix_n05,
+            tangent_pq=0.5 * step_size * d_force_n05,
+            tangent_pp=0.5
+            * step_size
+            * (
+                system_n05.kinetic_energy_mixed_hessian_from_momentum()
+                + D_n05 @ inv_mass_matrix_n05
+            ),
+            constraint_gradient_n05=system_n05.constraint_gradient(),
+            constraint_gradient_n1=system_n1.constraint_gradient(),
+            step_size=step_size,
+            nbr_constraints=self.manager.system.nbr_constraints,
+        )
+
 
 class DiscreteGradientMultibody(IntegratorCommon):
 
@@ -292,44 +662,53 @@ class DiscreteGradientMultibody(IntegratorCommon):
         "momentum",
         "multiplier",
     ]
+    step_invariant_quantities = (
+        "internal_potential",
+        "external_potential",
+        "constraint",
+    )
 
     def __init__(
         self,
         manager,
         increment_tolerance,
         discrete_gradient_type,
+        **kwargs,
     ):
-        super().__init__(manager)
+        super().__init__(manager, **kwargs)
         self.increment_tolerance = increment_tolerance
         self.discrete_gradient_type = discrete_gradient_type
 
+    @property
+    def preserves_state_coupling(self):
+        # Element-wise discrete gradients only couple particles sharing an element
+        return self.discrete_gradient_type == "Gonzalez_elementwise"
+
+    def get_tangent_block_sizes(self):
+        # Position, momentum and multiplier blocks, see MultiBodySystem.decompose_state
+        system = self.manager.system
+        return [system.nbr_dof, system.nbr_dof, system.nbr_constraints]
+
     def get_residuum(self, next_state):
 
-        # state_n1 is the argument which changes in calling function solver, state_n is the current state of the system
-        state_n = self.manager.system.state
+        # state_n1 is the argument which changes in calling function solver
         state_n1 = next_state
 
         # read time step size
         step_size = self.manager.time_stepper.current_step.increment
 
-        # create midpoint state and all corresponding discrete-time systems
-        state_n05 = 0.5 * (state_n + state_n1)
-
-        system_n, system_n1, system_n05 = utils.get_system_copies_with_desired_states(
-            system=self.manager.system,
-            states=[
-                state_n,
-                state_n1,
-                state_n05,
-            ],
+        # create all discrete-time systems, reusing the start-of-step system
+        system_n, system_n05, system_n1 = self.get_step_system_views(
+            next_state=state_n1
         )
 
         # get inverse mass matrix
         try:
             inv_mass_matrix_n05 = system_n05.inverse_mass_matrix()
         except AttributeError:
-            mass_matrix_n05 = system_n05.mass_matrix()
-            inv_mass_matrix_n05 = np.linalg.inv(mass_matrix_n05)
+            inv_mass_matrix_n05 = mass_operators.as_mass_operator(
+                system_n05.mass_matrix()
+            ).inverse()
 
         # constraint
         g_n1 = system_n1.constraint()
@@ -388,7 +767,7 @@ class DiscreteGradientMultibody(IntegratorCommon):
             p_n1
             - p_n
             + step_size * (DV_int + DV_ext)
-            + step_size * D_n05 @ inv_mass_matrix_n05 @ p_n05
+            + step_size * D_n05 @ (inv_mass_matrix_n05 @ p_n05)
         )
 
         if self.manager.system.nbr_constraints == 0:
@@ -416,10 +795,279 @@ class DiscreteGradientMultibody(IntegratorCommon):
 
         return residuum
 
+    def get_tangent(self, state):
+
+        if self.discrete_gradient_type != "Gonzalez":
+            # analytical tangent is only available for the Gonzalez discrete gradient
+            return super().get_tangent(state=state)
+
+        # state_n1 is the argument which changes in calling function solver
+        state_n1 = state
+
+        # read time step size
+        step_size = self.manager.time_stepper.current_step.increment
+
+        # create all discrete-time systems, reusing the start-of-step system
+        system_n, system_n05, system_n1 = self.get_step_system_views(
+            next_state=state_n1
+        )
+
+        inv_mass_matrix_n05 = system_n05.inverse_mass_matrix()
+        D_n05 = system_n05.dissipation_matrix()
+
+        p_n05 = system_n05.decompose_state()["momentum"]
+        q_n = system_n.decompose_state()["position"]
+        q_n1 = system_n1.decompose_state()["position"]
+        lambd_n05 = system_n05.decompose_state()["multiplier"]
+        v_n05 = inv_mass_matrix_n05 @ p_n05
+
+        d_inv_mass_p_n05 = system_n05.inverse_mass_matrix_derivative(vector=p_n05)
+
+        # derivatives of the discrete gradients with respect to q_n1
+        d_force = 0.5 * (
+            system_n05.dissipation_matrix_derivative(vector=v_n05)
+            + D_n05 @ d_inv_mass_p_n05
+        )
+
+        for func_name in ["internal_potential", "external_potential"]:
+            d_force = (
+                d_force
+                + discrete_gradients.Gonzalez_discrete_gradient_derivative(
+                    func_n=getattr(system_n, func_name)(),
+                    func_n1=getattr(system_n1, func_name)(),
+                    jacobian_n1=getattr(system_n1, f"{func_name}_gradient")(),
+                    midpoint_jacobian=getattr(system_n05, f"{func_name}_gradient")(),
+                    midpoint_hessian=getattr(system_n05, f"{func_name}_hessian")(),
+                    argument_n=q_n,
+                    argument_n1=q_n1,
+                    denominator_tolerance=self.increment_tolerance,
+                )
+            )
+
+        if self.manager.system.nbr_constraints > 0:
+            G_DG = discrete_gradients.discrete_gradient(
+                system_n=system_n,
+                system_n1=system_n1,
+                system_n05=system_n05,
+                func_name="constraint",
+                jacobian_name="constraint_gradient",
+                argument_n=q_n,
+                argument_n1=q_n1,
+                type=self.discrete_gradient_type,
+                increment_tolerance=self.increment_tolerance,
+            )
+            G_DG = np.atleast_2d(G_DG)
+
+            # the multipliers are constant with respect to q_n1,
+            # hence consider the scalar function lambd_n05 @ constraint
+            d_force = (
+                d_force
+                + discrete_gradients.Gonzalez_discrete_gradient_derivative(
+                    func_n=lambd_n05 @ system_n.constraint(),
+                    func_n1=lambd_n05 @ system_n1.constraint(),
+                    jacobian_n1=system_n1.constraint_gradient().T @ lambd_n05,
+                    midpoint_jacobian=system_n05.constraint_gradient().T @ lambd_n05,
+                    midpoint_hessian=system_n05.constraint_hessian(
+                        multiplier=lambd_n05
+                    ),
+                    argument_n=q_n,
+                    argument_n1=q_n1,
+                    denominator_tolerance=self.increment_tolerance,
+                )
+            )
+        else:
+            G_DG = None
+
+        return assemble_multibody_tangent(
+            tangent_qq=-0.5 * step_size * d_inv_mass_p_n05,
+            tangent_qp=-0.5 * step_size * inv_mass_matrix_n05,
+            tangent_pq=step_size * d_force,
+            tangent_pp=0.5 * step_size * D_n05 @ inv_mass_matrix_n05,
+            constraint_gradient_n05=G_DG,
+            constraint_gradient_n1=system_n1.constraint_gradient(),
+            step_size=step_size,
+            nbr_constraints=self.manager.system.nbr_constraints,
+        )
+
+
+class StoermerVerlet(IntegratorCommon):
+    """
+    Explicit Stoermer-Verlet scheme for multibody systems with constant mass matrix, i.e.,
+    half kick, drift and half kick, costing one force evaluation per step.
+    Dissipative forces are evaluated with the momenta known at the respective kick.
+    """
+
+    parametrization = [
+        "position",
+        "momentum",
+        "multiplier",
+    ]
+    is_explicit = True
+    supports_constraints = False
+
+    def validate_system(self, system):
+        if not getattr(system, "has_constant_mass_matrix", False):
+            raise utils.PydykitException(
+                f"{type(self).__name__} requires a constant mass matrix,"
+                + f" which is not provided by {type(system).__name__}"
+            )
+        if (system.nbr_constraints > 0) and not self.supports_constraints:
+            raise utils.PydykitException(
+                f"{type(self).__name__} does not support constraints, use Rattle instead"
+            )
+
+    def get_next_state(self):
+        system_n = self.manager.system
+        self.validate_system(system_n)
+
+        # read time step size
+        step_size = self.manager.time_stepper.current_step.increment
+
+        try:
+            inv_mass_matrix = system_n.inverse_mass_matrix()
+        except AttributeError:
+            inv_mass_matrix = mass_operators.as_mass_operator(
+                system_n.mass_matrix()
+            ).inverse()
+
+        state_n = system_n.decompose_state()
+        p_n = state_n["momentum"]
+
+        p_free = p_n - 0.5 * step_size * self.get_force(
+            system=system_n,
+            momentum=p_n,
+            inv_mass_matrix=inv_mass_matrix,
+        )
+
+        q_n1, p_n05, lambd = self.drift(
+            system_n=system_n,
+            momentum=p_free,
+            inv_mass_matrix=inv_mass_matrix,
+            step_size=step_size,
+        )
+
+        system_n1 = system_n.view(state=np.concatenate([q_n1, p_n05, lambd], axis=0))
+
+        p_n1 = self.project_momentum(
+            system_n1=system_n1,
+            momentum=p_n05
+            - 0.5
+            * step_size
+            * self.get_force(
+                system=system_n1,
+                momentum=p_n05,
+                inv_mass_matrix=inv_mass_matrix,
+            ),
+            inv_mass_matrix=inv_mass_matrix,
+            step_size=step_size,
+        )
+
+        return np.concatenate([q_n1, p_n1, lambd], axis=0)
+
+    def get_force(self, system, momentum, inv_mass_matrix):
+        return system.potential_energy_gradient() + system.dissipation_matrix() @ (
+            inv_mass_matrix @ momentum
+        )
+
+    def drift(self, system_n, momentum, inv_mass_matrix, step_size):
+        state_n = system_n.decompose_state()
+        q_n1 = state_n["position"] + step_size * (inv_mass_matrix @ momentum)
+        return q_n1, momentum, state_n["multiplier"]
+
+    def project_momentum(self, system_n1, momentum, inv_mass_matrix, step_size):
+        return momentum
+
+    def get_residuum(self, next_state):
+        # Residuum of the explicit map, such that the scheme can also be driven by a solver
+        return next_state - self.get_next_state()
+
+    def get_tangent(self, state):
+        return np.eye(len(state))
+
+
+class Rattle(StoermerVerlet):
+    """
+    RATTLE variant of the Stoermer-Verlet scheme for holonomic constraints.
+    The drift is projected onto the constraint manifold by a Newton iteration over the multipliers,
+    the momenta at the end of the step onto its tangent space by a linear solve.
+    The multipliers of the position constraints are stored in the state.
+    """
+
+    supports_constraints = True
+
+    def __init__(
+        self,
+        manager,
+        constraint_tolerance: float = 1e-10,
+        max_iterations: int = 20,
+        **kwargs,
+    ):
+        super().__init__(manager, **kwargs)
+        self.constraint_tolerance = constraint_tolerance
+        self.max_iterations = max_iterations
+
+    def drift(self, system_n, momentum, inv_mass_matrix, step_size):
+        state_n = system_n.decompose_state()
+        q_n = state_n["position"]
+        lambd = state_n["multiplier"]
+
+        if system_n.nbr_constraints == 0:
+            return super().drift(
+                system_n=system_n,
+                momentum=momentum,
+                inv_mass_matrix=inv_mass_matrix,
+                step_size=step_size,
+            )
+
+        G_n = system_n.constraint_gradient()
+
+        for _ in range(self.max_iterations):
+            p_n05 = momentum - 0.5 * step_size * G_n.T @ lambd
+            q_n1 = q_n + step_size * (inv_mass_matrix @ p_n05)
+            system_n1 = system_n.view(
+                state=np.concatenate([q_n1, p_n05, lambd], axis=0)
+            )
+
+            g_n1 = system_n1.constraint()
+            if np.linalg.norm(g_n1) < self.constraint_tolerance:
+                return q_n1, p_n05, lambd
+
+            # Derivative of g_n1 with respect to the multipliers
+            jacobian = (
+                -0.5
+                * step_size**2
+                * utils.to_dense(
+                    system_n1.constraint_gradient() @ (inv_mass_matrix @ G_n.T)
+                )
+            )
+            lambd = lambd - np.linalg.solve(jacobian, g_n1)
+
+        raise utils.PydykitException(
+            f"{type(self).__name__} did not reach the constraint manifold"
+            + f" within {self.max_iterations} iterations"
+        )
+
+    def project_momentum(self, system_n1, momentum, inv_mass_matrix, step_size):
+        if system_n1.nbr_constraints == 0:
+            return momentum
+
+        G_n1 = system_n1.constraint_gradient()
+        inv_mass_matrix_G_n1 = inv_mass_matrix @ G_n1.T
+
+        # Hidden constraint G_n1 @ inv_mass_matrix @ p_n1 = 0 is linear in the multipliers
+        mu = np.linalg.solve(
+            0.5 * step_size * utils.to_dense(G_n1 @ inv_mass_matrix_G_n1),
+            G_n1 @ (inv_mass_matrix @ momentum),
+        )
+
+        return momentum - 0.5 * step_size * G_n1.T @ mu
+
 
 class MidpointDAE(IntegratorCommon):
 
     parametrization = ["state"]
+    supports_batched_states = True
+    complex_safe = True
 
     def get_residuum(self, next_state):
         # state_n1 is the argument which changes in calling function solver, state_n is the current state of the system
@@ -432,13 +1080,13 @@ class MidpointDAE(IntegratorCommon):
         # create midpoint state and all corresponding discrete-time systems
         state_n05 = 0.5 * (state_n + state_n1)
 
-        system_n05, system_n1 = utils.get_system_copies_with_desired_states(
+        system_n05, system_n1 = utils.get_system_views_with_desired_states(
             system=self.manager.system,
             states=[state_n05, state_n1],
         )
 
         return (
-            system_n05.descriptor_matrix() @ (state_n1 - state_n)
+            utils.matvec(system_n05.descriptor_matrix(), state_n1 - state_n)
             - step_size * system_n05.right_hand_side()
         )
 
@@ -453,8 +1101,124 @@ class MidpointDAE(IntegratorCommon):
         # create midpoint state and all corresponding discrete-time systems
         state_n05 = 0.5 * (state_n + state_n1)
 
-        system_n05, system_n1 = utils.get_system_copies_with_desired_states(
+        system_n05, system_n1 = utils.get_system_views_with_desired_states(
             system=self.manager.system,
             states=[state_n05, state_n1],
         )
         return system_n05.descriptor_matrix() - step_size * system_n05.jacobian() * 0.5
+
+
+def assemble_port_hamiltonian_tangent(
+    integrator,
+    system_n05,
+    system_n1,
+    increment,
+    costate,
+    gradient_derivative,
+    step_size,
+):
+    """
+    Assembles the tangent of port-Hamiltonian residuals of the form
+    E(z_n05) (z_n1 - z_n) - h (J(z_n05) - R(z_n05)) costate
+    with respect to z_n1. The differential costate is E_11(z_n05)^-T times a (discrete) gradient
+    of the Hamiltonian, whose derivative with respect to z_n1 is given by gradient_derivative,
+    the algebraic costate is evaluated at z_n1.
+    Derivatives of the system matrices are taken from system hooks, if available.
+    """
+    get_derivative = integrator.get_system_derivative
+
+    nbr_differential_states = gradient_derivative.shape[-2]
+    differential_costate = costate[..., :nbr_differential_states]
+
+    # Derivatives with respect to z_n05, i.e., scaled by 0.5 with respect to z_n1
+    d_descriptor = get_derivative(
+        system=system_n05,
+        name="descriptor_matrix_derivative",
+        evaluate=lambda system: utils.matvec(system.descriptor_matrix(), increment),
+        vector=increment,
+    )
+    d_structure = get_derivative(
+        system=system_n05,
+        name="structure_matrix_derivative",
+        evaluate=lambda system: utils.matvec(system.structure_matrix(), costate),
+        vector=costate,
+    )
+    d_dissipation = get_derivative(
+        system=system_n05,
+        name="dissipation_matrix_derivative",
+        evaluate=lambda system: utils.matvec(system.dissipation_matrix(), costate),
+        vector=costate,
+    )
+    d_nonsingular_descriptor = get_derivative(
+        system=system_n05,
+        name="nonsingular_descriptor_matrix_transpose_derivative",
+        evaluate=lambda system: utils.matvec(
+            utils.transpose(system.nonsingular_descriptor_matrix()),
+            differential_costate,
+        ),
+        vector=differential_costate,
+    )
+
+    # Derivative with respect to z_n1
+    d_algebraic_costate = get_derivative(
+        system=system_n1,
+        name="algebraic_costate_derivative",
+        evaluate=lambda system: system.get_algebraic_costate(),
+    )
+
+    # Differentiate E_11^T differential_costate = gradient
+    d_differential_costate = system_n05.solve_nonsingular_descriptor_transpose(
+        gradient_derivative - 0.5 * d_nonsingular_descriptor,
+    )
+    d_costate = np.concatenate(
+        [d_differential_costate, d_algebraic_costate],
+        axis=-2,
+    )
+
+    return (
+        system_n05.descriptor_matrix()
+        + 0.5 * d_descriptor
+        - 0.5 * step_size * (d_structure - d_dissipation)
+        - step_size
+        * (system_n05.structure_matrix() - system_n05.dissipation_matrix())
+        @ d_costate
+    )
+
+
+def assemble_multibody_tangent(
+    tangent_qq,
+    tangent_qp,
+    tangent_pq,
+    tangent_pp,
+    constraint_gradient_n05,
+    constraint_gradient_n1,
+    step_size,
+    nbr_constraints,
+):
+    """
+    Assembles the tangent of multibody residuals of the form
+    [position residual, momentum residual, constraint at n1]
+    with respect to [position, momentum, multiplier] at n1.
+    The identity contributions stemming from the increments q_n1 - q_n and p_n1 - p_n are added here.
+    The tangent is sparse, if the system provides sparse contributions.
+    """
+    nbr_dof = tangent_qq.shape[0]
+
+    if scipy.sparse.issparse(tangent_qq):
+        identity = scipy.sparse.identity(nbr_dof, format="csr")
+    else:
+        identity = np.eye(nbr_dof)
+
+    blocks = [
+        [identity + tangent_qq, tangent_qp],
+        [tangent_pq, identity + tangent_pp],
+    ]
+    block_sizes = [nbr_dof, nbr_dof]
+
+    if nbr_constraints > 0:
+        blocks[0].append(None)
+        blocks[1].append(0.5 * step_size * constraint_gradient_n05.T)
+        blocks.append([constraint_gradient_n1, None, None])
+        block_sizes.append(nbr_constraints)
+
+    return utils.block_matrix(blocks=blocks, block_sizes=block_sizes)
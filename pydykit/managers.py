@@ -1,6 +1,6 @@
 from . import abstract_base_classes, results, utils
 from .configuration import Configuration
-from .factories import factories
+from .factories import factories, result_factory
 from .results import Result
 
 
@@ -47,10 +47,31 @@ class Manager(abstract_base_classes.Manager):
 
     def manage(self, result=None) -> Result:
         if result is None:
-            result = Result(manager=self)
+            result = self.create_result()
 
         return self.simulator.run(result=result)
 
+    def create_result(self):
+        configuration = self.configuration.result
+
+        if configuration is None:
+            return self.simulator.create_result()
+
+        if not self.simulator.supports_result_backends:
+            raise utils.PydykitException(
+                f"Simulator {type(self.simulator).__name__} does not support"
+                + f" result {configuration.class_name}"
+            )
+
+        kwargs = configuration.model_dump()
+        kwargs.pop("class_name")
+
+        return result_factory.get(
+            key=configuration.class_name,
+            manager=self,
+            **kwargs,
+        )
+
     def _validate_integrator_system_combination(self):
 
         if hasattr(self.integrator, "parametrization") and hasattr(
@@ -0,0 +1,196 @@
+import numpy as np
+import scipy.linalg
+import scipy.sparse
+
+from . import abstract_base_classes
+
+
+class DiagonalMassOperator(abstract_base_classes.MassOperator):
+    """
+    Mass matrix given by its diagonal, e.g., lumped masses of particles.
+
+    Products, solves and inverses cost O(n), and the matrix is embedded into
+    block matrices as a sparse diagonal.
+    """
+
+    def __init__(self, diagonal):
+        self.diagonal = np.asarray(diagonal, dtype=float)
+
+    @property
+    def shape(self):
+        return (len(self.diagonal), len(self.diagonal))
+
+    def __matmul__(self, other):
+        if isinstance(other, abstract_base_classes.MassOperator):
+            other = other.toarray()
+        if scipy.sparse.issparse(other):
+            return self.to_sparse() @ other
+        other = np.asarray(other)
+        if other.ndim == 1:
+            return self.diagonal * other
+        return self.diagonal[:, np.newaxis] * other
+
+    def __rmatmul__(self, other):
+        if scipy.sparse.issparse(other):
+            return other @ self.to_sparse()
+        return np.asarray(other) * self.diagonal
+
+    def __mul__(self, scalar):
+        if not np.isscalar(scalar):
+            return NotImplemented
+        return DiagonalMassOperator(scalar * self.diagonal)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return DiagonalMassOperator(-self.diagonal)
+
+    def solve(self, rhs):
+        rhs = np.asarray(rhs)
+        if rhs.ndim == 1:
+            return rhs / self.diagonal
+        return rhs / self.diagonal[:, np.newaxis]
+
+    def inverse(self):
+        return DiagonalMassOperator(np.reciprocal(self.diagonal))
+
+    def to_sparse(self):
+        return scipy.sparse.diags_array(self.diagonal, format="csr")
+
+    def toarray(self):
+        return np.diag(self.diagonal)
+
+
+class DenseMassOperator(abstract_base_classes.MassOperator):
+    """
+    Constant dense mass matrix.
+
+    The Cholesky factor is computed on the first solve and reused afterwards.
+    Scaled operators, e.g., negated mass matrices, which are not positive definite
+    are factorized by LU decomposition instead.
+    """
+
+    def __init__(self, matrix):
+        self.matrix = np.asarray(matrix, dtype=float)
+        self.cholesky_factor = None
+        self.lu_factor = None
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    def __matmul__(self, other):
+        if isinstance(other, abstract_base_classes.MassOperator):
+            other = other.toarray()
+        return self.matrix @ other
+
+    def __rmatmul__(self, other):
+        return other @ self.matrix
+
+    def __mul__(self, scalar):
+        if not np.isscalar(scalar):
+            return NotImplemented
+        return DenseMassOperator(scalar * self.matrix)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return DenseMassOperator(-self.matrix)
+
+    def solve(self, rhs):
+        if (self.cholesky_factor is None) and (self.lu_factor is None):
+            try:
+                self.cholesky_factor = scipy.linalg.cho_factor(self.matrix)
+            except np.linalg.LinAlgError:
+                self.lu_factor = scipy.linalg.lu_factor(self.matrix)
+
+        if self.lu_factor is not None:
+            return scipy.linalg.lu_solve(self.lu_factor, rhs)
+        return scipy.linalg.cho_solve(self.cholesky_factor, rhs)
+
+    def inverse(self):
+        return DenseMassOperator(self.solve(np.eye(self.shape[0])))
+
+    def to_sparse(self):
+        return scipy.sparse.csr_array(self.matrix)
+
+    def toarray(self):
+        return self.matrix
+
+
+class BlockDiagonalMassOperator(abstract_base_classes.MassOperator):
+    """
+    Mass matrix given by dense diagonal blocks of equal size, e.g., of rigid bodies.
+
+    Products, solves and inverses act on the stack of blocks, and the matrix is
+    embedded into block matrices as a sparse block diagonal.
+    """
+
+    def __init__(self, blocks):
+        self.blocks = np.asarray(blocks, dtype=float)
+
+    @property
+    def shape(self):
+        dimension = self.blocks.shape[0] * self.blocks.shape[1]
+        return (dimension, dimension)
+
+    def split(self, other):
+        """Arranges the rows of other as (blocks, block size, ...)."""
+        return other.reshape(self.blocks.shape[:2] + other.shape[1:])
+
+    def __matmul__(self, other):
+        if isinstance(other, abstract_base_classes.MassOperator):
+            other = other.toarray()
+        if scipy.sparse.issparse(other):
+            return self.to_sparse() @ other
+        other = np.asarray(other)
+        if other.ndim == 1:
+            return np.einsum("nij,nj->ni", self.blocks, self.split(other)).ravel()
+        return (self.blocks @ self.split(other)).reshape(other.shape)
+
+    def __rmatmul__(self, other):
+        if scipy.sparse.issparse(other):
+            return other @ self.to_sparse()
+        other = np.asarray(other)
+        if other.ndim == 1:
+            return np.einsum("ni,nij->nj", self.split(other), self.blocks).ravel()
+        columns = np.swapaxes(self.split(other.T), -1, -2)
+        return np.swapaxes(columns @ self.blocks, -1, -2).reshape(other.T.shape).T
+
+    def __mul__(self, scalar):
+        if not np.isscalar(scalar):
+            return NotImplemented
+        return BlockDiagonalMassOperator(scalar * self.blocks)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return BlockDiagonalMassOperator(-self.blocks)
+
+    def solve(self, rhs):
+        rhs = np.asarray(rhs)
+        if rhs.ndim == 1:
+            return np.linalg.solve(
+                self.blocks, self.split(rhs)[..., np.newaxis]
+            ).ravel()
+        return np.linalg.solve(self.blocks, self.split(rhs)).reshape(rhs.shape)
+
+    def inverse(self):
+        return BlockDiagonalMassOperator(np.linalg.inv(self.blocks))
+
+    def to_sparse(self):
+        nbr_blocks = self.blocks.shape[0]
+        return scipy.sparse.bsr_array(
+            (self.blocks, np.arange(nbr_blocks), np.arange(nbr_blocks + 1)),
+            shape=self.shape,
+        ).tocsr()
+
+    def toarray(self):
+        return self.to_sparse().toarray()
+
+
+def as_mass_operator(matrix):
+    """Wraps dense mass matrices, operators are returned as they are."""
+    if isinstance(matrix, abstract_base_classes.MassOperator):
+        return matrix
+    return DenseMassOperator(matrix)
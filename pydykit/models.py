@@ -2,7 +2,7 @@ from typing import ClassVar
 
 from pydantic import BaseModel, ConfigDict, field_validator
 
-from .factories import factories
+from .factories import factories, result_factory
 
 
 class PydykitBaseModel(BaseModel):
@@ -58,3 +58,10 @@ class TimeStepperModel(
     PydykitBaseModel,
 ):
     factory: ClassVar = factories["time_stepper"]
+
+
+class ResultModel(
+    RegisteredClassName,
+    PydykitBaseModel,
+):
+    factory: ClassVar = result_factory
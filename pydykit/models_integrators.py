@@ -1,23 +1,45 @@
-from typing import Literal
+from typing import Literal, Optional
 
-from pydantic import NonNegativeFloat
+from pydantic import NonNegativeFloat, PositiveFloat, PositiveInt
 
 from .models import IntegratorModel
 
 
-class MidpointPH(IntegratorModel):
+class IntegratorCommon(IntegratorModel):
+    # Number of threads evaluating columns of the numerical tangent, sequential if None
+    numerical_tangent_workers: Optional[PositiveInt] = None
+    # Used for tangents which have not been implemented analytically
+    differentiation_engine: Literal[
+        "central_differences",
+        "complex_step",
+        "dual_numbers",
+    ] = "central_differences"
+
+
+class MidpointPH(IntegratorCommon):
     class_name: Literal["MidpointPH"]
 
 
-class MidpointMultibody(IntegratorModel):
+class MidpointMultibody(IntegratorCommon):
     class_name: Literal["MidpointMultibody"]
 
 
-class MidpointDAE(IntegratorModel):
+class MidpointDAE(IntegratorCommon):
     class_name: Literal["MidpointDAE"]
 
 
-class DiscreteGradientBase(IntegratorModel):
+class StoermerVerlet(IntegratorModel):
+    class_name: Literal["StoermerVerlet"]
+
+
+class Rattle(IntegratorModel):
+    class_name: Literal["Rattle"]
+    # Newton iteration over the multipliers projecting onto the constraint manifold
+    constraint_tolerance: PositiveFloat = 1e-10
+    max_iterations: PositiveInt = 20
+
+
+class DiscreteGradientBase(IntegratorCommon):
 
     increment_tolerance: NonNegativeFloat
     discrete_gradient_type: Literal[
@@ -32,3 +54,8 @@ class DiscreteGradientPHDAE(DiscreteGradientBase):
 
 class DiscreteGradientMultibody(DiscreteGradientBase):
     class_name: Literal["DiscreteGradientMultibody"]
+    discrete_gradient_type: Literal[
+        "Gonzalez_decomposed",
+        "Gonzalez",
+        "Gonzalez_elementwise",
+    ]
@@ -0,0 +1,16 @@
+from typing import Literal
+
+from pydantic import PositiveInt
+
+from .models import ResultModel
+
+
+class Result(ResultModel):
+    class_name: Literal["Result"]
+
+
+class StreamingResult(ResultModel):
+    class_name: Literal["StreamingResult"]
+
+    path: str
+    buffer_size: PositiveInt = 1000
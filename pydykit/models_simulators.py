@@ -1,15 +1,62 @@
-from typing import Literal
+from typing import Literal, Optional, Union
 
-from pydantic import NonNegativeFloat, PositiveInt
+from pydantic import NonNegativeFloat, PositiveInt, confloat, model_validator
 
 from .models import SimulatorModel
 
 
 class OneStep(SimulatorModel):
+    class_name: Literal["OneStep"]
+
     solver_name: Literal[
         "NewtonPlainPython",
+        "NewtonFactorized",
+        "NewtonSchur",
         "RootScipy",
     ]
 
     newton_epsilon: NonNegativeFloat
     max_iterations: PositiveInt
+    contraction_threshold: Optional[confloat(gt=0.0, lt=1.0)] = None
+
+    @model_validator(mode="after")
+    def check_contraction_threshold_is_used_by_solver(self):
+        if (self.contraction_threshold is not None) and (
+            self.solver_name != "NewtonFactorized"
+        ):
+            raise ValueError(
+                "contraction_threshold is only supported by solver NewtonFactorized"
+            )
+        return self
+
+
+class Ensemble(SimulatorModel):
+    class_name: Literal["Ensemble"]
+
+    newton_epsilon: NonNegativeFloat
+    max_iterations: PositiveInt
+    initial_states: Optional[list[list[float]]] = None
+    parameters: Optional[dict[str, list[Union[float, list[float]]]]] = None
+
+    @model_validator(mode="after")
+    def check_members_are_defined_consistently(self):
+        nbr_members = set()
+
+        if self.initial_states is not None:
+            nbr_members.add(len(self.initial_states))
+
+        if self.parameters is not None:
+            nbr_members.update(len(values) for values in self.parameters.values())
+
+        if len(nbr_members) == 0:
+            raise ValueError("supply initial_states and/or parameters")
+
+        if len(nbr_members) > 1:
+            raise ValueError(
+                "initial_states and parameters have to define the same number of members"
+            )
+
+        if 0 in nbr_members:
+            raise ValueError("ensemble has to have at least one member")
+
+        return self
@@ -0,0 +1,19 @@
+from typing import Any, Optional
+
+from pydantic import PositiveInt, model_validator
+
+from .models import PydykitBaseModel
+
+
+class Sweep(PydykitBaseModel):
+    # Keys are dotted paths into the configuration, e.g., "system.springs.0.stiffness"
+    grid: Optional[dict[str, list[Any]]] = None
+    samples: Optional[list[dict[str, Any]]] = None
+    max_workers: Optional[PositiveInt] = None
+    blas_threads: PositiveInt = 1
+
+    @model_validator(mode="after")
+    def check_either_grid_or_samples(self):
+        if (self.grid is None) == (self.samples is None):
+            raise ValueError("supply either grid or samples, not both")
+        return self
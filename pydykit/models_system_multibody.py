@@ -1,7 +1,7 @@
-from typing import Literal
+from typing import Literal, Optional
 
 from annotated_types import Len
-from pydantic import NonNegativeFloat, model_validator
+from pydantic import NonNegativeFloat, NonNegativeInt, model_validator
 from typing_extensions import Annotated
 
 from .models import PydykitBaseModel, SystemModel
@@ -191,3 +191,87 @@ class ParticleSystem(SystemModel):
                     assert ending.index in indices[ending.type], message
 
         return self
+
+
+class RigidBody(PydykitBaseModel):
+    index: int
+    mass: NonNegativeFloat
+    inertias: Annotated[
+        list[NonNegativeFloat],
+        Len(
+            min_length=3,
+            max_length=3,
+        ),
+    ]
+    initial_quaternion: Annotated[
+        list[float],
+        Len(
+            min_length=4,
+            max_length=4,
+        ),
+    ]
+    initial_momentum: Annotated[
+        list[float],
+        Len(
+            min_length=4,
+            max_length=4,
+        ),
+    ]
+
+
+class Joint(PydykitBaseModel):
+    start: NonNegativeInt
+    end: NonNegativeInt
+    type: Literal[
+        "fixed",
+        "revolute",
+    ]
+    axis: Optional[Literal[0, 1, 2]] = None
+
+
+class MultiRigidBodyQuaternions(SystemModel):
+
+    class_name: Literal["MultiRigidBodyQuaternions"]
+
+    nbr_spatial_dimensions: Literal[3]
+
+    bodies: Annotated[
+        list[RigidBody],
+        Len(min_length=1),
+    ]
+    joints: list[Joint]
+
+    @model_validator(mode="after")
+    def sort_bodies(self):
+        self.bodies = sort_based_on_attribute(
+            obj=self.bodies,
+            attribute="index",
+        )
+        return self
+
+    @model_validator(mode="after")
+    def enforce_body_indices_to_start_at_zero_and_be_consecutive(self):
+        indices = get_indices(self.bodies)
+        assert indices == list(
+            range(len(indices))
+        ), f"bodies-indices should start at zero and be consecutive, but found {indices}"
+        return self
+
+    @model_validator(mode="after")
+    def enforce_valid_joints(self):
+        indices = get_indices(self.bodies)
+
+        for joint in self.joints:
+            for ending_key in ["start", "end"]:
+                index = getattr(joint, ending_key)
+                assert index in indices, (
+                    f"Could not find body with index={index} "
+                    + f"requested by attribute '{ending_key}' in joint \t'{joint}'."
+                )
+
+            assert joint.start != joint.end, f"Joint connects body to itself: {joint}"
+            assert (joint.type == "revolute") == (
+                joint.axis is not None
+            ), f"Revolute joints, and only those, require an axis: {joint}"
+
+        return self
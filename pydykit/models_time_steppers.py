@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Literal, Optional
 
 from pydantic import PositiveFloat, model_validator
 
@@ -23,3 +23,20 @@ class FixedIncrement(FixedIncrementBase):
 
 class FixedIncrementHittingEnd(FixedIncrementBase):
     class_name: Literal["FixedIncrementHittingEnd"]
+
+
+class AdaptiveIncrement(FixedIncrementBase):
+    class_name: Literal["AdaptiveIncrement"]
+
+    absolute_tolerance: PositiveFloat
+    relative_tolerance: PositiveFloat
+    min_step_size: PositiveFloat = 1e-10
+    max_step_size: Optional[PositiveFloat] = None
+
+    @model_validator(mode="after")
+    def check_step_size_bounds(self):
+        if self.min_step_size > self.step_size:
+            raise ValueError("min_step_size must not be greater than step_size")
+        if (self.max_step_size is not None) and (self.max_step_size < self.step_size):
+            raise ValueError("max_step_size must not be less than step_size")
+        return self
@@ -1,36 +1,41 @@
 import numpy as np
 
+# All operators act on the trailing axis of quaternion arrays of shape (..., 4),
+# such that stacks of quaternions of shape (N, 4) yield stacks of operators.
+
 
 def decompose_quaternion(quaternion):
-    scalar = quaternion[0]
-    vector = quaternion[1:]
+    scalar = quaternion[..., 0]
+    vector = quaternion[..., 1:]
     return scalar, vector
 
 
 def hat_map(quat):
 
-    assert len(quat) == 4, "Expect vector to be of length four"
+    assert quat.shape[-1] == 4, "Expect vector to be of length four"
+
+    zero = 0.0 * quat[..., 0]
 
-    return np.array(
+    return np.stack(
         [
-            [0.0, -quat[3], quat[2]],
-            [quat[3], 0.0, -quat[1]],
-            [-quat[2], quat[1], 0.0],
-        ]
+            np.stack([zero, -quat[..., 3], quat[..., 2]], axis=-1),
+            np.stack([quat[..., 3], zero, -quat[..., 1]], axis=-1),
+            np.stack([-quat[..., 2], quat[..., 1], zero], axis=-1),
+        ],
+        axis=-2,
     )
 
 
 def transformation_matrix(quat, sign=1.0):
-    tmp = np.concatenate(
+    scalar = quat[..., 0, np.newaxis, np.newaxis]
+
+    return np.concatenate(
         [
-            -quat[1:, np.newaxis],
-            quat[0] * np.eye(3) + sign * hat_map(quat=quat),
+            -quat[..., 1:, np.newaxis],
+            scalar * np.eye(3) + sign * hat_map(quat=quat),
         ],
-        axis=1,
+        axis=-1,
     )
-    assert tmp.shape == (3, 4)
-
-    return tmp
 
 
 def spatial_transformation_matrix(quat):
@@ -46,20 +51,59 @@ def transf_matrix_sym(quat, sign=1.0):
     spatial = spatial_transformation_matrix(quat=quat)
     convective = convective_transformation_matrix(quat=quat)
 
-    return spatial @ convective.T
+    return spatial @ np.swapaxes(convective, -1, -2)
+
+
+def multiplication_matrix(quat, transformation):
+    return np.concatenate(
+        [
+            quat[..., np.newaxis],
+            np.swapaxes(transformation, -1, -2),
+        ],
+        axis=-1,
+    )
 
 
 def left_multiplation_matrix(quat):
+    """Matrix Q_l(quat) such that Q_l(quat) @ other equals quaternion_product(quat, other)."""
+    return multiplication_matrix(
+        quat=quat,
+        transformation=convective_transformation_matrix(quat),
+    )
+
 
-    G_q = convective_transformation_matrix(quat)
+def right_multiplication_matrix(quat):
+    """Matrix Q_r(quat) such that Q_r(quat) @ other equals quaternion_product(other, quat)."""
+    return multiplication_matrix(
+        quat=quat,
+        transformation=spatial_transformation_matrix(quat),
+    )
 
-    tmp = np.block([np.array([quat]).T, G_q.T])
 
-    assert tmp.shape == (4, 4)
+def conjugate_quaternion(quat):
+    return quat * np.array([1.0, -1.0, -1.0, -1.0])
 
-    return tmp
+
+def quaternion_product(left, right):
+    """Quaternion product of left and right, broadcasting over leading axes."""
+    a0, a1, a2, a3 = (left[..., index] for index in range(4))
+    b0, b1, b2, b3 = (right[..., index] for index in range(4))
+
+    return np.stack(
+        [
+            a0 * b0 - a1 * b1 - a2 * b2 - a3 * b3,
+            a0 * b1 + a1 * b0 + a2 * b3 - a3 * b2,
+            a0 * b2 - a1 * b3 + a2 * b0 + a3 * b1,
+            a0 * b3 + a1 * b2 - a2 * b1 + a3 * b0,
+        ],
+        axis=-1,
+    )
 
 
 def quaternion_velocity(quaternion_position: np.array, angular_velocity: np.array):
-    G_q = convective_transformation_matrix(quat=quaternion_position)
-    return 0.5 * G_q.T @ angular_velocity
+    # 0.5 * G(q).T @ omega equals half the product of q with the pure quaternion of omega
+    pure_quaternion = np.concatenate(
+        [0.0 * angular_velocity[..., :1], angular_velocity],
+        axis=-1,
+    )
+    return 0.5 * quaternion_product(quaternion_position, pure_quaternion)
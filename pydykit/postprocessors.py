@@ -2,6 +2,7 @@ import numpy as np
 import pandas as pd
 
 from . import utils
+from .time_steppers import TimeStep
 
 
 class Postprocessor:
@@ -13,127 +14,128 @@ class Postprocessor:
     ):
 
         self.manager = manager
-        self.nbr_time_point = self.manager.time_stepper.nbr_time_points
         self.results_df = state_results_df
+        self.nbr_time_point = len(self.results_df)
         self.evaluation_strategy_factory = EvaluationStrategyFactory(self)
 
     @property
     def state_results_df(self):
         return self.results_df[self.manager.system.state_columns]
 
+    def make_steps(self):
+        # Steps are derived from the stored times, as adaptive time steppers cannot reproduce them.
+        # The increment points forward to the next stored time.
+        times = self.results_df["time"].to_numpy()
+        increments = np.append(np.diff(times), np.nan)
+        for index, (time, increment) in enumerate(zip(times, increments)):
+            yield TimeStep(index=index, time=time, increment=increment)
+
     @property
     def available_evaluation_points(self):
-        return list(self._evaluation_strategies.keys())
+        return list(self.evaluation_strategy_factory.strategies.keys())
 
     def postprocess(self, quantities_and_evaluation_points):
 
+        # Work on the plain array of states, avoiding row access to the DataFrame
+        states = self.state_results_df.to_numpy()
+
         for quantity, evaluation_points in quantities_and_evaluation_points.items():
 
             for evaluation_point in evaluation_points:
-                steps = self.manager.time_stepper.make_steps()
 
                 if hasattr(self.manager.system, quantity):
+                    strategy = self.evaluation_strategy_factory.get_strategy(
+                        eval_point=evaluation_point
+                    )
+                    data = strategy(states=states, quantity=quantity)
 
-                    # Determine function dimensions and initialize data
-                    system_function = getattr(self.manager.system, quantity)
-                    dimension = system_function().ndim
-                    data = np.zeros([self.nbr_time_point, dimension + 1])
-
-                    # Evaluate and collect data for each time point
-                    for step in steps:
-                        strategy = self.evaluation_strategy_factory.get_strategy(
-                            eval_point=evaluation_point
-                        )
-                        data[step.index] = strategy(
-                            system=self.manager.system,
-                            quantity=quantity,
-                            step_index=step.index,
-                        )
                 elif hasattr(self.manager.integrator, quantity):
-                    integrator_function = getattr(self.manager.integrator, quantity)
-
-                    dimension = integrator_function(
-                        current_state=self.manager.system.state,
-                        next_state=self.manager.system.state,
-                        current_step=self.manager.time_stepper.current_step,
-                    ).ndim
-                    data = np.zeros([self.nbr_time_point, dimension + 1])
-
-                    for step in steps:
-                        if step.index + 1 == self.nbr_time_point:
-                            data[step.index] = np.nan
-
-                        else:
-
-                            current_state = utils.row_array_from_df(
-                                df=self.state_results_df, index=step.index
-                            )
-
-                            next_state = utils.row_array_from_df(
-                                df=self.state_results_df, index=step.index + 1
-                            )
-
-                            data[step.index] = integrator_function(
-                                current_state=current_state,
-                                next_state=next_state,
-                                current_step=step,
-                            )
+                    data = self._evaluate_integrator_quantity(
+                        states=states, quantity=quantity
+                    )
+
                 else:
                     raise utils.PydykitException(
-                        f"{quantity} is not suitable for postprocessing since its not a method of {self.manager.system} and not contained in {self.postprocessed_data_from_integrator}"
+                        f"{quantity} is not suitable for postprocessing since its not a method of {self.manager.system} and not a method of {self.manager.integrator}"
                     )
 
                 # Handle DataFrame column naming and assignment
                 self._assign_to_dataframe(
                     data=data,
                     quantity=quantity,
-                    dimension=dimension,
                     eval_point=evaluation_point,
                 )
 
-    def _evaluate_current_time(self, system, quantity, step_index):
-        system_current_time = self.update_system(system=system, index=step_index)
-        return getattr(system_current_time, quantity)()
-
-    def _evaluate_interval_midpoint(self, system, quantity, step_index):
-        if step_index + 1 == self.nbr_time_point:
-            return np.nan
+    @property
+    def is_batched(self):
+        return getattr(self.manager.system, "supports_batched_states", False)
+
+    def evaluate_at_states(self, states, quantity):
+        """Evaluates a system quantity for each row of states"""
+        if self.is_batched:
+            # Single evaluation on all states, stacked to shape (nbr_states, dim_state)
+            system = self.manager.system.view(state=states)
+            return np.asarray(getattr(system, quantity)())
+
+        return np.array(
+            [
+                getattr(self.manager.system.view(state=state), quantity)()
+                for state in states
+            ]
+        )
 
-        system_current_time = self.update_system(system=system, index=step_index)
-        system_next_time = self.update_system(system=system, index=step_index + 1)
-        state_midpoint = 0.5 * (system_current_time.state + system_next_time.state)
+    def _evaluate_current_time(self, states, quantity):
+        return self.evaluate_at_states(states=states, quantity=quantity)
 
-        system_current_time, system_midpoint = (
-            utils.get_system_copies_with_desired_states(
-                system=self.manager.system,
-                states=[system_current_time.state, state_midpoint],
-            )
+    def _evaluate_interval_midpoint(self, states, quantity):
+        states_midpoint = 0.5 * (states[:-1] + states[1:])
+        return append_nan(
+            self.evaluate_at_states(states=states_midpoint, quantity=quantity)
         )
-        return getattr(system_midpoint, quantity)()
 
-    def _evaluate_interval_increment(self, system, quantity, step_index):
-        if step_index + 1 == self.nbr_time_point:
-            return np.nan
+    def _evaluate_interval_increment(self, states, quantity):
+        values = self.evaluate_at_states(states=states, quantity=quantity)
+        return append_nan(values[1:] - values[:-1])
+
+    def _evaluate_integrator_quantity(self, states, quantity):
+        integrator_function = getattr(self.manager.integrator, quantity)
+        steps = list(self.make_steps())[:-1]
+
+        if self.is_batched and getattr(
+            self.manager.integrator, "supports_batched_states", False
+        ):
+            step = TimeStep(
+                index=np.array([step.index for step in steps]),
+                time=np.array([step.time for step in steps]),
+                increment=np.array([step.increment for step in steps]),
+            )
+            values = integrator_function(
+                current_state=states[:-1],
+                next_state=states[1:],
+                current_step=step,
+            )
+        else:
+            values = np.array(
+                [
+                    integrator_function(
+                        current_state=states[step.index],
+                        next_state=states[step.index + 1],
+                        current_step=step,
+                    )
+                    for step in steps
+                ]
+            )
 
-        system_current_time = self.update_system(system=system, index=step_index)
-        system_next_time = self.update_system(system=system, index=step_index + 1)
-        return (
-            getattr(system_next_time, quantity)()
-            - getattr(system_current_time, quantity)()
-        )
+        return append_nan(np.asarray(values))
 
-    def _assign_to_dataframe(self, data, quantity, dimension, eval_point):
-        if dimension == 0:
+    def _assign_to_dataframe(self, data, quantity, eval_point):
+        if data.ndim == 1:
             column = f"{quantity}_{eval_point}"
-            self.results_df[column] = data.squeeze()
+            self.results_df[column] = data
         else:
-            column = [(f"{quantity}_{eval_point}_{i}") for i in range(dimension + 1)]
+            column = [(f"{quantity}_{eval_point}_{i}") for i in range(data.shape[1])]
             self.results_df[column] = data
 
-    def update_system(self, system, index):
-        updated_state = utils.row_array_from_df(df=self.state_results_df, index=index)
-        return system.copy(state=updated_state)
-
     def add_sum_of(self, quantities, sum_name):
 
         self.results_df[sum_name] = self.results_df[quantities].sum(
@@ -152,3 +154,8 @@ class EvaluationStrategyFactory:
 
     def get_strategy(self, eval_point):
         return self.strategies[eval_point]
+
+
+def append_nan(values):
+    # Interval quantities are not defined for the last point in time
+    return np.concatenate([values, np.full((1,) + values.shape[1:], np.nan)])
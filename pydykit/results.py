@@ -1,21 +1,241 @@
+import json
+import os
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
 
+from . import utils
+
 
 class Result:
+    """
+    Container of states and times.
+
+    The arrays are preallocated based on the number of time points of the time stepper
+    and grow as needed, e.g., for adaptive time steppers.
+    Only the first `nbr_stored` entries are valid.
+    """
+
     def __init__(self, manager):
         self.manager = manager
-        self.results = np.zeros(
-            (self.manager.time_stepper.nbr_time_points, self.manager.system.dim_state)
+        nbr_time_points = self.manager.time_stepper.nbr_time_points
+        self.results = np.zeros((nbr_time_points,) + self.manager.system.state.shape)
+        self.times = np.zeros((nbr_time_points))
+
+        self.results[0] = self.manager.system.state
+        self.nbr_stored = 1
+
+    def store(self, index, time, state):
+        capacity = len(self.times)
+        if index >= capacity:
+            nbr_additional = max(capacity, index + 1 - capacity)
+            self.times = np.concatenate([self.times, np.zeros(nbr_additional)])
+            self.results = np.concatenate(
+                [self.results, np.zeros((nbr_additional,) + self.results.shape[1:])]
+            )
+
+        self.times[index] = time
+        self.results[index] = state
+        self.nbr_stored = max(self.nbr_stored, index + 1)
+
+    def flush(self):
+        # Everything is kept in memory
+        pass
+
+    @property
+    def stored_times(self):
+        return self.times[: self.nbr_stored]
+
+    @property
+    def stored_results(self):
+        return self.results[: self.nbr_stored]
+
+    def to_df(self) -> pd.DataFrame:
+        df = pd.DataFrame(
+            data=self.stored_results,
+            columns=self.manager.system.state_columns,
         )
-        self.times = np.zeros((self.manager.time_stepper.nbr_time_points))
+        df["time"] = self.stored_times
+        return df
+
 
-        self.results[0, :] = self.manager.system.state
+class EnsembleResult(Result):
+    def __init__(self, manager, nbr_members):
+        super().__init__(manager=manager)
+        self.nbr_members = nbr_members
 
     def to_df(self) -> pd.DataFrame:
+        """Long format, i.e., rows of all members are stacked and labeled by column `member`"""
+        df = pd.DataFrame(
+            data=self.stored_results.transpose(1, 0, 2).reshape(
+                -1, self.manager.system.dim_state
+            ),
+            columns=self.manager.system.state_columns,
+        )
+        df["time"] = np.tile(self.stored_times, self.nbr_members)
+        df["member"] = np.repeat(np.arange(self.nbr_members), self.nbr_stored)
+        return df
+
+    def member_to_df(self, member: int) -> pd.DataFrame:
         df = pd.DataFrame(
-            data=self.results,
+            data=self.stored_results[:, member, :],
             columns=self.manager.system.state_columns,
         )
-        df["time"] = self.times
+        df["time"] = self.stored_times
+        return df
+
+
+class StreamingResult:
+    """
+    Writes states and times to a directory of chunked `.npy` files during the run.
+
+    At most `buffer_size` time points are kept in memory.
+    A full buffer is written as a new chunk and registered in `metadata.json`,
+    which is replaced atomically. Readers, see `ResultReader`, therefore only ever
+    see complete chunks and may open the directory while the run is in progress.
+    """
+
+    def __init__(self, manager, path, buffer_size: int = 1000):
+        self.manager = manager
+        self.path = Path(path)
+        self.buffer_size = buffer_size
+
+        self.state_columns = list(self.manager.system.state_columns)
+        if self.manager.system.state.shape != (len(self.state_columns),):
+            raise utils.PydykitException(
+                "StreamingResult supports states of shape (dim_state,) only"
+            )
+
+        self.buffer = np.zeros((self.buffer_size, 1 + len(self.state_columns)))
+        self.nbr_buffered = 0
+        self.nbr_flushed = 0
+        self.chunks = []
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.remove_existing_chunks()
+        self.write_metadata()
+
+    @property
+    def nbr_stored(self):
+        return self.nbr_flushed + self.nbr_buffered
+
+    def store(self, index, time, state):
+        if self.nbr_flushed <= index < self.nbr_stored:
+            # Overwrite a buffered time point
+            position = index - self.nbr_flushed
+        elif index == self.nbr_stored:
+            if self.nbr_buffered == self.buffer_size:
+                self.flush()
+            position = self.nbr_buffered
+            self.nbr_buffered += 1
+        else:
+            raise utils.PydykitException(
+                f"Cannot store time point {index}, "
+                + f"expected time point {self.nbr_stored} or a buffered one"
+            )
+
+        self.buffer[position, 0] = time
+        self.buffer[position, 1:] = state
+
+    def flush(self):
+        if self.nbr_buffered == 0:
+            return
+
+        data = self.buffer[: self.nbr_buffered]
+        file_name = f"chunk_{len(self.chunks):06d}.npy"
+        path_tmp = self.path.joinpath(file_name + ".tmp")
+        with open(path_tmp, "wb") as file:
+            np.save(file, data)
+        os.replace(path_tmp, self.path.joinpath(file_name))
+
+        self.chunks.append(
+            dict(
+                file=file_name,
+                nbr_time_points=self.nbr_buffered,
+                start_time=float(data[0, 0]),
+                end_time=float(data[-1, 0]),
+            )
+        )
+        self.nbr_flushed += self.nbr_buffered
+        self.nbr_buffered = 0
+        self.write_metadata()
+
+    def write_metadata(self):
+        metadata = dict(
+            state_columns=self.state_columns,
+            nbr_time_points=self.nbr_flushed,
+            chunks=self.chunks,
+        )
+        path_tmp = self.path.joinpath(ResultReader.METADATA_FILE_NAME + ".tmp")
+        with open(path_tmp, "w") as file:
+            json.dump(metadata, file)
+        os.replace(path_tmp, self.path.joinpath(ResultReader.METADATA_FILE_NAME))
+
+    def remove_existing_chunks(self):
+        for path in self.path.glob("chunk_*.npy"):
+            path.unlink()
+
+    def to_df(self, columns=None, start_time=None, end_time=None) -> pd.DataFrame:
+        self.flush()
+        return ResultReader(path=self.path).to_df(
+            columns=columns,
+            start_time=start_time,
+            end_time=end_time,
+        )
+
+
+class ResultReader:
+    """Lazily reads results written by `StreamingResult`, also while the run is in progress."""
+
+    METADATA_FILE_NAME = "metadata.json"
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def read_metadata(self):
+        with open(self.path.joinpath(self.METADATA_FILE_NAME), "r") as file:
+            return json.load(file)
+
+    @property
+    def state_columns(self):
+        return self.read_metadata()["state_columns"]
+
+    def to_df(self, columns=None, start_time=None, end_time=None) -> pd.DataFrame:
+        """
+        Loads the given state columns of all time points within [start_time, end_time].
+        Only chunks overlapping the time interval are read, each as memory map.
+        """
+        metadata = self.read_metadata()
+        state_columns = metadata["state_columns"]
+        columns = state_columns if columns is None else list(columns)
+
+        unknown = set(columns) - set(state_columns)
+        if unknown:
+            raise utils.PydykitException(f"Unknown columns {sorted(unknown)}")
+
+        # First entry of each row is the time
+        column_indices = [1 + state_columns.index(column) for column in columns]
+        start_time = -np.inf if start_time is None else start_time
+        end_time = np.inf if end_time is None else end_time
+
+        times = []
+        data = []
+        for chunk in metadata["chunks"]:
+            if (chunk["end_time"] < start_time) or (chunk["start_time"] > end_time):
+                continue
+
+            array = np.load(self.path.joinpath(chunk["file"]), mmap_mode="r")
+            chunk_times = array[:, 0]
+            rows = np.flatnonzero(
+                (chunk_times >= start_time) & (chunk_times <= end_time)
+            )
+            times.append(chunk_times[rows])
+            data.append(array[np.ix_(rows, column_indices)])
+
+        df = pd.DataFrame(
+            data=np.concatenate(data) if data else np.zeros((0, len(columns))),
+            columns=columns,
+        )
+        df["time"] = np.concatenate(times) if times else np.zeros(0)
         return df
@@ -1,11 +1,70 @@
-from . import abstract_base_classes, solvers, utils
+import numpy as np
+
+from . import abstract_base_classes, results, solvers, utils
 
 
 class Simulator(abstract_base_classes.Simulator):
 
+    supports_result_backends = True
+
     def __init__(self, manager: abstract_base_classes.Manager):
         self.manager = manager
 
+    def create_result(self):
+        return results.Result(manager=self.manager)
+
+    def run_steps(self, result):
+        time_stepper = self.manager.time_stepper
+        manager = self.manager
+        manager._validate_integrator_system_combination()
+
+        # Structured solvers are told the block layout of the tangent
+        if getattr(self.solver, "uses_tangent_block_sizes", False):
+            self.solver.block_sizes = manager.integrator.get_tangent_block_sizes()
+
+        # Initialze the time stepper
+        steps = time_stepper.make_steps()
+        step = next(steps)
+
+        # First step
+        result.store(index=step.index, time=step.time, state=manager.system.state)
+        utils.print_current_step(step)
+
+        # Do remaining steps, until stepper stops
+        for step in steps:
+
+            if self.solver.has_failed:
+                break
+
+            # Calc next state
+            current_state = manager.system.state
+            if getattr(manager.integrator, "is_explicit", False):
+                next_state = manager.integrator.get_next_state()
+            else:
+                next_state = self.solver.solve(
+                    func=manager.integrator.get_residuum,
+                    jacobian=manager.integrator.get_tangent,
+                    initial=current_state,
+                )
+
+            # Adaptive time steppers may reject the step and retry with another increment
+            if not time_stepper.accept_step(
+                current_state=current_state,
+                next_state=next_state,
+            ):
+                continue
+
+            # Store results
+            result.store(index=step.index, time=step.time, state=next_state)
+            manager.system.state = next_state
+
+            # Print
+            utils.print_current_step(step)
+
+        result.flush()
+
+        return result
+
 
 class OneStep(Simulator):
 
@@ -14,6 +73,7 @@ class OneStep(Simulator):
         solver_name: str,
         newton_epsilon: float,
         max_iterations: int,
+        contraction_threshold: float = None,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -23,43 +83,97 @@ class OneStep(Simulator):
             solver_name,
         )
 
-        self.solver = solver_constructor(
+        solver_kwargs = dict(
             newton_epsilon=newton_epsilon,
             max_iterations=max_iterations,
         )
+        if contraction_threshold is not None:
+            solver_kwargs["contraction_threshold"] = contraction_threshold
+
+        self.solver = solver_constructor(**solver_kwargs)
 
     def run(self, result):
-        time_stepper = self.manager.time_stepper
-        manager = self.manager
-        manager._validate_integrator_system_combination()
+        return self.run_steps(result=result)
 
-        # Initialze the time stepper
-        steps = time_stepper.make_steps()
-        step = next(steps)
 
-        # First step
-        result.times[step.index] = step.time
-        utils.print_current_step(step)
+class Ensemble(Simulator):
+    """
+    Advances a batch of initial states and/or system parameters at once.
 
-        # Do remaining steps, until stepper stops
-        for step in steps:
+    The system state is stacked to shape (n_members, dim_state).
+    Parameters are given as lists holding one value per member and
+    replace the corresponding system attributes.
+    """
 
-            if not self.solver.has_failed:
-                # Calc next state
-                next_state = self.solver.solve(
-                    func=manager.integrator.get_residuum,
-                    jacobian=manager.integrator.get_tangent,
-                    initial=manager.system.state,
-                )
+    supports_result_backends = False
 
-                # Store results
-                result.times[step.index] = step.time
-                result.results[step.index, :] = manager.system.state = next_state
+    def __init__(
+        self,
+        newton_epsilon: float,
+        max_iterations: int,
+        initial_states: list = None,
+        parameters: dict = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
 
-                # Print
-                utils.print_current_step(step)
+        self.initial_states = initial_states
+        self.parameters = {} if parameters is None else parameters
 
-            else:
-                return result
+        self.solver = solvers.NewtonBatched(
+            newton_epsilon=newton_epsilon,
+            max_iterations=max_iterations,
+        )
 
-        return result
+        if self.initial_states is not None:
+            self.nbr_members = len(self.initial_states)
+        else:
+            self.nbr_members = len(next(iter(self.parameters.values())))
+
+        self.is_batched = False
+
+    def batch_system(self):
+        if self.is_batched:
+            return
+
+        self.validate_support_of_batched_states()
+        system = self.manager.system
+
+        for name, values in self.parameters.items():
+            if not hasattr(system, name):
+                raise utils.PydykitException(
+                    f"System {type(system).__name__} has no parameter {name}"
+                )
+            setattr(system, name, np.asarray(values, dtype=np.float64))
+
+        if self.initial_states is not None:
+            state = np.array(self.initial_states, dtype=np.float64)
+            if state.shape[-1] != system.dim_state:
+                raise utils.PydykitException(
+                    f"Initial states have to be of dimension {system.dim_state}"
+                )
+        else:
+            state = np.tile(system.state, (self.nbr_members, 1))
+
+        system.state = state
+        self.is_batched = True
+
+    def validate_support_of_batched_states(self):
+        for key in ["system", "integrator"]:
+            obj = getattr(self.manager, key)
+            if not getattr(obj, "supports_batched_states", False):
+                raise utils.PydykitException(
+                    f"{type(obj).__name__} does not support batched states"
+                    + " and can therefore not be used with simulator Ensemble"
+                )
+
+    def create_result(self):
+        self.batch_system()
+        return results.EnsembleResult(
+            manager=self.manager,
+            nbr_members=self.nbr_members,
+        )
+
+    def run(self, result):
+        self.batch_system()
+        return self.run_steps(result=result)
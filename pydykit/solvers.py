@@ -1,4 +1,7 @@
 import numpy as np
+import scipy.linalg
+import scipy.sparse
+import scipy.sparse.linalg
 from scipy.optimize import fsolve
 
 from . import abstract_base_classes, utils
@@ -31,7 +34,12 @@ class NewtonPlainPython(Iterative):
             index_iteration += 1
             residual = func(initial)
             tangent_matrix = jacobian(initial)
-            state_delta = -np.linalg.inv(tangent_matrix) @ residual
+            if scipy.sparse.issparse(tangent_matrix):
+                state_delta = -scipy.sparse.linalg.spsolve(
+                    tangent_matrix.tocsc(), residual
+                )
+            else:
+                state_delta = -np.linalg.inv(tangent_matrix) @ residual
             initial = initial + state_delta
             residual_norm = np.linalg.norm(residual)
             utils.print_residual_norm(value=residual_norm)
@@ -45,6 +53,273 @@ class NewtonPlainPython(Iterative):
         return initial
 
 
+class NewtonFactorized(Iterative):
+    """
+    Newton scheme reusing an LU factorization of the tangent (simplified Newton).
+
+    The factorization is kept across iterations and time steps.
+    The tangent is only re-evaluated if the contraction rate,
+    i.e., the ratio of subsequent residual norms, exceeds `contraction_threshold`.
+    A step computed with an outdated factorization which does not contract sufficiently
+    is discarded and recomputed with a fresh tangent.
+    """
+
+    def __init__(
+        self,
+        newton_epsilon: float,
+        max_iterations: int,
+        contraction_threshold: float = 0.5,
+    ):
+        super().__init__(
+            newton_epsilon=newton_epsilon,
+            max_iterations=max_iterations,
+        )
+        self.contraction_threshold = contraction_threshold
+        self.factorization = None
+        self.nbr_factorizations = 0
+
+    def factorize(self, tangent_matrix):
+        if scipy.sparse.issparse(tangent_matrix):
+            self.factorization = scipy.sparse.linalg.splu(tangent_matrix.tocsc()).solve
+        else:
+            lu_and_piv = scipy.linalg.lu_factor(tangent_matrix)
+            self.factorization = lambda rhs: scipy.linalg.lu_solve(lu_and_piv, rhs)
+
+        self.nbr_factorizations += 1
+
+    def solve(self, func, jacobian, initial):
+
+        residual = func(initial)
+        residual_norm = np.linalg.norm(residual)
+        utils.print_residual_norm(value=residual_norm)
+        index_iteration = 0
+
+        while (residual_norm >= self.newton_epsilon) and (
+            index_iteration < self.max_iterations
+        ):
+            index_iteration += 1
+
+            is_fresh = self.factorization is None
+            if is_fresh:
+                self.factorize(jacobian(initial))
+
+            candidate = initial - self.factorization(residual)
+            candidate_residual = func(candidate)
+            candidate_residual_norm = np.linalg.norm(candidate_residual)
+
+            if candidate_residual_norm > self.contraction_threshold * residual_norm:
+                # Refresh the tangent in the next iteration
+                self.factorization = None
+
+                if not is_fresh:
+                    # Discard step based on outdated tangent
+                    continue
+
+            initial = candidate
+            residual = candidate_residual
+            residual_norm = candidate_residual_norm
+            utils.print_residual_norm(value=residual_norm)
+
+        if residual_norm < self.newton_epsilon:
+            pass
+        else:
+            print("Newton convergence not succesful!")
+            self.has_failed = True
+
+        return initial
+
+
+class NewtonSchur(Iterative):
+    """
+    Newton scheme exploiting the saddle-point structure of constrained multibody tangents.
+
+    The tangent is partitioned according to `block_sizes`, i.e., position, momentum and multiplier
+    blocks of the form [[A, B, 0], [C, D, E], [F, 0, 0]].
+    If the position-momentum coupling B is diagonal, e.g., a scaled inverse mass matrix of particles,
+    the momentum is eliminated explicitly. The remaining position block is factorized once per iteration
+    and the multipliers follow from a small Schur complement of size nbr_constraints.
+    Without block sizes or a diagonal coupling, the complete tangent is solved.
+    """
+
+    uses_tangent_block_sizes = True
+
+    def __init__(
+        self,
+        newton_epsilon: float,
+        max_iterations: int,
+    ):
+        super().__init__(
+            newton_epsilon=newton_epsilon,
+            max_iterations=max_iterations,
+        )
+        self.block_sizes = None
+
+    def solve(self, func, jacobian, initial):
+
+        # Newton iteration starts
+        residual_norm = 1e5
+        index_iteration = 0
+
+        # Iterate while residual isnt zero and max. iterations number isnt reached
+        while (residual_norm >= self.newton_epsilon) and (
+            index_iteration < self.max_iterations
+        ):
+            index_iteration += 1
+            residual = func(initial)
+            tangent_matrix = jacobian(initial)
+            state_delta = self.solve_linear_system(tangent_matrix, -residual)
+            initial = initial + state_delta
+            residual_norm = np.linalg.norm(residual)
+            utils.print_residual_norm(value=residual_norm)
+
+        if residual_norm < self.newton_epsilon:
+            pass
+        else:
+            print("Newton convergence not succesful!")
+            self.has_failed = True
+
+        return initial
+
+    def solve_linear_system(self, tangent_matrix, rhs):
+        if self.block_sizes is None:
+            return solve_directly(tangent_matrix, rhs)
+
+        nbr_dof, _, nbr_constraints = self.block_sizes
+        blocks = get_blocks(tangent_matrix, self.block_sizes)
+        coupling = get_diagonal(blocks[0][1])
+        is_saddle_point = all(
+            np.count_nonzero(utils.to_dense(block)) == 0
+            for block in [blocks[0][2], blocks[2][1], blocks[2][2]]
+        )
+
+        if (coupling is None) or (not is_saddle_point):
+            return solve_directly(tangent_matrix, rhs)
+
+        rhs_q, rhs_p, rhs_lambda = np.split(rhs, [nbr_dof, 2 * nbr_dof])
+        A, C, D, E, F = (
+            blocks[0][0],
+            blocks[1][0],
+            blocks[1][1],
+            blocks[1][2],
+            blocks[2][0],
+        )
+
+        # Eliminate the momentum by dp = B^-1 (rhs_q - A dq)
+        reduced_matrix = C - D @ scale_rows(A, 1.0 / coupling)
+        reduced_rhs = rhs_p - D @ (rhs_q / coupling)
+
+        reduced_solve = factorize(reduced_matrix)
+
+        if nbr_constraints == 0:
+            delta_q = reduced_solve(reduced_rhs)
+            delta_lambda = rhs_lambda
+        else:
+            # Schur complement of the multipliers
+            R_inv_E = reduced_solve(utils.to_dense(E))
+            R_inv_rhs = reduced_solve(reduced_rhs)
+            schur_complement = utils.to_dense(F @ R_inv_E)
+            delta_lambda = np.linalg.solve(
+                schur_complement,
+                F @ R_inv_rhs - rhs_lambda,
+            )
+            delta_q = R_inv_rhs - R_inv_E @ delta_lambda
+
+        delta_p = (rhs_q - A @ delta_q) / coupling
+
+        return np.concatenate([delta_q, delta_p, delta_lambda])
+
+
+def solve_directly(matrix, rhs):
+    if scipy.sparse.issparse(matrix):
+        return scipy.sparse.linalg.spsolve(matrix.tocsc(), rhs)
+    return np.linalg.solve(matrix, rhs)
+
+
+def factorize(matrix):
+    """Returns a function solving linear systems with matrix for one or several right-hand sides."""
+    if scipy.sparse.issparse(matrix):
+        return scipy.sparse.linalg.splu(scipy.sparse.csc_array(matrix)).solve
+
+    lu_and_piv = scipy.linalg.lu_factor(matrix)
+    return lambda rhs: scipy.linalg.lu_solve(lu_and_piv, rhs)
+
+
+def get_blocks(matrix, block_sizes):
+    offsets = np.concatenate([[0], np.cumsum(block_sizes)])
+
+    if scipy.sparse.issparse(matrix):
+        matrix = scipy.sparse.csr_array(matrix)
+
+    return [
+        [
+            matrix[
+                offsets[row] : offsets[row + 1], offsets[column] : offsets[column + 1]
+            ]
+            for column in range(len(block_sizes))
+        ]
+        for row in range(len(block_sizes))
+    ]
+
+
+def get_diagonal(matrix):
+    """Diagonal of matrix, or None if matrix has off-diagonal or vanishing diagonal entries."""
+    if scipy.sparse.issparse(matrix):
+        matrix = scipy.sparse.coo_array(matrix)
+        is_diagonal = np.all((matrix.row == matrix.col) | (matrix.data == 0.0))
+    else:
+        is_diagonal = np.count_nonzero(matrix - np.diag(np.diag(matrix))) == 0
+
+    diagonal = matrix.diagonal()
+
+    if not is_diagonal or np.any(diagonal == 0.0):
+        return None
+
+    return diagonal
+
+
+def scale_rows(matrix, factors):
+    if scipy.sparse.issparse(matrix):
+        return scipy.sparse.diags_array(factors, format="csr") @ matrix
+    return factors[:, np.newaxis] * matrix
+
+
+class NewtonBatched(Iterative):
+    """
+    Newton scheme for stacked states of shape (n_members, dim_state).
+
+    Residuals and tangents of all members are evaluated at once and the stacked
+    linear systems are solved with a single call to `np.linalg.solve`.
+    Members which already converged are no longer updated.
+    """
+
+    def solve(self, func, jacobian, initial):
+
+        index_iteration = 0
+        is_converged = np.zeros(initial.shape[:-1], dtype=bool)
+
+        while (not np.all(is_converged)) and (index_iteration < self.max_iterations):
+            index_iteration += 1
+            residual = func(initial)
+            residual_norms = np.linalg.norm(residual, axis=-1)
+            is_converged = residual_norms < self.newton_epsilon
+
+            if np.all(is_converged):
+                break
+
+            tangent_matrix = jacobian(initial)
+            state_delta = -utils.solve(tangent_matrix, residual)
+            initial = np.where(
+                is_converged[..., np.newaxis], initial, initial + state_delta
+            )
+            utils.print_residual_norm(value=np.max(residual_norms))
+
+        if not np.all(is_converged):
+            print("Newton convergence not succesful!")
+            self.has_failed = True
+
+        return initial
+
+
 class RootScipy(Iterative):
     def solve(self, func, jacobian, initial):
 
@@ -53,7 +328,7 @@ class RootScipy(Iterative):
         solution = fsolve(
             func=func,
             x0=initial,
-            fprime=jacobian,
+            fprime=lambda state: utils.to_dense(jacobian(state)),
             xtol=self.newton_epsilon,
         )
 
@@ -0,0 +1,195 @@
+"""
+Parameter sweeps running one simulation per parameter set in separate worker processes.
+
+A sweep is defined by a base configuration and either a grid,
+i.e., the cartesian product of parameter values, or a list of samples.
+Parameters are addressed by dotted paths into the configuration,
+e.g., ``system.constants``, ``time_stepper.step_size`` or ``system.springs.0.stiffness``.
+"""
+
+import concurrent.futures
+import contextlib
+import copy
+import itertools
+import multiprocessing
+import os
+import traceback
+
+import pandas as pd
+
+from . import utils
+from .configuration import Configuration
+from .managers import Manager
+from .models_sweeps import Sweep as SweepModel
+
+BLAS_THREADS_ENVIRONMENT_VARIABLES = [
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+]
+
+thread_limits = None
+
+
+class Sweep:
+
+    def __init__(
+        self,
+        configuration: Configuration | dict,
+        grid: dict = None,
+        samples: list[dict] = None,
+        max_workers: int = None,
+        blas_threads: int = 1,
+    ):
+        if isinstance(configuration, Configuration):
+            configuration = configuration.model_dump()
+
+        self.content_config_file = configuration
+        self.model = SweepModel(
+            grid=grid,
+            samples=samples,
+            max_workers=max_workers,
+            blas_threads=blas_threads,
+        )
+        self.parameter_sets = self.get_parameter_sets()
+
+    @classmethod
+    def from_path(cls, path):
+        """Reads a configuration file holding a `sweep` section next to the base configuration"""
+        content_config_file = utils.load_yaml_file(path=path)
+
+        if "sweep" not in content_config_file:
+            raise utils.PydykitException(f"File {path} does not have a sweep section")
+
+        sweep = content_config_file.pop("sweep")
+
+        return cls(configuration=content_config_file, **sweep)
+
+    def get_parameter_sets(self):
+        if self.model.samples is not None:
+            return self.model.samples
+
+        paths = list(self.model.grid.keys())
+        return [
+            dict(zip(paths, values))
+            for values in itertools.product(*self.model.grid.values())
+        ]
+
+    def get_configurations(self):
+        configurations = []
+        for parameters in self.parameter_sets:
+            content = copy.deepcopy(self.content_config_file)
+            for path, value in parameters.items():
+                set_by_path(content=content, path=path, value=value)
+            configurations.append(content)
+        return configurations
+
+    def run(self):
+        configurations = self.get_configurations()
+
+        with limited_blas_threads(nbr_threads=self.model.blas_threads):
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.model.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=initialize_worker,
+                initargs=(self.model.blas_threads,),
+            ) as executor:
+                futures = [
+                    executor.submit(run_single, content) for content in configurations
+                ]
+                outcomes = [future.result() for future in futures]
+
+        return SweepResult(
+            parameter_sets=self.parameter_sets,
+            outcomes=outcomes,
+        )
+
+
+class SweepResult:
+
+    def __init__(self, parameter_sets, outcomes):
+        self.parameter_sets = parameter_sets
+        self.dfs = {}
+        self.errors = {}
+
+        for index, (df, error) in enumerate(outcomes):
+            if error is None:
+                self.dfs[index] = df
+            else:
+                self.errors[index] = error
+
+    @property
+    def runs(self) -> pd.DataFrame:
+        """One row per run holding the parameters and, if the run failed, the error"""
+        df = pd.DataFrame(self.parameter_sets)
+        df.index.name = "run"
+        df["error"] = [self.errors.get(index) for index in range(len(df))]
+        return df
+
+    def to_df(self) -> pd.DataFrame:
+        """Results of all successful runs, indexed by run and the row within the run"""
+        if len(self.dfs) == 0:
+            return pd.DataFrame()
+
+        return pd.concat(self.dfs, names=["run", None])
+
+
+def set_by_path(content, path, value):
+    keys = path.split(".")
+    node = content
+
+    for key in keys[:-1]:
+        node = node[int(key)] if isinstance(node, list) else node[key]
+
+    key = keys[-1]
+    if isinstance(node, list):
+        node[int(key)] = value
+    else:
+        if key not in node:
+            raise utils.PydykitException(f"Configuration does not contain {path}")
+        node[key] = value
+
+
+@contextlib.contextmanager
+def limited_blas_threads(nbr_threads):
+    # Spawned workers inherit the environment and read it when importing numpy
+    saved = {key: os.environ.get(key) for key in BLAS_THREADS_ENVIRONMENT_VARIABLES}
+    os.environ.update(
+        {key: str(nbr_threads) for key in BLAS_THREADS_ENVIRONMENT_VARIABLES}
+    )
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def initialize_worker(nbr_threads):
+    try:
+        import threadpoolctl
+    except ImportError:
+        return
+
+    # Keep the limits alive for the lifetime of the worker process
+    global thread_limits
+    thread_limits = threadpoolctl.threadpool_limits(limits=nbr_threads)
+
+
+def run_single(content_config_file):
+    try:
+        manager = Manager()
+        manager.configure(configuration=Configuration(**content_config_file))
+        result = manager.manage()
+
+        if manager.simulator.solver.has_failed:
+            raise utils.PydykitException("Newton convergence not succesful")
+
+        return result.to_df(), None
+
+    except Exception:
+        return None, traceback.format_exc()
@@ -12,6 +12,24 @@ class System:
         new.state = state
         return new
 
+    def view(self, state):
+        # Lightweight "system evaluated at state": Parameters, topology and manager are shared by reference,
+        # only the state is swapped. Evaluations must therefore not mutate attributes of the system.
+        new = copy.copy(self)
+        new.state = state
+        return new
+
+    def differential_state_mask(self):
+        """Flags state components which are governed by differential, not algebraic, equations"""
+        if hasattr(self, "descriptor_matrix"):
+            # Algebraic components do not enter the descriptor matrix
+            descriptor_matrix = utils.to_dense(self.descriptor_matrix())
+            return np.any(
+                descriptor_matrix != 0, axis=tuple(range(descriptor_matrix.ndim - 1))
+            )
+
+        return np.ones(self.dim_state, dtype=bool)
+
     def initialize_state(self, state):
 
         # convert state as dict to array with values
@@ -10,7 +10,7 @@ Classes:
 
 import numpy as np
 
-from . import abstract_base_classes
+from . import abstract_base_classes, utils
 from .systems import System
 
 
@@ -25,8 +25,13 @@ class QuasiLinearDAESystem(System, abstract_base_classes.AbstractQuasiLinearDAES
     where $x$: state, $E$: descriptor matrix, $f$: right-hand side and $\nabla f(x)$: Jacobian.
 
     It includes ODEs for $E(x) = I$. Singular $E$ induce true DAEs.
+
+    States may be stacked to shape (n_members, dim_state), see `simulators.Ensemble`.
+    Quantities are then returned with the same leading axis.
     """
 
+    supports_batched_states = True
+
     def __init__(self, manager, state: dict):
         self.manager = manager
         self.initialize_state(state)
@@ -34,6 +39,9 @@ class QuasiLinearDAESystem(System, abstract_base_classes.AbstractQuasiLinearDAES
 
 
 class Lorenz(QuasiLinearDAESystem):
+
+    complex_safe = True
+
     def __init__(self, manager, state, sigma: float, rho: float, beta: float):
         super().__init__(manager, state)
         self.sigma = sigma
@@ -42,14 +50,14 @@ class Lorenz(QuasiLinearDAESystem):
 
     def decompose_state(self):
         state = self.state
-        assert len(state) == 3
+        assert state.shape[-1] == 3
         return dict(
             zip(
                 self.get_state_columns(),
                 [
-                    state[0],
-                    state[1],
-                    state[2],
+                    state[..., 0],
+                    state[..., 1],
+                    state[..., 2],
                 ],
             )
         )
@@ -67,7 +75,7 @@ class Lorenz(QuasiLinearDAESystem):
         y = state["y"]
         z = state["z"]
 
-        return np.array(
+        return utils.stack_vector(
             [
                 self.sigma * (y - x),
                 x * (self.rho - z) - y,
@@ -79,10 +87,11 @@ class Lorenz(QuasiLinearDAESystem):
         state = self.decompose_state()
         x = state["x"]
         y = state["y"]
-        matrix = np.array(
+        z = state["z"]
+        matrix = utils.stack_matrix(
             [
-                [-self.sigma, self.sigma, 0],
-                [self.rho, -1, -x],
+                [-self.sigma, self.sigma, 0.0],
+                [self.rho - z, -1.0, -x],
                 [y, x, -self.beta],
             ]
         )
@@ -102,6 +111,8 @@ class ChemicalReactor(QuasiLinearDAESystem):
     2. https://doi.org/10.4171/017, Eq. 1.8
     """
 
+    complex_safe = True
+
     def __init__(
         self,
         manager,
@@ -119,14 +130,14 @@ class ChemicalReactor(QuasiLinearDAESystem):
 
     def decompose_state(self):
         state = self.state
-        assert len(state) == 3
+        assert state.shape[-1] == 3
         return dict(
             zip(
                 self.get_state_columns(),
                 [
-                    state[0],
-                    state[1],
-                    state[2],
+                    state[..., 0],
+                    state[..., 1],
+                    state[..., 2],
                 ],
             )
         )
@@ -138,6 +149,10 @@ class ChemicalReactor(QuasiLinearDAESystem):
             "reaction_rate",
         ]
 
+    def unpack_constants(self):
+        # Constants may be given per ensemble member, i.e., with shape (n_members, 4)
+        return np.moveaxis(np.asarray(self.constants), -1, 0)
+
     def descriptor_matrix(self):
         return np.diag((1, 1, 0))
 
@@ -147,12 +162,12 @@ class ChemicalReactor(QuasiLinearDAESystem):
         T = state["temperature"]
         R = state["reaction_rate"]
 
-        k1, k2, k3, k4 = self.constants
+        k1, k2, k3, k4 = self.unpack_constants()
         TC = self.cooling_temperature
         c0 = self.reactant_concentration
         T0 = self.initial_temperature
 
-        rhs = np.array(
+        rhs = utils.stack_vector(
             [
                 k1 * (c0 - c) - R,
                 k1 * (T0 - T) + k2 * R - k3 * (T - TC),
@@ -167,13 +182,13 @@ class ChemicalReactor(QuasiLinearDAESystem):
         c = state["concentration"]
         T = state["temperature"]
 
-        k1, k2, k3, k4 = self.constants
+        k1, k2, k3, k4 = self.unpack_constants()
 
-        matrix = np.array(
+        matrix = utils.stack_matrix(
             [
-                [-k1, 0, -1],
-                [0, -(k1 + k3), k2],
-                [-k3 * np.exp(-k4 / T), k3 * np.exp(-k4 / T) * k4 / (T**2) * c, 1],
+                [-k1, 0.0, -1.0],
+                [0.0, -(k1 + k3), k2],
+                [-k3 * np.exp(-k4 / T), -k3 * np.exp(-k4 / T) * k4 / (T**2) * c, 1.0],
             ]
         )
         return matrix
@@ -1,6 +1,7 @@
 import numpy as np
+import scipy.sparse
 
-from . import abstract_base_classes, operators, utils
+from . import abstract_base_classes, mass_operators, operators, utils
 from .systems import System
 
 
@@ -8,6 +9,11 @@ class MultiBodySystem(
     abstract_base_classes.AbstractMultiBodySystem,
     System,  # TODO: Avoid multi-inheritance if possible
 ):
+
+    # Mass and dissipation matrices independent of the state allow for caching
+    has_constant_mass_matrix = False
+    has_constant_dissipation_matrix = False
+
     def __init__(
         self,
         manager,
@@ -35,6 +41,15 @@ class MultiBodySystem(
             for number in range(self.nbr_dof)
         ] + [f"lambda{number}" for number in range(self.nbr_constraints)]
 
+    def differential_state_mask(self):
+        # Multipliers are algebraic.
+        # Under position-level constraints, the midpoint rule leaves a jump of the normal momentum
+        # which does not shrink with the increment, such that only positions are compared.
+        nbr_differential = (
+            self.nbr_dof if self.nbr_constraints > 0 else 2 * self.nbr_dof
+        )
+        return np.arange(self.dim_state) < nbr_differential
+
     def decompose_state(self):
         return dict(
             zip(
@@ -51,7 +66,7 @@ class MultiBodySystem(
         state = self.decompose_state()
         q = state["position"]
         p = state["momentum"]
-        return 0.5 * p.T @ self.inverse_mass_matrix() @ p
+        return 0.5 * p.T @ (self.inverse_mass_matrix() @ p)
 
     def potential_energy(self):
         return self.external_potential() + self.internal_potential()
@@ -59,12 +74,15 @@ class MultiBodySystem(
     def potential_energy_gradient(self):
         return self.external_potential_gradient() + self.internal_potential_gradient()
 
+    def potential_energy_hessian(self):
+        return self.external_potential_hessian() + self.internal_potential_hessian()
+
     def total_energy(self):
         return self.kinetic_energy() + self.potential_energy()
 
     def constraint_velocity(self):
         p = self.decompose_state()["momentum"]
-        return self.constraint_gradient() @ self.inverse_mass_matrix() @ p
+        return self.constraint_gradient() @ (self.inverse_mass_matrix() @ p)
 
     def rayleigh_dissipation(self):
         v = self.decompose_state()["velocity"]
@@ -72,6 +90,9 @@ class MultiBodySystem(
 
 
 class RigidBodyRotatingQuaternions(MultiBodySystem):
+
+    has_constant_dissipation_matrix = True
+
     def __init__(
         self,
         manager,
@@ -84,6 +105,7 @@ class RigidBodyRotatingQuaternions(MultiBodySystem):
     ):
         self.inertias = inertias
         self.inertias_matrix = np.diag(self.inertias)
+        self.precompute_inertias()
 
         super().__init__(
             manager=manager,
@@ -95,16 +117,29 @@ class RigidBodyRotatingQuaternions(MultiBodySystem):
             state=state,
         )
 
+    def precompute_inertias(self):
+        """
+        Inertia quantities depending on the parameters only.
+        Extended inertia tensors diag(J0, J) are stored by their inverse diagonals,
+        the inverse mass matrix uses J0 = trace(J) / 2 and the kinetic energy gradient J0 = trace(J).
+        """
+        trace = np.trace(self.inertias_matrix)
+        self.regularization_factor = 2.0 * trace
+        self.inverse_extended_inertias_mass = 1.0 / np.append(
+            0.5 * trace, self.inertias
+        )
+        self.inverse_extended_inertias_kinetic = 1.0 / np.append(trace, self.inertias)
+
     def mass_matrix(self):
         q = self.decompose_state()["position"]
         quat = q[0:4]
         G_q = operators.convective_transformation_matrix(
             quat=quat,
         )
-        singular_mass_matrix = 4.0 * G_q.T @ self.inertias_matrix @ G_q
-        regular_mass_matrix = singular_mass_matrix + 2.0 * np.trace(
-            self.inertias_matrix
-        ) * np.outer(quat, quat)
+        singular_mass_matrix = 4.0 * (G_q.T * self.inertias) @ G_q
+        regular_mass_matrix = (
+            singular_mass_matrix + self.regularization_factor * np.outer(quat, quat)
+        )
 
         return regular_mass_matrix
 
@@ -112,31 +147,64 @@ class RigidBodyRotatingQuaternions(MultiBodySystem):
         q = self.decompose_state()["position"]
         quat = q[0:4]
         Ql_q = operators.left_multiplation_matrix(quat)
-        J0 = 0.5 * np.trace(self.inertias_matrix)
-        inverse_inertias = 1.0 / np.diag(self.inertias_matrix)
-        inverse_extended_inertias_matrix = np.diag(np.append(1 / J0, inverse_inertias))
 
-        return 0.25 * Ql_q @ inverse_extended_inertias_matrix @ Ql_q.T
+        return 0.25 * (Ql_q * self.inverse_extended_inertias_mass) @ Ql_q.T
 
     def kinetic_energy_gradient_from_momentum(self):
         state = self.decompose_state()
         q = state["position"]
         p = state["momentum"]
 
-        # extended inertia tensor
-        J0 = np.trace(self.inertias_matrix)
-        extended_inertias = np.block(
-            [
-                [J0, np.zeros((1, 3))],
-                [np.zeros((3, 1)), self.inertias_matrix],
-            ]  # TODO: Avoid hardcoding, use dimension
+        # 0.25 * Ql(p) @ Jinv @ Ql(p).T @ q with Ql(p).T @ q = conj(p) * q
+        return 0.25 * operators.quaternion_product(
+            p,
+            self.inverse_extended_inertias_kinetic
+            * operators.quaternion_product(operators.conjugate_quaternion(p), q),
         )
 
-        inverse_extended_inertias = np.linalg.inv(extended_inertias)
+    def inverse_mass_matrix_derivative(self, vector):
+        """Derivative of inverse_mass_matrix() @ vector with respect to the position."""
+        q = self.decompose_state()["position"]
+        quat = q[0:4]
+        return self._inverse_extended_quadratic_form_derivative(
+            left=quat,
+            right=vector,
+            inverse_extended_inertias=self.inverse_extended_inertias_mass,
+        )
+
+    def _inverse_extended_quadratic_form_derivative(
+        self, left, right, inverse_extended_inertias
+    ):
+        """Derivative of 0.25 * Ql(left) @ Jinv @ Ql(left).T @ right with respect to left."""
+        Ql_left = operators.left_multiplation_matrix(left)
 
+        # Ql(left)^T @ right = conjugation @ Ql(right)^T @ left
+        conjugation = np.array([1.0, -1.0, -1.0, -1.0])
+        tmp = inverse_extended_inertias * operators.quaternion_product(
+            operators.conjugate_quaternion(left), right
+        )
+
+        return 0.25 * (
+            operators.right_multiplication_matrix(tmp)
+            + (Ql_left * (inverse_extended_inertias * conjugation))
+            @ operators.left_multiplation_matrix(right).T
+        )
+
+    def kinetic_energy_hessian_from_momentum(self):
+        """Derivative of kinetic_energy_gradient_from_momentum() with respect to the position."""
+        p = self.decompose_state()["momentum"]
         Ql_p = operators.left_multiplation_matrix(p)
 
-        return 0.25 * Ql_p @ inverse_extended_inertias @ Ql_p.T @ q
+        return 0.25 * (Ql_p * self.inverse_extended_inertias_kinetic) @ Ql_p.T
+
+    def kinetic_energy_mixed_hessian_from_momentum(self):
+        """Derivative of kinetic_energy_gradient_from_momentum() with respect to the momentum."""
+        state = self.decompose_state()
+        return self._inverse_extended_quadratic_form_derivative(
+            left=state["momentum"],
+            right=state["position"],
+            inverse_extended_inertias=self.inverse_extended_inertias_kinetic,
+        )
 
     def kinetic_energy_gradient_from_velocity(self):
         state = self.decompose_state()
@@ -162,6 +230,9 @@ class RigidBodyRotatingQuaternions(MultiBodySystem):
         q = self.decompose_state()["position"]
         return np.zeros(q.shape)
 
+    def external_potential_hessian(self):
+        return np.zeros((self.nbr_dof, self.nbr_dof))
+
     def internal_potential(self):
         return 0.0
 
@@ -169,6 +240,9 @@ class RigidBodyRotatingQuaternions(MultiBodySystem):
         q = self.decompose_state()["position"]
         return np.zeros(q.shape)
 
+    def internal_potential_hessian(self):
+        return np.zeros((self.nbr_dof, self.nbr_dof))
+
     def constraint(self):
         q = self.decompose_state()["position"]
         return np.array([utils.quadratic_length_constraint(vector=q, length=1.0)])
@@ -177,6 +251,14 @@ class RigidBodyRotatingQuaternions(MultiBodySystem):
         q = self.decompose_state()["position"]
         return q.T[np.newaxis, :]
 
+    def constraint_hessian(self, multiplier):
+        """Hessians of the constraints contracted with the multipliers."""
+        return multiplier[0] * np.eye(self.nbr_dof)
+
+    def constraint_gradient_derivative(self, vector):
+        """Derivative of constraint_gradient() @ vector with respect to the position."""
+        return vector[np.newaxis, :]
+
     def dissipation_matrix(self):
         diss_mat = np.zeros(
             [
@@ -186,9 +268,15 @@ class RigidBodyRotatingQuaternions(MultiBodySystem):
         )
         return diss_mat
 
+    def dissipation_matrix_derivative(self, vector):
+        """Derivative of dissipation_matrix() @ vector with respect to the position."""
+        return np.zeros((self.nbr_dof, self.nbr_dof))
+
 
 class ParticleSystem(MultiBodySystem):
 
+    has_constant_mass_matrix = True
+
     def __init__(
         self,
         manager,
@@ -209,6 +297,7 @@ class ParticleSystem(MultiBodySystem):
         self.supports = supports
 
         self.nbr_particles = len(self.particles)
+        self.nbr_supports = len(self.supports)
 
         super().__init__(
             manager=manager,
@@ -230,6 +319,126 @@ class ParticleSystem(MultiBodySystem):
             },
         )
 
+        self.compile_connectivity()
+
+    def compile_connectivity(self):
+        """
+        Translates the topology of springs, dampers and constraints into index and parameter arrays.
+        Nodes are numbered consecutively, i.e., particles first and supports afterwards.
+        """
+        self.positions_supports = np.array(
+            self.get_positions_supports(),
+            dtype=float,
+        ).reshape(self.nbr_supports, self.nbr_spatial_dimensions)
+
+        self.spring_start, self.spring_end = self._get_node_indices(self.springs)
+        self.spring_stiffness = np.array(
+            [spring["stiffness"] for spring in self.springs], dtype=float
+        )
+        self.spring_equilibrium_length = np.array(
+            [spring["equilibrium_length"] for spring in self.springs], dtype=float
+        )
+
+        self.damper_start, self.damper_end = self._get_node_indices(self.dampers)
+        self.damper_ground_viscosity = np.array(
+            [damper["ground_viscosity"] for damper in self.dampers], dtype=float
+        )
+        self.damper_alpha = np.array(
+            [
+                damper["alpha"] if damper["state_dependent"] else 0.0
+                for damper in self.dampers
+            ],
+            dtype=float,
+        )
+
+        self.constraint_start, self.constraint_end = self._get_node_indices(
+            self.constraints
+        )
+        self.constraint_length = np.array(
+            [constraint["length"] for constraint in self.constraints], dtype=float
+        )
+
+    def state_coupling_pattern(self):
+        """
+        Boolean sparsity pattern of components of the state which interact within the system.
+        Particles interact if they are connected by a spring, damper or constraint,
+        multipliers interact with the positions and momenta of the particles they constrain.
+        The pattern is derived from the topology only and therefore computed once.
+        """
+        if getattr(self, "_state_coupling_pattern", None) is not None:
+            return self._state_coupling_pattern
+
+        start = np.concatenate(
+            [self.spring_start, self.damper_start, self.constraint_start]
+        )
+        end = np.concatenate([self.spring_end, self.damper_end, self.constraint_end])
+        # Supports do not carry degrees of freedom
+        mask = (start < self.nbr_particles) & (end < self.nbr_particles)
+        nodes = np.arange(self.nbr_particles)
+
+        node_adjacency = scipy.sparse.csr_array(
+            (
+                np.ones(2 * mask.sum() + self.nbr_particles, dtype=bool),
+                (
+                    np.concatenate([start[mask], end[mask], nodes]),
+                    np.concatenate([end[mask], start[mask], nodes]),
+                ),
+            ),
+            shape=(self.nbr_particles, self.nbr_particles),
+        )
+
+        constraint_nodes = np.concatenate([self.constraint_start, self.constraint_end])
+        constraint_mask = constraint_nodes < self.nbr_particles
+        node_constraint_incidence = scipy.sparse.csr_array(
+            (
+                np.ones(constraint_mask.sum(), dtype=bool),
+                (
+                    np.tile(np.arange(self.nbr_constraints), 2)[constraint_mask],
+                    constraint_nodes[constraint_mask],
+                ),
+            ),
+            shape=(self.nbr_constraints, self.nbr_particles),
+        )
+
+        dim = self.nbr_spatial_dimensions
+        dof_coupling = scipy.sparse.kron(node_adjacency, np.ones((dim, dim)))
+        constraint_coupling = scipy.sparse.kron(
+            node_constraint_incidence, np.ones((1, dim))
+        )
+
+        pattern = scipy.sparse.block_array(
+            [
+                [dof_coupling, dof_coupling, constraint_coupling.T],
+                [dof_coupling, dof_coupling, constraint_coupling.T],
+                [constraint_coupling, constraint_coupling, None],
+            ],
+        ) + scipy.sparse.eye_array(self.dim_state)
+
+        self._state_coupling_pattern = scipy.sparse.csr_array(pattern, dtype=bool)
+
+        return self._state_coupling_pattern
+
+    def _get_node_indices(self, elements):
+        return tuple(
+            np.array(
+                [self.get_node_index(ending=element[endpoint]) for element in elements],
+                dtype=int,
+            )
+            for endpoint in ["start", "end"]
+        )
+
+    def get_node_index(self, ending):
+        _type = ending["type"]
+
+        if _type == "particle":
+            result = ending["index"]
+        elif _type == "support":
+            result = self.nbr_particles + ending["index"]
+        else:
+            raise NotImplementedError(f'ending["type"]={_type} is not implemented')
+
+        return result
+
     def get_state_columns(self):
         return [
             f"{state_name}{dimension}_particle{index}"
@@ -240,206 +449,186 @@ class ParticleSystem(MultiBodySystem):
 
     def mass_matrix(self):
         diagonal_elements = np.repeat(self.mass, self.nbr_spatial_dimensions)
-        return np.diag(diagonal_elements)
+        return mass_operators.DiagonalMassOperator(diagonal_elements)
 
     def inverse_mass_matrix(self):
-        diagonal_elements = np.reciprocal(
-            np.repeat(self.mass, self.nbr_spatial_dimensions).astype(float)
-        )
-        return np.diag(diagonal_elements)
+        return self.mass_matrix().inverse()
+
+    def inverse_mass_matrix_derivative(self, vector):
+        return self._zero_matrix()
 
     def kinetic_energy_gradient_from_momentum(self):
         return np.zeros(self.nbr_dof)
 
+    def kinetic_energy_hessian_from_momentum(self):
+        return self._zero_matrix()
+
+    def kinetic_energy_mixed_hessian_from_momentum(self):
+        return self._zero_matrix()
+
     def kinetic_energy_gradient_from_velocity(self):
         return np.zeros(self.nbr_dof)
 
     def external_potential(self):
         q = self.decompose_state()["position"]
         body_force = self._body_force()
-        return body_force.T @ q
+        return q @ body_force
 
     def external_potential_gradient(self):
 
         return self._body_force()
 
+    def external_potential_hessian(self):
+        return self._zero_matrix()
+
     def _body_force(self):
-        return -self.mass_matrix() @ np.repeat(self.gravity, self.nbr_particles)
+        return -self.mass_matrix() @ np.tile(self.gravity, self.nbr_particles)
 
-    @staticmethod
-    def _spring_energy(stiffness, equilibrium_length, start, end):
-        vector = end - start
-        return 0.5 * stiffness * (vector.T @ vector - equilibrium_length**2) ** 2
+    def get_node_values(self, vector, values_supports):
+        """Values of all nodes, i.e., particles followed by supports, arranged as (..., nodes, dimensions)."""
+        values_particles = vector.reshape(
+            vector.shape[:-1] + (self.nbr_particles, self.nbr_spatial_dimensions)
+        )
+        values_supports = np.broadcast_to(
+            values_supports,
+            vector.shape[:-1] + values_supports.shape,
+        )
+        return np.concatenate([values_particles, values_supports], axis=-2)
 
-    def internal_potential(self):
-        q = self.decompose_state()["position"]
-        position_vectors = self.decompose_into_particles(q)
-
-        contributions = [
-            self._spring_energy(
-                stiffness=spring["stiffness"],
-                equilibrium_length=spring["equilibrium_length"],
-                start=position_vectors[spring["start"]["index"]],
-                end=position_vectors[spring["end"]["index"]],
-            )
-            for spring in self.springs
-        ]
-
-        return sum(contributions)
-
-    @staticmethod
-    def _spring_energy_gradient(
-        stiffness,
-        equilibrium_length,
-        start_vector,
-        end_vector,
-        start_index,
-        end_index,
-        nbr_particles,
-    ):
+    def get_relative_vectors(self, q, start, end, values_supports=None):
+        """
+        Vectors pointing from start nodes to end nodes, arranged as (..., elements, dimensions).
+        By default, q is considered a position, i.e., supports contribute their positions.
+        """
+        if values_supports is None:
+            values_supports = self.positions_supports
 
-        vector = end_vector - start_vector
-        tmp = (vector).T @ (vector) - equilibrium_length**2
+        values = self.get_node_values(vector=q, values_supports=values_supports)
+        return values[..., end, :] - values[..., start, :]
 
-        structure = []
-        for index in range(nbr_particles):
-            if index == start_index:
-                structure.append(-2.0 * vector)
-            elif index == end_index:
-                structure.append(2.0 * vector)
-            else:
-                structure.append(np.zeros(3))  # TODO: Avoid hardcoding, use dimension
+    def spring_energies(self, vectors):
+        strains = (vectors * vectors).sum(axis=-1) - self.spring_equilibrium_length**2
+        return 0.5 * self.spring_stiffness * strains**2
 
-        return stiffness * tmp * np.hstack(structure)
+    def spring_energy_gradients(self, vectors):
+        """Gradients of the spring energies with respect to the relative vectors."""
+        strains = (vectors * vectors).sum(axis=-1) - self.spring_equilibrium_length**2
+        return 2.0 * (self.spring_stiffness * strains)[..., np.newaxis] * vectors
 
-    def internal_potential_gradient(self):
+    def internal_potential(self):
         q = self.decompose_state()["position"]
-        position_vectors = dict(
-            particle=self.decompose_into_particles(q),
-            support=self.get_positions_supports(),
-        )
-        contributions = [
-            self._spring_energy_gradient(
-                stiffness=spring["stiffness"],
-                equilibrium_length=spring["equilibrium_length"],
-                start_vector=utils.select(
-                    position_vectors=position_vectors,
-                    element=spring,
-                    endpoint="start",
-                ),
-                end_vector=utils.select(
-                    position_vectors=position_vectors,
-                    element=spring,
-                    endpoint="end",
-                ),
-                start_index=self.get_index_argument_based_on_type(
-                    ending=spring["start"],
-                ),
-                end_index=self.get_index_argument_based_on_type(
-                    ending=spring["end"],
-                ),
-                nbr_particles=self.nbr_particles,
-            )
-            for spring in self.springs
-        ]
+        vectors = self.get_relative_vectors(
+            q=q,
+            start=self.spring_start,
+            end=self.spring_end,
+        )
 
-        return sum(contributions)
+        return self.spring_energies(vectors).sum(axis=-1)
 
-    @staticmethod
-    def _constraint(length, start, end):
-        vector = end - start
-        return utils.quadratic_length_constraint(vector=vector, length=length)
+    def internal_potential_gradient(self):
+        q = self.decompose_state()["position"]
+        vectors = self.get_relative_vectors(
+            q=q,
+            start=self.spring_start,
+            end=self.spring_end,
+        )
 
-    def constraint(self):
+        return self.assemble_element_vectors(
+            element_vectors=self.spring_energy_gradients(vectors),
+            start=self.spring_start,
+            end=self.spring_end,
+        )
+
+    def internal_potential_hessian(self):
         q = self.decompose_state()["position"]
-        position_vectors = dict(
-            particle=self.decompose_into_particles(q),
-            support=self.get_positions_supports(),
-        )
-
-        contributions = [
-            self._constraint(
-                length=constraint["length"],
-                start=utils.select(
-                    position_vectors=position_vectors,
-                    element=constraint,
-                    endpoint="start",
-                ),
-                end=utils.select(
-                    position_vectors=position_vectors,
-                    element=constraint,
-                    endpoint="end",
-                ),
+        vectors = self.get_relative_vectors(
+            q=q,
+            start=self.spring_start,
+            end=self.spring_end,
+        )
+        strains = (vectors * vectors).sum(axis=-1) - self.spring_equilibrium_length**2
+        identity = np.eye(self.nbr_spatial_dimensions)
+
+        element_matrices = (
+            2.0
+            * self.spring_stiffness[:, np.newaxis, np.newaxis]
+            * (
+                strains[:, np.newaxis, np.newaxis] * identity
+                + 2.0 * vectors[:, :, np.newaxis] * vectors[:, np.newaxis, :]
             )
-            for constraint in self.constraints
-        ]
+        )
+
+        return self.assemble_element_matrices(
+            element_matrices=element_matrices,
+            start=self.spring_start,
+            end=self.spring_end,
+        )
 
-        if contributions == []:
+    def constraint(self):
+        if self.nbr_constraints == 0:
             # Random fix for missing constraints
-            result = 0
-        else:
-            result = np.array(contributions)
+            return 0
 
-        return result
+        q = self.decompose_state()["position"]
+        vectors = self.get_relative_vectors(
+            q=q,
+            start=self.constraint_start,
+            end=self.constraint_end,
+        )
 
-    @staticmethod
-    def _constraint_gradient(
-        start_vector,
-        end_vector,
-        start_index,
-        end_index,
-        nbr_particles,
-    ):
-        vector = end_vector - start_vector
+        return self.constraint_values(vectors)
 
-        structure = []
-        for index in range(nbr_particles):
-            if index == start_index:
-                structure.append(-vector)
-            elif index == end_index:
-                structure.append(vector)
-            else:
-                structure.append(np.zeros(3))  # TODO: Avoid hardcoding, use dimension
+    def constraint_values(self, vectors):
+        return 0.5 * ((vectors * vectors).sum(axis=-1) - self.constraint_length**2)
 
-        return np.hstack(structure)
+    def constraint_value_gradients(self, vectors):
+        """Gradients of the constraints with respect to the relative vectors."""
+        return vectors
 
     def constraint_gradient(self):
         q = self.decompose_state()["position"]
-        position_vectors = dict(
-            particle=self.decompose_into_particles(q),
-            support=self.get_positions_supports(),
+
+        if self.nbr_constraints == 0:
+            # Random fix for missing constraints
+            return np.zeros(len(q))
+
+        vectors = self.get_relative_vectors(
+            q=q,
+            start=self.constraint_start,
+            end=self.constraint_end,
         )
 
-        contributions = [
-            self._constraint_gradient(
-                start_vector=utils.select(
-                    position_vectors=position_vectors,
-                    element=constraint,
-                    endpoint="start",
-                ),
-                end_vector=utils.select(
-                    position_vectors=position_vectors,
-                    element=constraint,
-                    endpoint="end",
-                ),
-                start_index=self.get_index_argument_based_on_type(
-                    ending=constraint["start"],
-                ),
-                end_index=self.get_index_argument_based_on_type(
-                    ending=constraint["end"],
-                ),
-                nbr_particles=self.nbr_particles,
-            )
-            for constraint in self.constraints
-        ]
+        return self.assemble_element_rows(
+            element_vectors=self.constraint_value_gradients(vectors),
+            start=self.constraint_start,
+            end=self.constraint_end,
+        )
 
-        if contributions == []:
-            # Random fix for missing constraints
-            result = np.zeros(len(q))
-        else:
-            result = np.vstack(contributions)
+    def constraint_hessian(self, multiplier):
+        """Hessians of the constraints contracted with the multipliers."""
+        identity = np.eye(self.nbr_spatial_dimensions)
 
-        return result
+        return self.assemble_element_matrices(
+            element_matrices=np.asarray(multiplier)[:, np.newaxis, np.newaxis]
+            * identity,
+            start=self.constraint_start,
+            end=self.constraint_end,
+        )
+
+    def constraint_gradient_derivative(self, vector):
+        """Derivative of constraint_gradient() @ vector with respect to the position."""
+        vectors = self.get_relative_vectors(
+            q=vector,
+            start=self.constraint_start,
+            end=self.constraint_end,
+            values_supports=np.zeros_like(self.positions_supports),
+        )
+
+        return self.assemble_element_rows(
+            element_vectors=vectors,
+            start=self.constraint_start,
+            end=self.constraint_end,
+        )
 
     def decompose_into_particles(self, vector):
         assert len(vector) == self.nbr_particles * self.nbr_spatial_dimensions
@@ -448,116 +637,490 @@ class ParticleSystem(MultiBodySystem):
     def get_positions_supports(self):
         return [np.array(support["position"]) for support in self.supports]
 
+    @property
+    def has_constant_dissipation_matrix(self):
+        # Viscosities of state-dependent dampers depend on the relative displacements
+        return not np.any(self.damper_alpha)
+
+    def dynamic_viscosity(self, relative_displacement_squared):
+        return self.damper_ground_viscosity * (
+            1.0 + self.damper_alpha * relative_displacement_squared
+        )
+
     def dissipation_matrix(self):
-        diss_mat = np.zeros([self.nbr_dof, self.nbr_dof])
+        q = self.decompose_state()["position"]
+        vectors = self.get_relative_vectors(
+            q=q,
+            start=self.damper_start,
+            end=self.damper_end,
+        )
+        viscosities = self.dynamic_viscosity(
+            relative_displacement_squared=(vectors * vectors).sum(axis=-1),
+        )
+        identity = np.eye(self.nbr_spatial_dimensions)
+
+        return self.assemble_element_matrices(
+            element_matrices=viscosities[:, np.newaxis, np.newaxis] * identity,
+            start=self.damper_start,
+            end=self.damper_end,
+        )
 
+    def dissipation_matrix_derivative(self, vector):
+        """Derivative of dissipation_matrix() @ vector with respect to the position."""
         q = self.decompose_state()["position"]
+        vectors = self.get_relative_vectors(
+            q=q,
+            start=self.damper_start,
+            end=self.damper_end,
+        )
 
-        position_vectors = dict(
-            particle=self.decompose_into_particles(q),
-            support=self.get_positions_supports(),
-        )
-
-        contributions = [
-            self.dynamic_viscosity(
-                element=damper,
-                relative_displacement=np.linalg.norm(
-                    utils.select(
-                        position_vectors=position_vectors,
-                        element=damper,
-                        endpoint="end",
-                    )
-                    - utils.select(
-                        position_vectors=position_vectors,
-                        element=damper,
-                        endpoint="start",
-                    )
-                ),
-            )
-            * self._dissipation_matrix(
-                nbr_dimensions=self.nbr_spatial_dimensions,
-                start_index=self.get_index_argument_based_on_type(
-                    ending=damper["start"],
+        # Supports do not move, i.e., the vector vanishes at supports
+        relative_vectors = self.get_relative_vectors(
+            q=vector,
+            start=self.damper_start,
+            end=self.damper_end,
+            values_supports=np.zeros_like(self.positions_supports),
+        )
+
+        viscosity_gradients = (
+            2.0 * (self.damper_ground_viscosity * self.damper_alpha)[:, np.newaxis]
+        ) * vectors
+
+        return self.assemble_element_matrices(
+            element_matrices=relative_vectors[:, :, np.newaxis]
+            * viscosity_gradients[:, np.newaxis, :],
+            start=self.damper_start,
+            end=self.damper_end,
+        )
+
+    def assemble_element_vectors(self, element_vectors, start, end):
+        """
+        Scatter-adds contributions of two-node elements depending on the relative vector end - start,
+        i.e., -element_vector at the start node and +element_vector at the end node.
+        Supports are skipped as they do not carry degrees of freedom.
+        """
+        nodal_vectors = np.zeros(
+            (self.nbr_particles + self.nbr_supports, self.nbr_spatial_dimensions)
+        )
+        np.add.at(nodal_vectors, start, -element_vectors)
+        np.add.at(nodal_vectors, end, element_vectors)
+
+        return nodal_vectors[: self.nbr_particles].ravel()
+
+    def assemble_element_rows(self, element_vectors, start, end):
+        """
+        Assembles one row per two-node element depending on the relative vector end - start
+        into a sparse matrix, i.e., -element_vector at the start node and +element_vector at the end node.
+        Supports are skipped as they do not carry degrees of freedom.
+        """
+        rows, columns, data = [], [], []
+        row_indices = np.broadcast_to(
+            np.arange(len(element_vectors))[:, np.newaxis], element_vectors.shape
+        )
+
+        for column_indices, values in [
+            (self.get_dof_indices(start), -element_vectors),
+            (self.get_dof_indices(end), element_vectors),
+        ]:
+            mask = column_indices >= 0
+            rows.append(row_indices[mask])
+            columns.append(column_indices[mask])
+            data.append(values[mask])
+
+        return scipy.sparse.csr_array(
+            (
+                np.concatenate(data),
+                (np.concatenate(rows), np.concatenate(columns)),
+            ),
+            shape=(len(element_vectors), self.nbr_dof),
+        )
+
+    def get_element_decomposition(self, func_name):
+        """
+        Decomposition of a function of the positions into contributions of two-node elements,
+        each depending on the relative vector end - start only.
+        Scalar functions are sums of the element contributions,
+        vector-valued functions hold one entry per element.
+        Returns None for functions which are not decomposed.
+        """
+        decompositions = {
+            "internal_potential": dict(
+                start=self.spring_start,
+                end=self.spring_end,
+                values=self.spring_energies,
+                gradients=self.spring_energy_gradients,
+                is_vector_valued=False,
+            ),
+            "constraint": dict(
+                start=self.constraint_start,
+                end=self.constraint_end,
+                values=self.constraint_values,
+                gradients=self.constraint_value_gradients,
+                is_vector_valued=True,
+            ),
+        }
+
+        return decompositions.get(func_name)
+
+    def assemble_element_matrices(self, element_matrices, start, end):
+        """
+        Assembles contributions of two-node elements depending on the relative vector end - start
+        into a sparse matrix, i.e., each element matrix enters with the structure [[1, -1], [-1, 1]].
+        Supports are skipped as they do not carry degrees of freedom.
+        """
+        rows, columns, data = [], [], []
+
+        for row_dofs, row_sign in [
+            (self.get_dof_indices(start), -1.0),
+            (self.get_dof_indices(end), 1.0),
+        ]:
+            for column_dofs, column_sign in [
+                (self.get_dof_indices(start), -1.0),
+                (self.get_dof_indices(end), 1.0),
+            ]:
+                row_indices = np.broadcast_to(
+                    row_dofs[:, :, np.newaxis], element_matrices.shape
+                )
+                column_indices = np.broadcast_to(
+                    column_dofs[:, np.newaxis, :], element_matrices.shape
+                )
+                mask = (row_indices >= 0) & (column_indices >= 0)
+
+                rows.append(row_indices[mask])
+                columns.append(column_indices[mask])
+                data.append(row_sign * column_sign * element_matrices[mask])
+
+        return scipy.sparse.csr_array(
+            (
+                np.concatenate(data),
+                (np.concatenate(rows), np.concatenate(columns)),
+            ),
+            shape=(self.nbr_dof, self.nbr_dof),
+        )
+
+    def get_dof_indices(self, nodes):
+        """Indices of the degrees of freedom of nodes, arranged as (nodes, dimensions). Supports are marked by -1."""
+        dim = self.nbr_spatial_dimensions
+        indices = nodes[:, np.newaxis] * dim + np.arange(dim)
+        return np.where(nodes[:, np.newaxis] < self.nbr_particles, indices, -1)
+
+    def _zero_matrix(self):
+        return scipy.sparse.csr_array((self.nbr_dof, self.nbr_dof))
+
+
+class MultiRigidBodyQuaternions(MultiBodySystem):
+    """
+    Rotating rigid bodies, each parametrized by a quaternion subject to a unit-length constraint.
+    Joints restrict the relative rotation conj(q_start) * q_end of two bodies, i.e.,
+    "fixed" joints enforce a vanishing vector part and
+    "revolute" joints a vanishing vector part apart from the component along the joint axis.
+    All constraints are quadratic forms of the quaternions.
+    """
+
+    has_constant_dissipation_matrix = True
+
+    def __init__(
+        self,
+        manager,
+        nbr_spatial_dimensions: int,
+        bodies: list[dict,],
+        joints: list[dict,],
+    ):
+        self.bodies = bodies
+        self.joints = joints
+        self.nbr_bodies = len(self.bodies)
+
+        self.inertias = np.array(
+            [body["inertias"] for body in self.bodies], dtype=float
+        )
+        # Inertias of the extended 4x4 inertia tensor with J0 = trace(J) / 2, see mass_matrix
+        self.extended_inertias = np.concatenate(
+            [0.5 * self.inertias.sum(axis=1, keepdims=True), self.inertias],
+            axis=1,
+        )
+        self.inverse_extended_inertias = 1.0 / self.extended_inertias
+
+        self.compile_joints()
+
+        super().__init__(
+            manager=manager,
+            nbr_spatial_dimensions=nbr_spatial_dimensions,
+            nbr_constraints=self.nbr_bodies + len(self.joint_start),
+            nbr_dof=4 * self.nbr_bodies,
+            mass=[body["mass"] for body in self.bodies],
+            gravity=[0.0, 0.0, 0.0],
+            state={
+                "position": utils.get_flat_list_of_list_attributes(
+                    items=self.bodies,
+                    key="initial_quaternion",
                 ),
-                end_index=self.get_index_argument_based_on_type(
-                    ending=damper["end"],
+                "momentum": utils.get_flat_list_of_list_attributes(
+                    items=self.bodies,
+                    key="initial_momentum",
                 ),
-                nbr_particles=self.nbr_particles,
-            )
-            for damper in self.dampers
-        ]
+                "multiplier": np.zeros(self.nbr_bodies + len(self.joint_start)),
+            },
+        )
 
-        diss_mat += sum(contributions)
+    def compile_joints(self):
+        """
+        Translates the joints into one constraint q_start.T @ B @ q_end per restricted component
+        of the relative rotation, with B taken from the left multiplication matrix of conj(q_start).
+        """
+        start, end, components = [], [], []
+        for joint in self.joints:
+            # Components of the vector part, the scalar part is free
+            restricted = [1, 2, 3]
+            if joint["type"] == "revolute":
+                restricted.remove(joint["axis"] + 1)
+
+            start.extend([joint["start"]] * len(restricted))
+            end.extend([joint["end"]] * len(restricted))
+            components.extend(restricted)
+
+        self.joint_start = np.array(start, dtype=int)
+        self.joint_end = np.array(end, dtype=int)
+
+        # Stack of Ql(conj(e_i)), i.e., Ql(conj(q)) = sum_i q_i * multiplication[i]
+        multiplication = operators.left_multiplation_matrix(
+            operators.conjugate_quaternion(np.eye(4))
+        )
+        self.joint_matrices = np.swapaxes(
+            multiplication[:, np.array(components, dtype=int), :], 0, 1
+        )
 
-        return diss_mat
+    def get_state_columns(self):
+        return [
+            f"{state_name}{component}_body{index}"
+            for state_name in ["position", "momentum"]
+            for index in map(lambda body: body["index"], self.bodies)
+            for component in range(4)
+        ] + [f"lambda{number}" for number in range(self.nbr_constraints)]
 
-    @staticmethod
-    def get_index_argument_based_on_type(ending):
+    def decompose_into_bodies(self, vector):
+        """Arranges a vector of the size of the positions as (..., bodies, 4)."""
+        return vector.reshape(vector.shape[:-1] + (self.nbr_bodies, 4))
+
+    def assemble_blocks(self, blocks, row_bodies, column_bodies, nbr_rows=None):
         """
-        See discussion in
-        https://github.com/pydykit/pydykit/pull/56#issuecomment-2408621335
+        Assembles 4x4 blocks, or 1x4 blocks if row_bodies are constraint indices and nbr_rows is given,
+        into a sparse matrix. Contributions of blocks sharing a position are summed.
         """
+        nbr_block_rows = blocks.shape[-2]
+        rows = (
+            nbr_block_rows * row_bodies[:, np.newaxis, np.newaxis]
+            + np.arange(nbr_block_rows)[:, np.newaxis]
+        )
+        columns = 4 * column_bodies[:, np.newaxis, np.newaxis] + np.arange(4)
+
+        return scipy.sparse.csr_array(
+            (
+                blocks.ravel(),
+                (
+                    np.broadcast_to(rows, blocks.shape).ravel(),
+                    np.broadcast_to(columns, blocks.shape).ravel(),
+                ),
+            ),
+            shape=(
+                self.nbr_dof if nbr_rows is None else nbr_rows,
+                self.nbr_dof,
+            ),
+        )
 
-        _type = ending["type"]
+    def assemble_block_diagonal(self, blocks):
+        bodies = np.arange(self.nbr_bodies)
+        return self.assemble_blocks(
+            blocks=blocks,
+            row_bodies=bodies,
+            column_bodies=bodies,
+        )
 
-        if _type == "particle":
-            result = ending["index"]
-        elif _type == "support":
-            result = None
-        else:
-            raise NotImplementedError(
-                f'damper_ending["type"]={_type} is not implemented'
-            )
+    def mass_matrix(self):
+        # 4 * G(q).T @ J @ G(q) + 2 * trace(J) * q @ q.T = 4 * Ql(q) @ diag(J0, J) @ Ql(q).T
+        quats = self.decompose_into_bodies(self.decompose_state()["position"])
+        Ql_q = operators.left_multiplation_matrix(quats)
+
+        return mass_operators.BlockDiagonalMassOperator(
+            4.0
+            * (Ql_q * self.extended_inertias[:, np.newaxis, :])
+            @ np.swapaxes(Ql_q, -1, -2)
+        )
 
-        return result
+    def inverse_mass_matrix(self):
+        quats = self.decompose_into_bodies(self.decompose_state()["position"])
+        Ql_q = operators.left_multiplation_matrix(quats)
 
-    @staticmethod
-    def _dissipation_matrix(
-        nbr_dimensions,
-        start_index,
-        end_index,
-        nbr_particles,
-    ):
+        return mass_operators.BlockDiagonalMassOperator(
+            0.25
+            * (Ql_q * self.inverse_extended_inertias[:, np.newaxis, :])
+            @ np.swapaxes(Ql_q, -1, -2)
+        )
 
-        structure_start = []
-        structure_end = []
-        structure = []
-        for index in range(nbr_particles):
-            if index == start_index:
-                structure_end.append(-np.eye(nbr_dimensions))
-                structure_start.append(np.eye(nbr_dimensions))
-            elif index == end_index:
-                structure_end.append(np.eye(nbr_dimensions))
-                structure_start.append(-np.eye(nbr_dimensions))
-            else:
-                structure_end.append(np.zeros([nbr_dimensions, nbr_dimensions]))
-                structure_start.append(np.zeros([nbr_dimensions, nbr_dimensions]))
-
-        structure_start = np.hstack(structure_start)
-        structure_end = np.hstack(structure_end)
-
-        for index in range(nbr_particles):
-            if index == start_index:
-                structure.append(structure_start)
-            elif index == end_index:
-                structure.append(structure_end)
-            else:
-                structure.append(
-                    np.zeros([nbr_dimensions, nbr_particles * nbr_dimensions])
-                )
+    def _inverse_extended_quadratic_form(self, left, right):
+        """0.25 * Ql(left) @ diag(J0, J)^-1 @ Ql(left).T @ right, evaluated by quaternion products."""
+        return 0.25 * operators.quaternion_product(
+            left,
+            self.inverse_extended_inertias
+            * operators.quaternion_product(operators.conjugate_quaternion(left), right),
+        )
+
+    def _inverse_extended_quadratic_form_derivative(self, left, right):
+        """Blocks of the derivative of _inverse_extended_quadratic_form with respect to left."""
+        Ql_left = operators.left_multiplation_matrix(left)
+        tmp = self.inverse_extended_inertias * operators.quaternion_product(
+            operators.conjugate_quaternion(left), right
+        )
+        conjugation = np.array([1.0, -1.0, -1.0, -1.0])
+
+        return 0.25 * (
+            operators.right_multiplication_matrix(tmp)
+            + (
+                Ql_left
+                * (self.inverse_extended_inertias * conjugation)[:, np.newaxis, :]
+            )
+            @ np.swapaxes(operators.left_multiplation_matrix(right), -1, -2)
+        )
 
-        return np.vstack(structure)
+    def inverse_mass_matrix_derivative(self, vector):
+        """Derivative of inverse_mass_matrix() @ vector with respect to the position."""
+        return self.assemble_block_diagonal(
+            self._inverse_extended_quadratic_form_derivative(
+                left=self.decompose_into_bodies(self.decompose_state()["position"]),
+                right=self.decompose_into_bodies(vector),
+            )
+        )
 
-    @staticmethod
-    def dynamic_viscosity(element, relative_displacement):
+    def kinetic_energy_gradient_from_momentum(self):
+        state = self.decompose_state()
+        return self._inverse_extended_quadratic_form(
+            left=self.decompose_into_bodies(state["momentum"]),
+            right=self.decompose_into_bodies(state["position"]),
+        ).ravel()
+
+    def kinetic_energy_hessian_from_momentum(self):
+        """Derivative of kinetic_energy_gradient_from_momentum() with respect to the position."""
+        p = self.decompose_into_bodies(self.decompose_state()["momentum"])
+        Ql_p = operators.left_multiplation_matrix(p)
 
-        viscosity = element["ground_viscosity"]
+        return self.assemble_block_diagonal(
+            0.25
+            * (Ql_p * self.inverse_extended_inertias[:, np.newaxis, :])
+            @ np.swapaxes(Ql_p, -1, -2)
+        )
 
-        if element["state_dependent"]:
-            viscosity += (
-                element["ground_viscosity"]
-                * element["alpha"]
-                * relative_displacement**2
+    def kinetic_energy_mixed_hessian_from_momentum(self):
+        """Derivative of kinetic_energy_gradient_from_momentum() with respect to the momentum."""
+        state = self.decompose_state()
+        return self.assemble_block_diagonal(
+            self._inverse_extended_quadratic_form_derivative(
+                left=self.decompose_into_bodies(state["momentum"]),
+                right=self.decompose_into_bodies(state["position"]),
             )
+        )
+
+    def kinetic_energy_gradient_from_velocity(self):
+        # Gradient of 0.5 * v.T @ mass_matrix() @ v, using G(q) @ v = -G(v) @ q
+        state = self.decompose_state()
+        v = self.decompose_into_bodies(state["velocity"])
+        q = self.decompose_into_bodies(state["position"])
+
+        return (
+            4.0
+            * operators.quaternion_product(
+                v,
+                self.extended_inertias
+                * operators.quaternion_product(operators.conjugate_quaternion(v), q),
+            )
+        ).ravel()
+
+    def external_potential(self):
+        return 0.0
+
+    def external_potential_gradient(self):
+        return np.zeros(self.nbr_dof)
+
+    def external_potential_hessian(self):
+        return self._zero_matrix()
+
+    def internal_potential(self):
+        return 0.0
+
+    def internal_potential_gradient(self):
+        return np.zeros(self.nbr_dof)
+
+    def internal_potential_hessian(self):
+        return self._zero_matrix()
+
+    def constraint(self):
+        quats = self.decompose_into_bodies(self.decompose_state()["position"])
+
+        return np.concatenate(
+            [
+                0.5 * ((quats * quats).sum(axis=-1) - 1.0),
+                np.einsum(
+                    "ni,nij,nj->n",
+                    quats[self.joint_start],
+                    self.joint_matrices,
+                    quats[self.joint_end],
+                ),
+            ]
+        )
+
+    def constraint_gradient(self):
+        return self._constraint_gradient(
+            quats=self.decompose_into_bodies(self.decompose_state()["position"])
+        )
+
+    def _constraint_gradient(self, quats):
+        bodies = np.arange(self.nbr_bodies)
+        joints = self.nbr_bodies + np.arange(len(self.joint_start))
+
+        return self.assemble_blocks(
+            blocks=np.concatenate(
+                [
+                    quats,
+                    np.einsum("nij,nj->ni", self.joint_matrices, quats[self.joint_end]),
+                    np.einsum(
+                        "nij,ni->nj", self.joint_matrices, quats[self.joint_start]
+                    ),
+                ]
+            )[:, np.newaxis, :],
+            row_bodies=np.concatenate([bodies, joints, joints]),
+            column_bodies=np.concatenate([bodies, self.joint_start, self.joint_end]),
+            nbr_rows=self.nbr_constraints,
+        )
+
+    def constraint_hessian(self, multiplier):
+        """Hessians of the constraints contracted with the multipliers."""
+        multiplier = np.asarray(multiplier)
+        bodies = np.arange(self.nbr_bodies)
+        joint_blocks = (
+            multiplier[self.nbr_bodies :, np.newaxis, np.newaxis] * self.joint_matrices
+        )
+
+        return self.assemble_blocks(
+            blocks=np.concatenate(
+                [
+                    multiplier[: self.nbr_bodies, np.newaxis, np.newaxis] * np.eye(4),
+                    joint_blocks,
+                    np.swapaxes(joint_blocks, -1, -2),
+                ]
+            ),
+            row_bodies=np.concatenate([bodies, self.joint_start, self.joint_end]),
+            column_bodies=np.concatenate([bodies, self.joint_end, self.joint_start]),
+        )
+
+    def constraint_gradient_derivative(self, vector):
+        """Derivative of constraint_gradient() @ vector with respect to the position."""
+        # Constraints are quadratic forms, hence the gradient is linear in the position
+        return self._constraint_gradient(quats=self.decompose_into_bodies(vector))
+
+    def dissipation_matrix(self):
+        return self._zero_matrix()
+
+    def dissipation_matrix_derivative(self, vector):
+        """Derivative of dissipation_matrix() @ vector with respect to the position."""
+        return self._zero_matrix()
 
-        return viscosity
+    def _zero_matrix(self):
+        return scipy.sparse.csr_array((self.nbr_dof, self.nbr_dof))
@@ -1,7 +1,7 @@
 import numpy as np
-from scipy.linalg import block_diag
+import scipy.linalg
 
-from . import abstract_base_classes, utils
+from . import abstract_base_classes, mass_operators, utils
 from .systems import System
 
 
@@ -27,18 +27,51 @@ class PortHamiltonianSystem(
     It includes ODEs for E(x) = I. Singular E induce true DAEs.
     """
 
+    # Allows for reusing factorizations of the nonsingular descriptor matrix
+    has_constant_descriptor_matrix = False
+
     def __init__(self, manager, state):
         self.manager = manager
         self.initialize_state(state)
         self.parametrization = ["state"]
         self.composed_hamiltonian = False
+        # Shared by all views
+        self.factorizations = {}
 
     def output(self):
         return self.port_matrix.T @ self.input_vector()
 
+    def solve_nonsingular_descriptor_transpose(self, rhs):
+        """
+        Solves nonsingular_descriptor_matrix().T @ x = rhs for right-hand sides of shape (..., n, k).
+        Constant descriptor matrices are factorized once.
+        """
+        matrix = utils.transpose(self.nonsingular_descriptor_matrix())
+
+        # Stacked matrices and dual numbers are not supported by LAPACK
+        if not (
+            self.has_constant_descriptor_matrix
+            and matrix.ndim == 2
+            and isinstance(rhs, np.ndarray)
+        ):
+            return np.linalg.solve(matrix, rhs)
+
+        if "nonsingular_descriptor_transpose" not in self.factorizations:
+            self.factorizations["nonsingular_descriptor_transpose"] = (
+                scipy.linalg.lu_factor(matrix)
+            )
+
+        return scipy.linalg.lu_solve(
+            self.factorizations["nonsingular_descriptor_transpose"], rhs
+        )
+
 
 class Pendulum2D(PortHamiltonianSystem):
 
+    supports_batched_states = True
+    complex_safe = True
+    has_constant_descriptor_matrix = True
+
     def __init__(
         self,
         manager,
@@ -61,13 +94,13 @@ class Pendulum2D(PortHamiltonianSystem):
 
     def decompose_state(self):
         state = self.state
-        assert len(state) == 2
+        assert state.shape[-1] == 2
         return dict(
             zip(
                 self.get_state_columns(),
                 [
-                    state[0],
-                    state[1],
+                    state[..., 0],
+                    state[..., 1],
                 ],
             )
         )
@@ -76,7 +109,7 @@ class Pendulum2D(PortHamiltonianSystem):
         state = self.decompose_state()
         q = state["angle"]
         v = state["angular_velocity"]
-        return np.array(
+        return utils.stack_vector(
             [
                 self.mass * self.gravity * self.length * np.sin(q),
                 v,
@@ -84,7 +117,7 @@ class Pendulum2D(PortHamiltonianSystem):
         )
 
     def get_algebraic_costate(self):
-        return []
+        return np.zeros(self.state.shape[:-1] + (0,))
 
     def hamiltonian(self):
         state = self.decompose_state()
@@ -99,7 +132,7 @@ class Pendulum2D(PortHamiltonianSystem):
         state = self.decompose_state()
         q = state["angle"]
         v = state["angular_velocity"]
-        return np.array(
+        return utils.stack_vector(
             [
                 self.mass * self.gravity * self.length * np.sin(q),
                 self.mass * self.length**2 * v,
@@ -113,7 +146,12 @@ class Pendulum2D(PortHamiltonianSystem):
         return np.array([[0, 1], [-1, 0]])
 
     def descriptor_matrix(self):
-        return np.diag([1, self.mass * self.length**2])
+        return utils.stack_matrix(
+            [
+                [1.0, 0.0],
+                [0.0, self.mass * self.length**2],
+            ]
+        )
 
     def nonsingular_descriptor_matrix(self):
         return self.descriptor_matrix()
@@ -127,6 +165,34 @@ class Pendulum2D(PortHamiltonianSystem):
     def dissipation_matrix(self):
         return np.zeros([2, 2])
 
+    def hamiltonian_differential_hessian(self):
+        q = self.decompose_state()["angle"]
+        zeros = np.zeros_like(q)
+        return utils.stack_matrix(
+            [
+                [self.mass * self.gravity * self.length * np.cos(q), zeros],
+                [zeros, self.mass * self.length**2 + zeros],
+            ]
+        )
+
+    def _zero_derivative(self, nbr_rows=2):
+        return np.zeros(self.state.shape[:-1] + (nbr_rows, 2))
+
+    def structure_matrix_derivative(self, vector):
+        return self._zero_derivative()
+
+    def dissipation_matrix_derivative(self, vector):
+        return self._zero_derivative()
+
+    def descriptor_matrix_derivative(self, vector):
+        return self._zero_derivative()
+
+    def nonsingular_descriptor_matrix_transpose_derivative(self, vector):
+        return self._zero_derivative()
+
+    def algebraic_costate_derivative(self):
+        return self._zero_derivative(nbr_rows=0)
+
 
 class PortHamiltonianMBS(PortHamiltonianSystem):
 
@@ -137,18 +203,45 @@ class PortHamiltonianMBS(PortHamiltonianSystem):
         self.composed_hamiltonian = True
         self.nbr_hamiltonian_parts = 2
         self.differential_state_composition = ["position", "momentum"]
+        # Constant parts of the system matrices, shared by all views
+        self.matrix_templates = {}
+
+    def get_matrix_template(self, name, build):
+        """
+        Returns the read-only template of a system matrix, which is built on first use.
+        Callers write state-dependent blocks into a copy of the template.
+        """
+        if name not in self.matrix_templates:
+            template = build()
+            template.flags.writeable = False
+            self.matrix_templates[name] = template
+
+        return self.matrix_templates[name]
 
     def copy(self, state):
         system = super().copy(state=state)
         system.mbs.state = state
         return system
 
+    def view(self, state):
+        system = super().view(state=state)
+        system.mbs = self.mbs.view(state=state)
+        return system
+
     def get_state_dimensions(self):
         return self.mbs.get_state_dimensions()
 
+    def state_coupling_pattern(self):
+        if not hasattr(self.mbs, "state_coupling_pattern"):
+            return None
+        return self.mbs.state_coupling_pattern()
+
     def get_state_columns(self):
         return self.mbs.get_state_columns()
 
+    def differential_state_mask(self):
+        return self.mbs.differential_state_mask()
+
     def decompose_state(self):
         return self.mbs.decompose_state()
 
@@ -209,54 +302,103 @@ class PortHamiltonianMBS(PortHamiltonianSystem):
 
         return mass_matrix @ v
 
-    def structure_matrix(self):
-        state = self.decompose_state()
-        q = state["position"]
-        v = state["momentum"]
-        lambd = state["multiplier"]
-        G = self.mbs.constraint_gradient()
+    def hamiltonian_differential_hessian(self):
+        """Derivative of hamiltonian_differential_gradient() with respect to the state."""
+        if not self.mbs.has_constant_mass_matrix:
+            return None
 
-        # Without constraints
-        structure_matrix = [
-            [
-                np.zeros((len(q), len(q))),
-                np.eye(len(q)),
-            ],
+        return np.concatenate(
             [
-                -np.eye(len(v)),
-                np.zeros((len(v), len(v))),
+                self.hamiltonian_differential_hessian_1(),
+                self.hamiltonian_differential_hessian_2(),
             ],
-        ]
+            axis=0,
+        )
 
-        if len(lambd) > 0:
-            # Constraint contributions
-            structure_matrix[0].append(
-                np.zeros((len(q), len(lambd))),
-            )
-            structure_matrix[1].append(-G.T)
-            structure_matrix.append(
-                [
-                    np.zeros((len(lambd), len(q))),
-                    G,
-                    np.zeros((len(lambd), len(lambd))),
-                ]
-            )
+    def hamiltonian_differential_hessian_1(self):
+        """Derivative of hamiltonian_differential_gradient_1() with respect to the state."""
+        nbr_dof = self.mbs.nbr_dof
+        hessian = np.zeros((nbr_dof, self.dim_state))
+        hessian[:, :nbr_dof] = utils.to_dense(
+            self.mbs.external_potential_hessian()
+            + self.mbs.internal_potential_hessian()
+        )
+        return hessian
 
-        return np.block(structure_matrix)
+    def hamiltonian_differential_hessian_2(self):
+        """Derivative of hamiltonian_differential_gradient_2() with respect to the state."""
+        if not self.mbs.has_constant_mass_matrix:
+            return None
 
-    def descriptor_matrix(self):
-        identity_mat = np.eye(self.mbs.nbr_dof)
-        mass_matrix = self.mbs.mass_matrix()
-        zeros_matrix = np.zeros((self.mbs.nbr_constraints, self.mbs.nbr_constraints))
-        descriptor_matrix = block_diag(identity_mat, mass_matrix, zeros_matrix)
+        nbr_dof = self.mbs.nbr_dof
+        hessian = np.zeros((nbr_dof, self.dim_state))
+        hessian[:, nbr_dof : 2 * nbr_dof] = utils.to_dense(self.mbs.mass_matrix())
+        return hessian
 
-        return descriptor_matrix
+    def structure_matrix(self):
+        nbr_dof = self.mbs.nbr_dof
+        template = self.get_matrix_template(
+            name="structure_matrix",
+            build=self._build_structure_matrix_template,
+        )
+
+        if self.mbs.nbr_constraints == 0:
+            # Structure matrix is constant as a whole
+            return template
+
+        # Constraint contributions
+        structure_matrix = template.copy()
+        G = utils.to_dense(self.mbs.constraint_gradient())
+        structure_matrix[nbr_dof : 2 * nbr_dof, 2 * nbr_dof :] = -G.T
+        structure_matrix[2 * nbr_dof :, nbr_dof : 2 * nbr_dof] = G
+
+        return structure_matrix
+
+    def _build_structure_matrix_template(self):
+        nbr_dof = self.mbs.nbr_dof
+        identity = np.eye(nbr_dof)
+        template = np.zeros((self.dim_state, self.dim_state))
+        template[:nbr_dof, nbr_dof : 2 * nbr_dof] = identity
+        template[nbr_dof : 2 * nbr_dof, :nbr_dof] = -identity
+        return template
+
+    def descriptor_matrix(self):
+        return self._get_descriptor_matrix(
+            name="descriptor_matrix",
+            dimension=self.dim_state,
+        )
 
     def nonsingular_descriptor_matrix(self):
-        identity_mat = np.eye(self.mbs.nbr_dof)
-        mass_matrix = self.mbs.mass_matrix()
+        return self._get_descriptor_matrix(
+            name="nonsingular_descriptor_matrix",
+            dimension=2 * self.mbs.nbr_dof,
+        )
 
-        return block_diag(identity_mat, mass_matrix)
+    def _get_descriptor_matrix(self, name, dimension):
+        nbr_dof = self.mbs.nbr_dof
+
+        def build(mass_matrix):
+            template = np.zeros((dimension, dimension))
+            template[:nbr_dof, :nbr_dof] = np.eye(nbr_dof)
+            template[nbr_dof : 2 * nbr_dof, nbr_dof : 2 * nbr_dof] = mass_matrix
+            return template
+
+        if self.mbs.has_constant_mass_matrix:
+            # Descriptor matrix is constant as a whole
+            return self.get_matrix_template(
+                name=name,
+                build=lambda: build(utils.to_dense(self.mbs.mass_matrix())),
+            )
+
+        descriptor_matrix = self.get_matrix_template(
+            name=name,
+            build=lambda: build(0.0),
+        ).copy()
+        descriptor_matrix[nbr_dof : 2 * nbr_dof, nbr_dof : 2 * nbr_dof] = (
+            utils.to_dense(self.mbs.mass_matrix())
+        )
+
+        return descriptor_matrix
 
     def hamiltonian(self):
         return self.hamiltonian_1() + self.hamiltonian_2()
@@ -276,13 +418,84 @@ class PortHamiltonianMBS(PortHamiltonianSystem):
         pass
 
     def dissipation_matrix(self):
-        zeros_matrix_1 = np.zeros([self.mbs.nbr_dof, self.mbs.nbr_dof])
-        diss_mat = self.mbs.dissipation_matrix()
-        zeros_matrix_2 = np.zeros((self.mbs.nbr_constraints, self.mbs.nbr_constraints))
-        ph_dissipation_matrix = block_diag(zeros_matrix_1, diss_mat, zeros_matrix_2)
+        nbr_dof = self.mbs.nbr_dof
+
+        def build(damping_matrix):
+            template = np.zeros((self.dim_state, self.dim_state))
+            template[nbr_dof : 2 * nbr_dof, nbr_dof : 2 * nbr_dof] = damping_matrix
+            return template
+
+        if self.mbs.has_constant_dissipation_matrix:
+            # Dissipation matrix is constant as a whole
+            return self.get_matrix_template(
+                name="dissipation_matrix",
+                build=lambda: build(utils.to_dense(self.mbs.dissipation_matrix())),
+            )
+
+        ph_dissipation_matrix = self.get_matrix_template(
+            name="dissipation_matrix",
+            build=lambda: build(0.0),
+        ).copy()
+        ph_dissipation_matrix[nbr_dof : 2 * nbr_dof, nbr_dof : 2 * nbr_dof] = (
+            utils.to_dense(self.mbs.dissipation_matrix())
+        )
 
         return ph_dissipation_matrix
 
+    def structure_matrix_derivative(self, vector):
+        """Derivative of structure_matrix() @ vector with respect to the state."""
+        nbr_dof = self.mbs.nbr_dof
+        derivative = np.zeros((self.dim_state, self.dim_state))
+
+        if self.mbs.nbr_constraints > 0:
+            vector_momentum = vector[nbr_dof : 2 * nbr_dof]
+            vector_multiplier = vector[2 * nbr_dof :]
+            derivative[nbr_dof : 2 * nbr_dof, :nbr_dof] = -utils.to_dense(
+                self.mbs.constraint_hessian(multiplier=vector_multiplier)
+            )
+            derivative[2 * nbr_dof :, :nbr_dof] = utils.to_dense(
+                self.mbs.constraint_gradient_derivative(vector=vector_momentum)
+            )
+
+        return derivative
+
+    def dissipation_matrix_derivative(self, vector):
+        """Derivative of dissipation_matrix() @ vector with respect to the state."""
+        nbr_dof = self.mbs.nbr_dof
+        derivative = np.zeros((self.dim_state, self.dim_state))
+        derivative[nbr_dof : 2 * nbr_dof, :nbr_dof] = utils.to_dense(
+            self.mbs.dissipation_matrix_derivative(vector=vector[nbr_dof : 2 * nbr_dof])
+        )
+        return derivative
+
+    def descriptor_matrix_derivative(self, vector):
+        """Derivative of descriptor_matrix() @ vector with respect to the state."""
+        if not self.mbs.has_constant_mass_matrix:
+            return None
+        return np.zeros((self.dim_state, self.dim_state))
+
+    def solve_nonsingular_descriptor_transpose(self, rhs):
+        """Block-wise solve, as the nonsingular descriptor matrix is block_diag(I, M) with symmetric M."""
+        nbr_dof = self.mbs.nbr_dof
+        mass_matrix = mass_operators.as_mass_operator(self.mbs.mass_matrix())
+
+        return np.concatenate(
+            [rhs[:nbr_dof], mass_matrix.solve(rhs[nbr_dof:])],
+            axis=0,
+        )
+
+    def nonsingular_descriptor_matrix_transpose_derivative(self, vector):
+        """Derivative of nonsingular_descriptor_matrix().T @ vector with respect to the state."""
+        if not self.mbs.has_constant_mass_matrix:
+            return None
+        return np.zeros((2 * self.mbs.nbr_dof, self.dim_state))
+
+    def algebraic_costate_derivative(self):
+        """Derivative of get_algebraic_costate() with respect to the state."""
+        derivative = np.zeros((self.mbs.nbr_constraints, self.dim_state))
+        derivative[:, 2 * self.mbs.nbr_dof :] = np.eye(self.mbs.nbr_constraints)
+        return derivative
+
     def dissipated_power(self):
         return np.dot(self.costates(), self.dissipation_matrix() @ self.costates())
 
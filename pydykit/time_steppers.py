@@ -1,12 +1,16 @@
-from itertools import pairwise
-
 import numpy as np
 
 from . import abstract_base_classes, utils
 
 
 class TimeStep(abstract_base_classes.TimeStep):
+
+    __slots__ = ("index", "time", "increment")
+
     def __init__(self, index: int, time: float, increment: float):
+        self.update(index=index, time=time, increment=increment)
+
+    def update(self, index: int, time: float, increment: float):
         self.index = index
         self.time = time
         self.increment = (
@@ -21,6 +25,29 @@ class TimeStepper(abstract_base_classes.TimeStepper):
         self.start = start
         self.end = end
 
+    @property
+    def current_step(self):
+        return self._current_step
+
+    def accept_step(self, current_state, next_state):
+        # Steps of non-adaptive time steppers are always accepted
+        return True
+
+    def make_steps(self):
+        """
+        Iterates the time grid given by the arrays self.times and self.increments.
+        A single step is moved in place and yielded at every point in time,
+        i.e., consumers have to copy the attributes of steps they want to keep.
+        """
+        self._current_step = TimeStep(
+            index=0,
+            time=self.times[0],
+            increment=self.increments[0],
+        )
+        for index, (time, increment) in enumerate(zip(self.times, self.increments)):
+            self._current_step.update(index=index, time=time, increment=increment)
+            yield self._current_step
+
 
 class FixedIncrement(TimeStepper):
     def __init__(self, manager, step_size: float, start: float, end: float):
@@ -38,20 +65,7 @@ class FixedIncrement(TimeStepper):
         self.times = self.identify_times()
 
         self.step_size = self.get_step_size()
-
-    @property
-    def current_step(self):
-        return self._current_step
-
-    def make_steps(self):
-        for index, time in enumerate(self.times):
-
-            self._current_step = TimeStep(
-                index=index,
-                time=time,
-                increment=self.step_size,  # fixed time step size
-            )
-            yield self._current_step
+        self.increments = np.full(self.nbr_time_points, self.step_size)
 
     def identify_times(self):
         return np.linspace(
@@ -64,7 +78,7 @@ class FixedIncrement(TimeStepper):
 
     def get_step_size(self):
 
-        step_sizes = np.array([n1 - n for n, n1 in pairwise(self.times)])
+        step_sizes = np.diff(self.times)
         step_size = step_sizes[0]
 
         step_sizes_all_equal = np.all(np.isclose(step_sizes, step_size))
@@ -90,19 +104,8 @@ class FixedIncrementHittingEnd(TimeStepper):
         self.nbr_time_points = len(self.times)
         self.nbr_steps = self.nbr_time_points - 1
 
-    def make_steps(self):
-        for index, time in enumerate(self.times):
-
-            self._current_step = TimeStep(
-                index=index,
-                time=time,
-                increment=time - self.times[index - 1],  # variable time step size
-            )
-            yield self._current_step
-
-    @property
-    def current_step(self):
-        return self._current_step
+        # Variable time step size, the initial point in time carries the nominal step size
+        self.increments = np.diff(self.times, prepend=self.start - self.step_size)
 
     def identify_times(self):
         tmp = np.arange(
@@ -121,3 +124,162 @@ class FixedIncrementHittingEnd(TimeStepper):
             raise utils.PydykitException("Unkown case")
 
         return tmp
+
+
+class AdaptiveIncrement(TimeStepper):
+    """
+    Adapts the increment based on an estimate of the local error obtained by step doubling.
+
+    Each step is repeated as two steps of half the increment.
+    For an integrator of order p, the difference of both solutions divided by 2^p - 1
+    estimates the local error of the full step.
+    Only differential state components enter the error norm, since the midpoint rule
+    does not reduce errors of algebraic components with the increment.
+    For the same reason, momenta of constrained multibody systems are left out,
+    see MultiBodySystem.differential_state_mask.
+    Steps whose scaled error norm exceeds one, or whose solution failed to converge, are rejected and retried.
+    Such a step at the minimal increment raises, instead of being accepted without error control.
+    The next increment follows from the controller
+    h_new = h * min(max_factor, max(min_factor, safety_factor * error^(-1/(p+1)))).
+    """
+
+    order = 2  # implicit midpoint rule
+    safety_factor = 0.9
+    min_factor = 0.2
+    max_factor = 5.0
+
+    def __init__(
+        self,
+        manager,
+        step_size: float,
+        start: float,
+        end: float,
+        absolute_tolerance: float,
+        relative_tolerance: float,
+        min_step_size: float,
+        max_step_size: float = None,
+    ):
+        super().__init__(
+            start=start,
+            end=end,
+            step_size=step_size,
+            manager=manager,
+        )
+        self.absolute_tolerance = absolute_tolerance
+        self.relative_tolerance = relative_tolerance
+        self.min_step_size = min_step_size
+        self.max_step_size = end - start if max_step_size is None else max_step_size
+
+        # Initial guess only, results grow as needed
+        self.nbr_time_points = (
+            int(np.ceil((self.end - self.start) / self.step_size)) + 1
+        )
+
+    def make_steps(self):
+        self.increment = self.step_size
+        index = 0
+        time = self.start
+
+        self._current_step = TimeStep(
+            index=index,
+            time=time,
+            increment=self.increment,
+        )
+        yield self._current_step
+
+        while self.end - time > 1e-12 * max(1.0, abs(self.end)):
+            increment = min(self.increment, self.end - time)
+
+            self._current_step = TimeStep(
+                index=index + 1,
+                time=time + increment,
+                increment=increment,
+            )
+            self.is_accepted = False
+            yield self._current_step
+
+            if self.is_accepted:
+                index += 1
+                time = self._current_step.time
+
+    def accept_step(self, current_state, next_state):
+        step = self.current_step
+        solver = self.manager.simulator.solver
+
+        if solver.has_failed:
+            error_norm = np.inf
+        else:
+            refined_state = self.solve_with_half_increments(
+                current_state=current_state, step=step
+            )
+            error_norm = self.get_error_norm(
+                current_state=current_state,
+                next_state=next_state,
+                refined_state=refined_state,
+            )
+
+        self.is_accepted = error_norm <= 1.0
+
+        if (not self.is_accepted) and (step.increment <= self.min_step_size):
+            raise utils.PydykitException(
+                f"Local error exceeds the tolerances at the minimal step size {self.min_step_size} "
+                f"at time {step.time}"
+            )
+
+        if not self.is_accepted:
+            # Retry with reduced increment
+            solver.has_failed = False
+
+        self.increment = self.get_next_increment(
+            increment=step.increment, error_norm=error_norm
+        )
+
+        return self.is_accepted
+
+    def solve_with_half_increments(self, current_state, step):
+        system = self.manager.system
+        solver = self.manager.simulator.solver
+        integrator = self.manager.integrator
+        half_increment = 0.5 * step.increment
+
+        state = current_state
+        for time in [step.time - half_increment, step.time]:
+            self._current_step = TimeStep(
+                index=step.index,
+                time=time,
+                increment=half_increment,
+            )
+            system.state = state
+            state = solver.solve(
+                func=integrator.get_residuum,
+                jacobian=integrator.get_tangent,
+                initial=state,
+            )
+
+        # Restore
+        system.state = current_state
+        self._current_step = step
+
+        if solver.has_failed:
+            solver.has_failed = False
+            return np.full_like(state, np.inf)
+
+        return state
+
+    def get_error_norm(self, current_state, next_state, refined_state):
+        mask = self.manager.system.differential_state_mask()
+        error = (refined_state - next_state)[..., mask] / (2**self.order - 1)
+        scale = self.absolute_tolerance + self.relative_tolerance * np.maximum(
+            np.abs(current_state[..., mask]), np.abs(next_state[..., mask])
+        )
+        # Root mean square over state components, worst member for stacked states
+        return np.max(np.sqrt(np.mean((error / scale) ** 2, axis=-1)))
+
+    def get_next_increment(self, increment, error_norm):
+        if error_norm == 0.0:
+            factor = self.max_factor
+        else:
+            factor = self.safety_factor * error_norm ** (-1.0 / (self.order + 1))
+        factor = min(self.max_factor, max(self.min_factor, factor))
+
+        return min(self.max_step_size, max(self.min_step_size, factor * increment))
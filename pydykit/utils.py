@@ -1,7 +1,10 @@
+import collections
+import functools
 import re
 
 import numpy as np
 import numpy.typing as npt
+import scipy.sparse
 import yaml
 
 from . import abstract_base_classes
@@ -53,40 +56,226 @@ class PydykitException(Exception):
     pass
 
 
-def get_numerical_tangent(func, state, incrementation_factor=1e-10):
+def get_numerical_tangent(
+    func,
+    state,
+    incrementation_factor=1e-10,
+    is_vectorized=False,
+    executor=None,
+):
+    """
+    Central finite-difference approximation of the Jacobian of func with respect to next_state.
+
+    Supports stacked states of shape (..., dimension), perturbing the same entry of all members at once.
+    If `is_vectorized`, all 2n perturbed states are stacked along a new leading axis and
+    func is evaluated once. Otherwise, the columns are evaluated one after another
+    or, if an executor is given, concurrently.
+    """
+
+    increments = incrementation_factor * (1.0 + abs(state))
 
-    state_dimension = len(state)
-    numerical_tangent = np.zeros(
-        (
-            state_dimension,
-            state_dimension,
+    if is_vectorized:
+        return get_numerical_tangent_vectorized(
+            func=func, state=state, increments=increments
         )
+
+    if executor is not None:
+        columns = list(
+            executor.map(
+                lambda index: get_numerical_tangent_column(
+                    func=func,
+                    state=state.copy(),
+                    increments=increments,
+                    index=index,
+                ),
+                range(state.shape[-1]),
+            )
+        )
+    else:
+        columns = [
+            get_numerical_tangent_column(
+                func=func, state=state, increments=increments, index=index
+            )
+            for index in range(state.shape[-1])
+        ]
+
+    return np.stack(columns, axis=-1)
+
+
+def get_numerical_tangent_column(func, state, increments, index):
+    saved_state_entry = state[..., index].copy()
+    increment = increments[..., index]
+
+    state[..., index] = saved_state_entry + increment
+
+    forward_incremented_function = func(
+        next_state=state,
     )
 
-    for index in range(state_dimension):
+    state[..., index] = saved_state_entry - increment
 
-        saved_state_entry = state[index]
+    backward_incremented_function = func(
+        next_state=state,
+    )
 
-        increment = incrementation_factor * (1.0 + abs(saved_state_entry))
-        state[index] = saved_state_entry + increment
+    state[..., index] = saved_state_entry
 
-        forward_incremented_function = func(
-            next_state=state,
-        )
+    return (
+        forward_incremented_function - backward_incremented_function
+    ) / np.expand_dims(2.0 * increment, axis=-1)
+
+
+def get_numerical_tangent_vectorized(func, state, increments):
+    state_dimension = state.shape[-1]
+
+    # offsets[index, ..., :] perturbs entry index, shape (dimension, ..., dimension)
+    offsets = np.moveaxis(
+        np.eye(state_dimension) * increments[..., np.newaxis, :], -2, 0
+    )
+    function_values = func(
+        next_state=np.concatenate([state + offsets, state - offsets], axis=0),
+    )
+    difference = function_values[:state_dimension] - function_values[state_dimension:]
+
+    return np.moveaxis(difference, 0, -1) / (2.0 * increments[..., np.newaxis, :])
+
+
+def color_columns(sparsity_pattern):
+    """
+    Greedy Curtis-Powell-Reid coloring of the columns of a sparsity pattern.
 
-        state[index] = saved_state_entry - increment
+    Columns of the same color do not share any row, such that they may be probed
+    together by a single finite-difference evaluation.
+    Columns are visited in order of decreasing number of conflicts.
+    """
+    pattern = scipy.sparse.csc_array(sparsity_pattern, dtype=bool).astype(np.int32)
+    conflicts = scipy.sparse.csr_array(pattern.T @ pattern)
+
+    nbr_columns = pattern.shape[1]
+    colors = np.full(nbr_columns, -1)
+    order = np.argsort(-np.diff(conflicts.indptr), kind="stable")
+
+    for column in order:
+        neighbors = conflicts.indices[
+            conflicts.indptr[column] : conflicts.indptr[column + 1]
+        ]
+        used = set(colors[neighbors])
+        color = 0
+        while color in used:
+            color += 1
+        colors[column] = color
+
+    return colors
+
+
+def get_colored_numerical_tangent(
+    func,
+    state,
+    sparsity_pattern,
+    colors,
+    incrementation_factor=1e-10,
+):
+    """
+    Central finite-difference approximation of a sparse Jacobian.
+
+    All columns of one color are perturbed at once, which requires
+    2 * nbr_colors instead of 2 * dimension function evaluations.
+    """
+    pattern = scipy.sparse.coo_array(sparsity_pattern)
+    rows, columns = pattern.row, pattern.col
+    increments = incrementation_factor * (1.0 + abs(state))
 
-        backward_incremented_function = func(
-            next_state=state,
+    nbr_colors = colors.max() + 1
+    differences = []
+
+    for color in range(nbr_colors):
+        direction = np.where(colors == color, increments, 0.0)
+        differences.append(
+            func(next_state=state + direction) - func(next_state=state - direction)
         )
 
-        state[index] = saved_state_entry
+    differences = np.array(differences)
+    data = differences[colors[columns], rows] / (2.0 * increments[columns])
+
+    return scipy.sparse.csr_array((data, (rows, columns)), shape=pattern.shape)
+
 
-        numerical_tangent[:, index] = (
-            forward_incremented_function - backward_incremented_function
-        ) / (2.0 * increment)
+def stack_vector(entries):
+    """
+    Stacks scalar or batched entries along the last axis.
+    Batched entries, e.g., of shape (n_members,), are broadcast against each other.
+    """
+    return np.stack(np.broadcast_arrays(*entries), axis=-1)
 
-    return numerical_tangent
+
+def stack_matrix(rows):
+    """
+    Stacks nested lists of scalar or batched entries to matrices occupying the last two axes.
+    """
+    nbr_rows, nbr_columns = len(rows), len(rows[0])
+    entries = np.broadcast_arrays(*[entry for row in rows for entry in row])
+    return np.stack(entries, axis=-1).reshape(
+        entries[0].shape + (nbr_rows, nbr_columns)
+    )
+
+
+def matvec(matrix, vector):
+    """Matrix-vector product broadcasting over leading batch axes."""
+    return (matrix @ vector[..., np.newaxis])[..., 0]
+
+
+def solve(matrix, vector):
+    """Solves linear systems, broadcasting over leading batch axes."""
+    return np.linalg.solve(matrix, vector[..., np.newaxis])[..., 0]
+
+
+def transpose(matrix):
+    return np.swapaxes(matrix, -1, -2)
+
+
+def to_dense(matrix):
+    if scipy.sparse.issparse(matrix) or isinstance(
+        matrix, abstract_base_classes.MassOperator
+    ):
+        return matrix.toarray()
+    return matrix
+
+
+def block_matrix(blocks, block_sizes):
+    """
+    Assembles a square block matrix, where None denotes a zero block.
+    The result is sparse if any of the blocks is sparse or a mass operator, otherwise it is a dense array.
+    """
+    if any(
+        scipy.sparse.issparse(block)
+        or isinstance(block, abstract_base_classes.MassOperator)
+        for row in blocks
+        for block in row
+    ):
+        return scipy.sparse.block_array(
+            [
+                [
+                    (
+                        block.to_sparse()
+                        if isinstance(block, abstract_base_classes.MassOperator)
+                        else block
+                    )
+                    for block in row
+                ]
+                for row in blocks
+            ],
+            format="csr",
+        )
+
+    return np.block(
+        [
+            [
+                np.zeros((nbr_rows, nbr_columns)) if block is None else block
+                for nbr_columns, block in zip(block_sizes, row)
+            ]
+            for nbr_rows, row in zip(block_sizes, blocks)
+        ]
+    )
 
 
 def print_current_step(step):
@@ -140,6 +329,79 @@ def get_system_copies_with_desired_states(
     )
 
 
+def get_system_views_with_desired_states(
+    system: abstract_base_classes.System,
+    states: list[npt.ArrayLike],
+):
+    return map(
+        lambda state: system.view(state=state),
+        states,
+    )
+
+
+def get_state_indices(system, get_entries):
+    """Indices of the state entries, which get_entries selects from a system, e.g., a component of decompose_state."""
+    return get_entries(system.view(state=np.arange(system.dim_state)))
+
+
+class SystemViewCache:
+    """
+    Keeps system views at the start of the current time step and at recently evaluated end states.
+
+    The listed quantities are memoized per view, i.e., they are evaluated at most once per state.
+    A view of an evaluated end state is promoted to the start of the next time step,
+    if that state has been accepted.
+    """
+
+    def __init__(self, quantities, nbr_end_views=2):
+        self.quantities = quantities
+        self.start_view = None
+        self.end_views = collections.deque(maxlen=nbr_end_views)
+
+    def create_view(self, system, state):
+        state = np.array(state, copy=True)
+        view = system.view(state=state)
+
+        for name in self.quantities:
+            if hasattr(view, name):
+                setattr(view, name, functools.cache(getattr(view, name)))
+
+        return system, state, view
+
+    @staticmethod
+    def matches(entry, system, state):
+        return (
+            (entry is not None)
+            and (entry[0] is system)
+            and (entry[1].shape == np.shape(state))
+            and np.array_equal(entry[1], state)
+        )
+
+    def get_start_view(self, system, state):
+        if not self.matches(self.start_view, system, state):
+            self.start_view = next(
+                (
+                    entry
+                    for entry in reversed(self.end_views)
+                    if self.matches(entry, system, state)
+                ),
+                None,
+            ) or self.create_view(system=system, state=state)
+            self.end_views.clear()
+
+        return self.start_view[2]
+
+    def get_end_view(self, system, state):
+        for entry in [self.start_view, *reversed(self.end_views)]:
+            if self.matches(entry, system, state):
+                return entry[2]
+
+        entry = self.create_view(system=system, state=state)
+        self.end_views.append(entry)
+
+        return entry[2]
+
+
 def select(
     position_vectors,
     element,
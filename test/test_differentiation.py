@@ -0,0 +1,89 @@
+import copy
+
+import numpy as np
+import pytest
+
+import pydykit.examples
+from pydykit import differentiation
+from pydykit.configuration import Configuration
+from pydykit.managers import Manager
+from pydykit.utils import PydykitException
+
+from .constants import A_TOL, PATH_REFERENCE_RESULTS, R_TOL
+from .utils import load_result_of_pydykit_simulation
+
+example_manager = pydykit.examples.ExampleManager()
+
+engines = ["complex_step", "dual_numbers"]
+
+
+def get_manager(name, **integrator):
+    content_config_file = copy.deepcopy(example_manager.get_example(name=name))
+    content_config_file["integrator"].update(integrator)
+    manager = Manager()
+    manager.configure(configuration=Configuration(**content_config_file))
+    return manager
+
+
+def get_manager_within_first_step(name, **integrator):
+    manager = get_manager(name=name, **integrator)
+    steps = manager.time_stepper.make_steps()
+    next(steps)
+    next(steps)
+    return manager
+
+
+class TestDifferentiationEngines:
+    @pytest.mark.parametrize("engine", engines)
+    @pytest.mark.parametrize("is_vectorized", [False, True])
+    @pytest.mark.parametrize("name", ["lorenz", "reactor"])
+    def test_match_analytical_tangent(self, name, engine, is_vectorized):
+        manager = get_manager_within_first_step(name=name)
+        state = manager.system.state + 0.1
+
+        tangent = differentiation.get_tangent(
+            func=manager.integrator.get_residuum,
+            state=state.copy(),
+            engine=engine,
+            is_vectorized=is_vectorized,
+        )
+
+        assert np.allclose(
+            tangent, manager.integrator.get_tangent(state), rtol=1e-12, atol=1e-12
+        )
+
+    @pytest.mark.parametrize("engine", engines)
+    def test_reproduce_reference_results(self, engine):
+        manager = get_manager(name="pendulum_2d", differentiation_engine=engine)
+        new = manager.manage().to_df()
+        old = load_result_of_pydykit_simulation(
+            path=PATH_REFERENCE_RESULTS.joinpath("pendulum_2d.csv")
+        )
+        assert np.allclose(old, new, rtol=R_TOL, atol=A_TOL)
+
+    def test_stacked_states(self):
+        manager = get_manager_within_first_step(name="pendulum_2d")
+        state = np.array([[0.1, 1.0], [0.5, -0.2], [1.0, 0.3]])
+        manager.system.state = state + 0.05
+
+        tangents = differentiation.get_tangent(
+            func=manager.integrator.get_residuum,
+            state=state.copy(),
+            engine="dual_numbers",
+        )
+        reference = differentiation.get_tangent(
+            func=manager.integrator.get_residuum,
+            state=state.copy(),
+            engine="complex_step",
+        )
+
+        assert tangents.shape == (3, 2, 2)
+        assert np.allclose(tangents, reference, rtol=1e-12, atol=1e-12)
+
+    def test_unsafe_system(self):
+        manager = get_manager_within_first_step(
+            name="four_particle_system_ph_discrete_gradient_dissipative",
+            differentiation_engine="complex_step",
+        )
+        with pytest.raises(PydykitException):
+            manager.integrator.get_tangent(manager.system.state)
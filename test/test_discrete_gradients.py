@@ -0,0 +1,220 @@
+import copy
+
+import numpy as np
+import pytest
+
+import pydykit.examples
+from pydykit import discrete_gradients
+from pydykit.configuration import Configuration
+from pydykit.managers import Manager
+from pydykit.utils import get_numerical_tangent, to_dense
+
+example_manager = pydykit.examples.ExampleManager()
+
+
+def get_constraints(rng, nbr_functions=4, dim=6):
+    matrix = rng.normal(size=(nbr_functions, dim))
+
+    def func(argument):
+        return 0.5 * np.sum(matrix * argument[np.newaxis, :] ** 2, axis=1)
+
+    def jacobian(argument):
+        return matrix * argument[np.newaxis, :]
+
+    return func, jacobian
+
+
+class TestGonzalezKernel:
+    def test_discrete_gradient_property(self):
+        rng = np.random.default_rng(seed=0)
+        func, jacobian = get_constraints(rng)
+        argument_n, argument_n1 = rng.normal(size=(2, 6))
+        midpoint_jacobian = jacobian(0.5 * (argument_n + argument_n1))
+        reference = midpoint_jacobian.copy()
+
+        discrete_gradient = discrete_gradients.Gonzalez_discrete_gradient(
+            func(argument_n),
+            func(argument_n1),
+            midpoint_jacobian,
+            argument_n,
+            argument_n1,
+            1e-12,
+        )
+
+        assert np.allclose(
+            discrete_gradient @ (argument_n1 - argument_n),
+            func(argument_n1) - func(argument_n),
+        )
+        assert np.array_equal(midpoint_jacobian, reference)
+
+    def test_small_increment_returns_midpoint_jacobian(self):
+        rng = np.random.default_rng(seed=1)
+        func, jacobian = get_constraints(rng)
+        argument = rng.normal(size=6)
+
+        discrete_gradient = discrete_gradients.Gonzalez_discrete_gradient(
+            func(argument),
+            func(argument),
+            jacobian(argument),
+            argument,
+            argument,
+            1e-12,
+        )
+
+        assert np.array_equal(discrete_gradient, jacobian(argument))
+
+    def test_factory_kernel(self):
+        for type in ["Gonzalez", "Gonzalez_decomposed"]:
+            assert (
+                discrete_gradients.DiscreteGradientFactory.create(type).kernel
+                is discrete_gradients.Gonzalez_discrete_gradient
+            )
+
+    def test_out_buffer(self):
+        rng = np.random.default_rng(seed=4)
+        func, jacobian = get_constraints(rng)
+        argument_n = rng.normal(size=6)
+
+        for argument_n1 in [argument_n + rng.normal(size=6), argument_n]:
+            midpoint_jacobian = jacobian(0.5 * (argument_n + argument_n1))
+            reference = midpoint_jacobian.copy()
+            out = np.full_like(midpoint_jacobian, np.nan)
+
+            discrete_gradient = discrete_gradients.Gonzalez_discrete_gradient_batched(
+                func(argument_n),
+                func(argument_n1),
+                midpoint_jacobian,
+                argument_n,
+                argument_n1,
+                1e-12,
+                out=out,
+            )
+
+            assert discrete_gradient is out
+            assert np.allclose(
+                out,
+                discrete_gradients.Gonzalez_discrete_gradient_batched(
+                    func(argument_n),
+                    func(argument_n1),
+                    midpoint_jacobian,
+                    argument_n,
+                    argument_n1,
+                    1e-12,
+                ),
+            )
+            assert np.array_equal(midpoint_jacobian, reference)
+
+    def test_batched_matches_single(self):
+        rng = np.random.default_rng(seed=2)
+        func, jacobian = get_constraints(rng)
+        arguments_n = rng.normal(size=(5, 6))
+        arguments_n1 = arguments_n + rng.normal(size=(5, 6))
+        # Last member without increment
+        arguments_n1[-1] = arguments_n[-1]
+
+        funcs_n = np.array([func(argument) for argument in arguments_n])
+        funcs_n1 = np.array([func(argument) for argument in arguments_n1])
+        midpoint_jacobians = np.array(
+            [jacobian(argument) for argument in 0.5 * (arguments_n + arguments_n1)]
+        )
+
+        batched = discrete_gradients.Gonzalez_discrete_gradient_batched(
+            funcs_n,
+            funcs_n1,
+            midpoint_jacobians,
+            arguments_n,
+            arguments_n1,
+            1e-12,
+        )
+
+        for index in range(5):
+            assert np.allclose(
+                batched[index],
+                discrete_gradients.Gonzalez_discrete_gradient(
+                    funcs_n[index],
+                    funcs_n1[index],
+                    midpoint_jacobians[index],
+                    arguments_n[index],
+                    arguments_n1[index],
+                    1e-12,
+                ),
+            )
+
+
+def get_particle_manager(discrete_gradient_type):
+    content_config_file = copy.deepcopy(
+        example_manager.get_example(
+            name="four_particle_system_discrete_gradient_dissipative"
+        )
+    )
+    content_config_file["integrator"]["discrete_gradient_type"] = discrete_gradient_type
+    manager = Manager()
+    manager.configure(configuration=Configuration(**content_config_file))
+    return manager
+
+
+class TestElementwiseDiscreteGradient:
+    @pytest.mark.parametrize(
+        "func_name, jacobian_name",
+        [
+            ("internal_potential", "internal_potential_gradient"),
+            ("constraint", "constraint_gradient"),
+            ("external_potential", "external_potential_gradient"),
+        ],
+    )
+    def test_discrete_gradient_property(self, func_name, jacobian_name):
+        manager = get_particle_manager(discrete_gradient_type="Gonzalez_elementwise")
+        system = manager.system
+        rng = np.random.default_rng(seed=3)
+        state_n = system.state
+        state_n1 = state_n + 0.1 * rng.normal(size=state_n.shape)
+
+        system_n, system_n1, system_n05 = (
+            system.view(state=state)
+            for state in [state_n, state_n1, 0.5 * (state_n + state_n1)]
+        )
+        q_n = system_n.decompose_state()["position"]
+        q_n1 = system_n1.decompose_state()["position"]
+
+        discrete_gradient = discrete_gradients.discrete_gradient(
+            system_n=system_n,
+            system_n1=system_n1,
+            system_n05=system_n05,
+            func_name=func_name,
+            jacobian_name=jacobian_name,
+            argument_n=q_n,
+            argument_n1=q_n1,
+            type="Gonzalez_elementwise",
+        )
+
+        assert np.allclose(
+            discrete_gradient @ (q_n1 - q_n),
+            getattr(system_n1, func_name)() - getattr(system_n, func_name)(),
+        )
+
+    def test_simulation_matches_global_discrete_gradient(self):
+        results = []
+        for discrete_gradient_type in ["Gonzalez", "Gonzalez_elementwise"]:
+            manager = get_particle_manager(discrete_gradient_type)
+            results.append(manager.manage().to_df())
+
+        # Both are second-order accurate, but differ in their correction terms
+        columns = results[0].filter(like="position").columns
+        assert np.allclose(results[0][columns], results[1][columns], atol=1e-2)
+
+    def test_colored_tangent(self):
+        manager = get_particle_manager(discrete_gradient_type="Gonzalez_elementwise")
+        steps = manager.time_stepper.make_steps()
+        next(steps)
+        next(steps)
+        state = manager.system.state + 0.01
+
+        sparsity_pattern, colors = manager.integrator.get_tangent_coloring()
+        assert sparsity_pattern is not None
+
+        assert np.allclose(
+            to_dense(manager.integrator.get_tangent(state)),
+            get_numerical_tangent(func=manager.integrator.get_residuum, state=state),
+            rtol=1e-6,
+            atol=1e-6,
+        )
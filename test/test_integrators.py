@@ -0,0 +1,371 @@
+import concurrent.futures
+import copy
+
+import numpy as np
+import pytest
+import scipy.sparse
+
+import pydykit.examples
+from pydykit.configuration import Configuration
+from pydykit.integrators import Rattle
+from pydykit.managers import Manager
+from pydykit.systems_multi_body import ParticleSystem
+from pydykit.systems_port_hamiltonian import PortHamiltonianMBS
+from pydykit.utils import (
+    PydykitException,
+    color_columns,
+    get_numerical_tangent,
+    to_dense,
+)
+
+example_manager = pydykit.examples.ExampleManager()
+
+worklist = [
+    "pendulum_3d",
+    "two_particle_system",
+    "four_particle_system_midpoint",
+    "four_particle_system_discrete_gradient_dissipative",
+    "visco_pendulum",
+    "rigid_body_rotating_quaternion",
+]
+
+
+def get_manager_within_first_step(name):
+    manager = Manager()
+    configuration = Configuration(**example_manager.get_example(name=name))
+    manager.configure(configuration=configuration)
+
+    steps = manager.time_stepper.make_steps()
+    next(steps)
+    next(steps)
+
+    return manager
+
+
+class TestAnalyticalTangents:
+    @pytest.mark.parametrize("name", worklist)
+    def test_compare_with_numerical_tangent(self, name):
+        manager = get_manager_within_first_step(name=name)
+
+        rng = np.random.default_rng(seed=0)
+        manager.system.state = manager.system.state + 0.05 * rng.normal(
+            size=manager.system.state.shape
+        )
+        state = manager.system.state + 0.05 * rng.normal(
+            size=manager.system.state.shape
+        )
+
+        analytical = to_dense(manager.integrator.get_tangent(state))
+        numerical = get_numerical_tangent(
+            func=manager.integrator.get_residuum,
+            state=state.copy(),
+            incrementation_factor=1e-6,
+        )
+
+        assert np.allclose(analytical, numerical, rtol=1e-6, atol=1e-6)
+
+
+class TestNumericalTangent:
+    @pytest.mark.parametrize("name", ["pendulum_2d", "four_particle_system_midpoint"])
+    def test_vectorized_and_threaded_match_sequential(self, name):
+        manager = get_manager_within_first_step(name=name)
+        state = manager.system.state + 0.01
+        func = manager.integrator.get_residuum
+
+        sequential = get_numerical_tangent(func=func, state=state.copy())
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            threaded = get_numerical_tangent(
+                func=func, state=state.copy(), executor=executor
+            )
+        assert np.array_equal(sequential, threaded)
+
+        if manager.integrator.is_vectorized:
+            vectorized = get_numerical_tangent(
+                func=func, state=state.copy(), is_vectorized=True
+            )
+            assert np.allclose(sequential, vectorized, rtol=1e-8, atol=1e-8)
+
+    @pytest.mark.parametrize(
+        "integrator",
+        [
+            # Analytical tangent with finite-difference fallbacks for state-dependent masses
+            {"class_name": "MidpointPH"},
+            {
+                "class_name": "DiscreteGradientPHDAE",
+                "increment_tolerance": 1e-12,
+                "discrete_gradient_type": "Gonzalez_decomposed",
+            },
+        ],
+    )
+    def test_configured_workers(self, integrator):
+        content_config_file = copy.deepcopy(
+            example_manager.get_example(name="rigid_body_rotating_quaternion")
+        )
+        content_config_file["integrator"] = dict(
+            integrator, numerical_tangent_workers=2
+        )
+
+        class CountingExecutor(concurrent.futures.ThreadPoolExecutor):
+            nbr_calls = 0
+
+            def map(self, *args, **kwargs):
+                self.nbr_calls += 1
+                return super().map(*args, **kwargs)
+
+        def get_tangent(executor):
+            manager = Manager()
+            manager.configure(configuration=Configuration(**content_config_file))
+            manager.system = PortHamiltonianMBS(manager=manager)
+            manager.integrator.numerical_tangent_executor = executor
+
+            steps = manager.time_stepper.make_steps()
+            next(steps)
+            next(steps)
+            state = manager.system.state + 0.01
+
+            return manager.integrator.get_tangent(state)
+
+        with CountingExecutor(max_workers=2) as executor:
+            threaded = get_tangent(executor=executor)
+        content_config_file["integrator"].pop("numerical_tangent_workers")
+        sequential = get_tangent(executor=None)
+
+        assert executor.nbr_calls > 0
+        assert np.array_equal(to_dense(threaded), to_dense(sequential))
+
+
+class TestColoredTangent:
+    def test_compare_with_dense_tangent(self):
+        content_config_file = copy.deepcopy(
+            example_manager.get_example(
+                name="four_particle_system_discrete_gradient_dissipative"
+            )
+        )
+        # Element-wise discrete gradients rely on the numerical tangent
+        content_config_file["integrator"][
+            "discrete_gradient_type"
+        ] = "Gonzalez_elementwise"
+        manager = Manager()
+        manager.configure(configuration=Configuration(**content_config_file))
+
+        steps = manager.time_stepper.make_steps()
+        next(steps)
+        next(steps)
+        state = manager.system.state + 0.01
+
+        sparsity_pattern, colors = manager.integrator.get_tangent_coloring()
+        assert colors.max() + 1 < manager.system.dim_state
+
+        colored = manager.integrator.get_tangent(state)
+        assert scipy.sparse.issparse(colored)
+        assert np.allclose(
+            to_dense(colored),
+            get_numerical_tangent(func=manager.integrator.get_residuum, state=state),
+            rtol=1e-6,
+            atol=1e-6,
+        )
+
+    @pytest.mark.parametrize("dimension", [10, 100, 1000])
+    def test_number_of_colors_of_banded_pattern(self, dimension):
+        pattern = scipy.sparse.diags_array(
+            [np.ones(dimension - 1), np.ones(dimension), np.ones(dimension - 1)],
+            offsets=[-1, 0, 1],
+        )
+        assert color_columns(pattern).max() + 1 == 3
+
+
+class TestStartOfStepCache:
+    def test_start_of_step_quantities_are_evaluated_once(self, monkeypatch):
+        manager = get_manager_within_first_step(
+            name="four_particle_system_discrete_gradient_dissipative"
+        )
+        evaluated_states = []
+        internal_potential = ParticleSystem.internal_potential
+
+        def counting_internal_potential(system):
+            evaluated_states.append(system.state.copy())
+            return internal_potential(system)
+
+        monkeypatch.setattr(
+            ParticleSystem, "internal_potential", counting_internal_potential
+        )
+
+        state_n = manager.system.state.copy()
+        next_state = state_n + 0.01
+
+        for _ in range(3):
+            manager.integrator.get_residuum(next_state)
+            manager.integrator.get_tangent(next_state)
+
+        # Start and end of step, each evaluated once
+        assert len(evaluated_states) == 2
+
+        # Accepted end-of-step values are reused in the following step
+        manager.system.state = next_state
+        manager.integrator.get_residuum(next_state + 0.01)
+
+        assert len(evaluated_states) == 3
+        assert np.array_equal(evaluated_states[-1], next_state + 0.01)
+
+
+class TestPortHamiltonianTangents:
+    @pytest.mark.parametrize(
+        "name, integrator",
+        [
+            ("four_particle_system_ph_midpoint", {}),
+            ("four_particle_system_ph_discrete_gradient_dissipative", {}),
+            (
+                "four_particle_system_ph_discrete_gradient_dissipative",
+                {"discrete_gradient_type": "Gonzalez"},
+            ),
+            # Rigid bodies rely on finite differences for state-dependent masses
+            (
+                "rigid_body_rotating_quaternion",
+                {"class_name": "MidpointPH"},
+            ),
+            (
+                "rigid_body_rotating_quaternion",
+                {
+                    "class_name": "DiscreteGradientPHDAE",
+                    "increment_tolerance": 1e-12,
+                    "discrete_gradient_type": "Gonzalez_decomposed",
+                },
+            ),
+        ],
+    )
+    def test_compare_with_numerical_tangent(self, name, integrator):
+        content_config_file = copy.deepcopy(example_manager.get_example(name=name))
+        if "class_name" in integrator:
+            content_config_file["integrator"] = integrator
+        else:
+            content_config_file["integrator"].update(integrator)
+
+        manager = Manager()
+        manager.configure(configuration=Configuration(**content_config_file))
+        manager.system = PortHamiltonianMBS(manager=manager)
+
+        steps = manager.time_stepper.make_steps()
+        next(steps)
+        next(steps)
+
+        rng = np.random.default_rng(seed=0)
+        manager.system.state = manager.system.state + 0.05 * rng.normal(
+            size=manager.system.state.shape
+        )
+        state = manager.system.state + 0.05 * rng.normal(
+            size=manager.system.state.shape
+        )
+
+        analytical = manager.integrator.get_tangent(state)
+        numerical = get_numerical_tangent(
+            func=manager.integrator.get_residuum,
+            state=state.copy(),
+            incrementation_factor=1e-6,
+        )
+
+        # Finite-difference fallbacks are less accurate for large entries
+        assert np.allclose(
+            analytical, numerical, rtol=1e-4, atol=1e-6 * np.abs(numerical).max()
+        )
+
+    def test_batched_pendulum(self):
+        manager = get_manager_within_first_step(name="pendulum_2d")
+        states = manager.system.state + np.array([[0.0, 0.0], [0.3, -0.2]])
+        manager.system.state = states
+        next_states = states + 0.01
+
+        numerical = get_numerical_tangent(
+            func=manager.integrator.get_residuum,
+            state=next_states.copy(),
+            incrementation_factor=1e-6,
+        )
+
+        assert np.allclose(
+            manager.integrator.get_tangent(next_states), numerical, atol=1e-6
+        )
+
+
+def run_with_integrator(name, integrator, step_size, end):
+    content = copy.deepcopy(example_manager.get_example(name=name))
+    content["integrator"] = integrator
+    content["time_stepper"]["step_size"] = step_size
+    content["time_stepper"]["end"] = end
+    manager = Manager()
+    manager.configure(configuration=Configuration(**content))
+    manager.manage()
+    return manager
+
+
+class TestExplicitIntegrators:
+    def test_stoermer_verlet_is_second_order(self):
+        states = [
+            run_with_integrator(
+                name="visco_pendulum",
+                integrator={"class_name": "StoermerVerlet"},
+                step_size=step_size,
+                end=0.2,
+            ).system.state
+            for step_size in [4e-3, 2e-3, 1e-3]
+        ]
+
+        # Differences of successive refinements decrease with the order of the scheme
+        ratio = (
+            np.abs(states[0] - states[1]).max() / np.abs(states[1] - states[2]).max()
+        )
+        assert 3.0 < ratio < 5.0
+
+    @pytest.mark.parametrize(
+        "name",
+        [
+            "pendulum_3d",
+            "two_particle_system",
+            "four_particle_system_midpoint",
+        ],
+    )
+    def test_rattle_preserves_constraints(self, name):
+        manager = run_with_integrator(
+            name=name,
+            integrator={"class_name": "Rattle"},
+            step_size=2e-3,
+            end=0.1,
+        )
+        midpoint = run_with_integrator(
+            name=name,
+            integrator={"class_name": "MidpointMultibody"},
+            step_size=2e-3,
+            end=0.1,
+        )
+        system = manager.system
+        nbr_dof = system.nbr_dof
+
+        assert np.allclose(system.constraint(), 0.0, atol=1e-10)
+        assert np.allclose(system.constraint_velocity(), 0.0, atol=1e-10)
+        assert np.allclose(
+            system.state[: 2 * nbr_dof],
+            midpoint.system.state[: 2 * nbr_dof],
+            atol=1e-3,
+        )
+
+    def test_residuum_of_explicit_map(self):
+        manager = get_manager_within_first_step(name="pendulum_3d")
+        manager.integrator = Rattle(manager=manager)
+        next_state = manager.integrator.get_next_state()
+
+        assert np.allclose(manager.integrator.get_residuum(next_state), 0.0)
+
+    @pytest.mark.parametrize(
+        ("name", "integrator"),
+        [
+            ("pendulum_3d", "StoermerVerlet"),
+            ("rigid_body_rotating_quaternion", "Rattle"),
+        ],
+    )
+    def test_unsupported_systems(self, name, integrator):
+        content = copy.deepcopy(example_manager.get_example(name=name))
+        content["integrator"] = {"class_name": integrator}
+        manager = Manager()
+        manager.configure(configuration=Configuration(**content))
+
+        with pytest.raises(PydykitException):
+            manager.manage()
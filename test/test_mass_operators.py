@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+import scipy.linalg
+import scipy.sparse
+
+from pydykit import mass_operators, utils
+
+
+def get_operators(rng, dimension=6):
+    diagonal = rng.uniform(1.0, 2.0, size=dimension)
+    factor = rng.normal(size=(dimension, dimension))
+    matrix = factor @ factor.T + dimension * np.eye(dimension)
+    blocks = np.stack([matrix[:2, :2], matrix[2:4, 2:4], matrix[4:, 4:]])
+
+    return [
+        (mass_operators.DiagonalMassOperator(diagonal), np.diag(diagonal)),
+        (mass_operators.DenseMassOperator(matrix), matrix),
+        (
+            mass_operators.BlockDiagonalMassOperator(blocks),
+            scipy.linalg.block_diag(*blocks),
+        ),
+    ]
+
+
+class TestMassOperators:
+    @pytest.mark.parametrize("index", [0, 1, 2])
+    def test_matches_dense_matrix(self, index):
+        rng = np.random.default_rng(seed=0)
+        operator, matrix = get_operators(rng)[index]
+        vector = rng.normal(size=operator.shape[0])
+        other = rng.normal(size=operator.shape)
+        sparse = scipy.sparse.csr_array(other)
+
+        assert np.allclose(operator @ vector, matrix @ vector)
+        assert np.allclose(vector @ operator, vector @ matrix)
+        assert np.allclose(operator @ other, matrix @ other)
+        assert np.allclose(other @ operator, other @ matrix)
+        assert np.allclose(utils.to_dense(sparse @ operator), other @ matrix)
+        assert np.allclose(utils.to_dense(-2.0 * operator), -2.0 * matrix)
+        assert np.allclose(operator.solve(vector), np.linalg.solve(matrix, vector))
+        assert np.allclose(operator.inverse().toarray(), np.linalg.inv(matrix))
+        assert np.allclose(operator.to_sparse().toarray(), matrix)
+
+    def test_block_embedding_is_sparse(self):
+        operator = mass_operators.DiagonalMassOperator(np.arange(1.0, 4.0))
+
+        block_matrix = utils.block_matrix(
+            blocks=[[np.eye(3), None], [None, operator]],
+            block_sizes=[3, 3],
+        )
+
+        assert scipy.sparse.issparse(block_matrix)
+        assert np.allclose(
+            block_matrix.toarray(),
+            np.diag([1.0, 1.0, 1.0, 1.0, 2.0, 3.0]),
+        )
+
+    def test_cholesky_factor_is_cached(self):
+        operator = mass_operators.DenseMassOperator(np.diag([1.0, 2.0]))
+        operator.solve(np.ones(2))
+        factor = operator.cholesky_factor
+        operator.solve(np.ones(2))
+
+        assert operator.cholesky_factor is factor
+
+    @pytest.mark.parametrize("index", [0, 1, 2])
+    def test_scaled_operators_are_operators(self, index):
+        rng = np.random.default_rng(seed=1)
+        operator, matrix = get_operators(rng)[index]
+        vector = rng.normal(size=operator.shape[0])
+
+        for scaled, scaled_matrix in [
+            (-operator, -matrix),
+            (2.0 * operator, 2.0 * matrix),
+            (operator * 2.0, 2.0 * matrix),
+        ]:
+            assert isinstance(scaled, type(operator))
+            assert np.allclose(scaled.toarray(), scaled_matrix)
+            assert np.allclose(
+                scaled.solve(vector), np.linalg.solve(scaled_matrix, vector)
+            )
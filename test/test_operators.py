@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from pydykit import operators
+
+
+def get_quaternions(rng, nbr_quaternions=5):
+    quaternions = rng.normal(size=(nbr_quaternions, 4))
+    return quaternions / np.linalg.norm(quaternions, axis=-1, keepdims=True)
+
+
+class TestStackedOperators:
+    @pytest.mark.parametrize(
+        "operator, shape",
+        [
+            (operators.hat_map, (3, 3)),
+            (operators.spatial_transformation_matrix, (3, 4)),
+            (operators.convective_transformation_matrix, (3, 4)),
+            (operators.transf_matrix_sym, (3, 3)),
+            (operators.left_multiplation_matrix, (4, 4)),
+            (operators.right_multiplication_matrix, (4, 4)),
+        ],
+    )
+    def test_stack_matches_single_quaternions(self, operator, shape):
+        quaternions = get_quaternions(rng=np.random.default_rng(seed=0))
+
+        stacked = operator(quaternions)
+
+        assert stacked.shape == (len(quaternions),) + shape
+        for quaternion, matrix in zip(quaternions, stacked):
+            assert np.array_equal(operator(quaternion), matrix)
+
+    def test_single_quaternion_operators(self):
+        quaternion = np.array([1.0, 2.0, 3.0, 4.0])
+
+        assert np.array_equal(
+            operators.hat_map(quaternion),
+            np.array([[0.0, -4.0, 3.0], [4.0, 0.0, -2.0], [-3.0, 2.0, 0.0]]),
+        )
+        assert np.array_equal(
+            operators.convective_transformation_matrix(quaternion),
+            np.array(
+                [
+                    [-2.0, 1.0, 4.0, -3.0],
+                    [-3.0, -4.0, 1.0, 2.0],
+                    [-4.0, 3.0, -2.0, 1.0],
+                ]
+            ),
+        )
+
+
+class TestQuaternionProduct:
+    def test_product_matches_multiplication_matrices(self):
+        rng = np.random.default_rng(seed=1)
+        left, right = get_quaternions(rng), get_quaternions(rng)
+
+        product = operators.quaternion_product(left, right)
+
+        assert np.allclose(
+            product,
+            np.einsum("nij,nj->ni", operators.left_multiplation_matrix(left), right),
+        )
+        assert np.allclose(
+            product,
+            np.einsum("nij,nj->ni", operators.right_multiplication_matrix(right), left),
+        )
+
+    def test_quaternion_velocity(self):
+        rng = np.random.default_rng(seed=2)
+        positions = get_quaternions(rng)
+        angular_velocities = rng.normal(size=(len(positions), 3))
+
+        velocities = operators.quaternion_velocity(positions, angular_velocities)
+
+        for position, angular_velocity, velocity in zip(
+            positions, angular_velocities, velocities
+        ):
+            G_q = operators.convective_transformation_matrix(position)
+            assert np.allclose(velocity, 0.5 * G_q.T @ angular_velocity)
@@ -0,0 +1,81 @@
+import copy
+
+import numpy as np
+
+import pydykit.examples
+from pydykit.configuration import Configuration
+from pydykit.managers import Manager
+from pydykit.postprocessors import Postprocessor
+from pydykit.systems_port_hamiltonian import PortHamiltonianMBS
+
+example_manager = pydykit.examples.ExampleManager()
+
+quantities_and_evaluation_points = {
+    "hamiltonian": ["current_time", "interval_midpoint", "interval_increment"],
+    "costates": ["current_time"],
+    "dissipated_work": ["interval"],
+}
+
+
+def postprocess(manager, df, is_batched):
+    postprocessor = Postprocessor(manager, state_results_df=df.copy())
+    if not is_batched:
+        # Enforce evaluation one state after another
+        postprocessor.manager.system.supports_batched_states = False
+    postprocessor.postprocess(
+        quantities_and_evaluation_points=quantities_and_evaluation_points
+    )
+    return postprocessor.results_df
+
+
+class TestPostprocessor:
+    def test_batched_evaluation_matches_evaluation_per_state(self):
+        manager = Manager()
+        manager.configure(
+            configuration=Configuration(
+                **copy.deepcopy(example_manager.get_example(name="pendulum_2d"))
+            )
+        )
+        df = manager.manage().to_df()
+
+        batched = postprocess(manager=manager, df=df, is_batched=True)
+        per_state = postprocess(manager=manager, df=df, is_batched=False)
+
+        assert list(batched.columns) == list(per_state.columns)
+        assert "costates_current_time_1" in batched.columns
+        assert np.allclose(batched, per_state, equal_nan=True)
+        assert np.isnan(batched["hamiltonian_interval_increment"].iloc[-1])
+        assert np.allclose(
+            batched["hamiltonian_interval_increment"].iloc[:-1],
+            np.diff(batched["hamiltonian_current_time"]),
+        )
+
+    def test_port_hamiltonian_multibody_system(self):
+        manager = Manager()
+        manager.configure(
+            configuration=Configuration(
+                **copy.deepcopy(
+                    example_manager.get_example(
+                        name="four_particle_system_ph_discrete_gradient_dissipative"
+                    )
+                )
+            )
+        )
+        manager.system = PortHamiltonianMBS(manager=manager)
+        df = manager.manage().to_df()
+
+        postprocessor = Postprocessor(manager, state_results_df=df)
+        postprocessor.postprocess(
+            quantities_and_evaluation_points={
+                "hamiltonian": ["current_time", "interval_increment"],
+                "dissipated_work": ["interval"],
+            }
+        )
+        results_df = postprocessor.results_df
+
+        # Dissipated energy equals the decrease of the Hamiltonian
+        assert np.allclose(
+            results_df["hamiltonian_interval_increment"].iloc[:-1],
+            -results_df["dissipated_work_interval"].iloc[:-1],
+            atol=1e-6,
+        )
@@ -0,0 +1,82 @@
+import copy
+
+import numpy as np
+import pytest
+
+import pydykit.examples
+from pydykit.configuration import Configuration
+from pydykit.managers import Manager
+from pydykit.results import ResultReader
+from pydykit.utils import PydykitException
+
+example_manager = pydykit.examples.ExampleManager()
+
+
+def get_manager(name, result=None):
+    content_config_file = copy.deepcopy(example_manager.get_example(name=name))
+    if result is not None:
+        content_config_file["result"] = result
+    manager = Manager()
+    manager.configure(configuration=Configuration(**content_config_file))
+    return manager
+
+
+class TestStreamingResult:
+    def test_matches_in_memory_result(self, tmp_path):
+        path = tmp_path.joinpath("lorenz")
+        manager = get_manager(
+            name="lorenz",
+            result=dict(class_name="StreamingResult", path=str(path), buffer_size=16),
+        )
+        streamed = manager.manage().to_df()
+        in_memory = get_manager(name="lorenz").manage().to_df()
+
+        assert len(ResultReader(path=path).read_metadata()["chunks"]) == 13
+        assert np.array_equal(streamed, in_memory)
+
+    def test_lazy_slices(self, tmp_path):
+        path = tmp_path.joinpath("lorenz")
+        manager = get_manager(
+            name="lorenz",
+            result=dict(class_name="StreamingResult", path=str(path), buffer_size=16),
+        )
+        manager.manage()
+
+        df = ResultReader(path=path).to_df(columns=["z"], start_time=1.0, end_time=2.0)
+
+        assert list(df.columns) == ["z", "time"]
+        assert len(df) == 51
+        assert df["time"].iloc[0] == pytest.approx(1.0)
+        assert df["time"].iloc[-1] == pytest.approx(2.0)
+
+    def test_reader_sees_complete_chunks_during_run(self, tmp_path):
+        path = tmp_path.joinpath("lorenz")
+        manager = get_manager(
+            name="lorenz",
+            result=dict(class_name="StreamingResult", path=str(path), buffer_size=16),
+        )
+        result = manager.create_result()
+
+        for index in range(40):
+            result.store(index=index, time=0.1 * index, state=np.full(3, index))
+
+        df = ResultReader(path=path).to_df()
+        assert len(df) == 32
+        assert np.array_equal(df["x"], np.arange(32))
+
+    def test_ensemble_is_not_supported(self, tmp_path):
+        content_config_file = copy.deepcopy(example_manager.get_example(name="lorenz"))
+        content_config_file["simulator"] = dict(
+            class_name="Ensemble",
+            newton_epsilon=1e-7,
+            max_iterations=40,
+            parameters={"rho": [28.0, 10.0]},
+        )
+        content_config_file["result"] = dict(
+            class_name="StreamingResult", path=str(tmp_path)
+        )
+        manager = Manager()
+        manager.configure(configuration=Configuration(**content_config_file))
+
+        with pytest.raises(PydykitException):
+            manager.manage()
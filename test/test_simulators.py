@@ -0,0 +1,110 @@
+import copy
+
+import numpy as np
+import pytest
+
+import pydykit.examples
+from pydykit.configuration import Configuration
+from pydykit.managers import Manager
+from pydykit.utils import PydykitException
+
+example_manager = pydykit.examples.ExampleManager()
+
+
+def get_ensemble_configuration(name, **kwargs):
+    content_config_file = copy.deepcopy(example_manager.get_example(name=name))
+    simulator = content_config_file["simulator"]
+    content_config_file["simulator"] = dict(
+        class_name="Ensemble",
+        newton_epsilon=simulator["newton_epsilon"],
+        max_iterations=simulator["max_iterations"],
+        **kwargs,
+    )
+    return content_config_file
+
+
+def run_single(name, parameters):
+    content_config_file = copy.deepcopy(example_manager.get_example(name=name))
+    content_config_file["system"].update(parameters)
+    manager = Manager()
+    manager.configure(configuration=Configuration(**content_config_file))
+    return manager.manage().to_df()
+
+
+class TestEnsemble:
+    @pytest.mark.parametrize(
+        ("name", "parameters"),
+        (
+            pytest.param("lorenz", {"rho": [28.0, 10.0]}, id="lorenz"),
+            pytest.param(
+                "reactor",
+                {"constants": [[1.0, 1.0, 1.0, -100.0], [1.0, 2.0, 1.0, -100.0]]},
+                id="reactor",
+            ),
+            pytest.param("pendulum_2d", {"length": [1.0, 2.0]}, id="pendulum_2d"),
+        ),
+    )
+    def test_members_match_single_runs(self, name, parameters):
+        manager = Manager()
+        manager.configure(
+            configuration=Configuration(
+                **get_ensemble_configuration(name=name, parameters=parameters)
+            )
+        )
+        result = manager.manage()
+
+        assert not manager.simulator.solver.has_failed
+
+        for member in range(result.nbr_members):
+            single = run_single(
+                name=name,
+                parameters={key: values[member] for key, values in parameters.items()},
+            )
+            assert np.allclose(
+                result.member_to_df(member=member),
+                single,
+                rtol=1e-5,
+                atol=1e-5,
+            )
+
+    def test_initial_states(self):
+        initial_states = [[0.0, 1.0], [0.5, 0.0], [1.0, -1.0]]
+        manager = Manager()
+        manager.configure(
+            configuration=Configuration(
+                **get_ensemble_configuration(
+                    name="pendulum_2d",
+                    initial_states=initial_states,
+                )
+            )
+        )
+        df = manager.manage().to_df()
+
+        assert set(df["member"]) == {0, 1, 2}
+        assert np.allclose(
+            df.loc[df["time"] == 0.0, ["angle", "angular_velocity"]],
+            initial_states,
+        )
+
+    def test_inconsistent_number_of_members(self):
+        with pytest.raises(ValueError):
+            Configuration(
+                **get_ensemble_configuration(
+                    name="lorenz",
+                    initial_states=[[2.0, 1.0, 1.0]],
+                    parameters={"rho": [28.0, 10.0]},
+                )
+            )
+
+    def test_unsupported_system(self):
+        manager = Manager()
+        manager.configure(
+            configuration=Configuration(
+                **get_ensemble_configuration(
+                    name="pendulum_3d",
+                    parameters={"gravity": [[0.0, 0.0, -9.81]]},
+                )
+            )
+        )
+        with pytest.raises(PydykitException):
+            manager.manage()
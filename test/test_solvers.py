@@ -0,0 +1,123 @@
+import copy
+
+import numpy as np
+import pytest
+import scipy.sparse
+
+import pydykit.examples
+from pydykit.configuration import Configuration
+from pydykit.managers import Manager
+from pydykit.solvers import NewtonSchur
+
+from .constants import A_TOL, PATH_REFERENCE_RESULTS, R_TOL
+from .utils import load_result_of_pydykit_simulation
+
+example_manager = pydykit.examples.ExampleManager()
+
+worklist = [
+    "pendulum_3d",
+    "pendulum_2d",
+    "four_particle_system_midpoint",
+    "visco_pendulum",
+    "lorenz",
+]
+
+
+class TestNewtonFactorized:
+    @pytest.mark.parametrize("name", worklist)
+    def test_reproduces_reference_results(self, name):
+        content_config_file = copy.deepcopy(example_manager.get_example(name=name))
+        content_config_file["simulator"]["solver_name"] = "NewtonFactorized"
+        content_config_file["simulator"]["newton_epsilon"] = 1e-10
+
+        manager = Manager()
+        manager.configure(configuration=Configuration(**content_config_file))
+        new = manager.manage().to_df()
+
+        old = load_result_of_pydykit_simulation(
+            path=PATH_REFERENCE_RESULTS.joinpath(f"{name}.csv")
+        )
+
+        assert not manager.simulator.solver.has_failed
+        assert np.allclose(old, new, rtol=R_TOL, atol=A_TOL)
+
+    def test_reuses_factorization(self):
+        content_config_file = copy.deepcopy(
+            example_manager.get_example(name="four_particle_system_midpoint")
+        )
+        content_config_file["simulator"]["solver_name"] = "NewtonFactorized"
+        content_config_file["simulator"]["contraction_threshold"] = 0.5
+
+        manager = Manager()
+        manager.configure(configuration=Configuration(**content_config_file))
+        result = manager.manage()
+
+        assert manager.simulator.solver.nbr_factorizations < len(result.times) - 1
+
+    def test_contraction_threshold_requires_newton_factorized(self):
+        content_config_file = copy.deepcopy(
+            example_manager.get_example(name="pendulum_3d")
+        )
+        content_config_file["simulator"]["contraction_threshold"] = 0.5
+
+        with pytest.raises(ValueError):
+            Configuration(**content_config_file)
+
+
+class TestNewtonSchur:
+    @pytest.mark.parametrize(
+        "name",
+        [
+            "pendulum_3d",
+            "four_particle_system_midpoint",
+            "four_particle_system_discrete_gradient_dissipative",
+            "rigid_body_rotating_quaternion",
+        ],
+    )
+    def test_matches_newton_plain_python(self, name):
+        results = []
+        for solver_name in ["NewtonPlainPython", "NewtonSchur"]:
+            content_config_file = copy.deepcopy(example_manager.get_example(name=name))
+            content_config_file["simulator"]["solver_name"] = solver_name
+
+            manager = Manager()
+            manager.configure(configuration=Configuration(**content_config_file))
+            results.append(manager.manage().to_df())
+
+        assert not manager.simulator.solver.has_failed
+        assert manager.simulator.solver.block_sizes is not None
+        assert np.allclose(results[0], results[1], rtol=1e-8, atol=1e-8)
+
+    def test_linear_system_with_block_elimination(self):
+        rng = np.random.default_rng(seed=0)
+        nbr_dof, nbr_constraints = 6, 2
+        zeros = np.zeros
+        tangent = np.block(
+            [
+                [
+                    np.eye(nbr_dof),
+                    np.diag(rng.uniform(1.0, 2.0, nbr_dof)),
+                    zeros((nbr_dof, nbr_constraints)),
+                ],
+                [
+                    rng.normal(size=(nbr_dof, nbr_dof)),
+                    np.eye(nbr_dof),
+                    rng.normal(size=(nbr_dof, nbr_constraints)),
+                ],
+                [
+                    rng.normal(size=(nbr_constraints, nbr_dof)),
+                    zeros((nbr_constraints, nbr_dof)),
+                    zeros((nbr_constraints, nbr_constraints)),
+                ],
+            ]
+        )
+        rhs = rng.normal(size=2 * nbr_dof + nbr_constraints)
+
+        solver = NewtonSchur(newton_epsilon=1e-10, max_iterations=10)
+        solver.block_sizes = [nbr_dof, nbr_dof, nbr_constraints]
+
+        for matrix in [tangent, scipy.sparse.csr_array(tangent)]:
+            assert np.allclose(
+                solver.solve_linear_system(matrix, rhs),
+                np.linalg.solve(tangent, rhs),
+            )
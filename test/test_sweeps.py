@@ -0,0 +1,53 @@
+import copy
+
+import numpy as np
+
+import pydykit.examples
+from pydykit.configuration import Configuration
+from pydykit.managers import Manager
+from pydykit.sweeps import Sweep
+
+from .constants import PATH_CONFIG_FILES
+
+example_manager = pydykit.examples.ExampleManager()
+
+
+class TestSweep:
+    def test_grid_from_path(self):
+        sweep = Sweep.from_path(path=PATH_CONFIG_FILES.joinpath("lorenz_sweep.yml"))
+        result = sweep.run()
+
+        runs = result.runs
+        assert len(runs) == 4
+        assert runs["error"].isna().all()
+
+        df = result.to_df()
+        assert set(df.index.get_level_values("run")) == {0, 1, 2, 3}
+
+        # Runs are ordered like the cartesian product of the grid
+        assert runs.loc[1, "time_stepper.step_size"] == 0.01
+        assert len(df.loc[1]) == 51
+
+    def test_samples_match_single_runs_and_failures_are_captured(self):
+        content_config_file = copy.deepcopy(example_manager.get_example(name="reactor"))
+        constants = [1.0, 2.0, 1.0, -100.0]
+
+        sweep = Sweep(
+            configuration=Configuration(**content_config_file),
+            samples=[
+                {"system.constants": constants},
+                {"system.constants": [1.0, 2.0]},
+            ],
+            max_workers=2,
+        )
+        result = sweep.run()
+
+        assert result.errors.keys() == {1}
+        assert "ValidationError" in result.runs.loc[1, "error"]
+
+        content_config_file["system"]["constants"] = constants
+        manager = Manager()
+        manager.configure(configuration=Configuration(**content_config_file))
+        single = manager.manage().to_df()
+
+        assert np.allclose(result.to_df().loc[0], single)
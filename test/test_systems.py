@@ -0,0 +1,385 @@
+import copy
+
+import numpy as np
+import pytest
+import scipy.sparse
+from scipy.linalg import block_diag
+
+import pydykit.examples
+from pydykit import mass_operators
+from pydykit.configuration import Configuration
+from pydykit.managers import Manager
+from pydykit.systems_port_hamiltonian import PortHamiltonianMBS
+from pydykit.utils import get_numerical_tangent, to_dense
+
+example_manager = pydykit.examples.ExampleManager()
+
+
+def get_manager(name):
+    manager = Manager()
+    configuration = Configuration(**example_manager.get_example(name=name))
+    manager.configure(configuration=configuration)
+    return manager
+
+
+class TestSystemView:
+    def test_view_shares_everything_but_state(self):
+        manager = get_manager(name="four_particle_system_midpoint")
+        system = manager.system
+        state = system.state + 0.1
+
+        view = system.view(state=state)
+
+        assert view.state is state
+        assert system.state is not state
+        assert view.manager is system.manager
+        assert view.springs is system.springs
+
+    def test_view_evaluates_like_copy(self):
+        manager = get_manager(
+            name="four_particle_system_ph_discrete_gradient_dissipative"
+        )
+        manager.system = PortHamiltonianMBS(manager=manager)
+        state = manager.system.state + 0.1
+
+        view = manager.system.view(state=state)
+        copy = manager.system.copy(state=state)
+
+        assert view.mbs.state is state
+        assert manager.system.mbs.state is not state
+        assert np.allclose(view.hamiltonian(), copy.hamiltonian())
+        assert np.allclose(view.structure_matrix(), copy.structure_matrix())
+
+
+class TestParticleSystemAssembly:
+    def test_gradients_match_finite_differences(self):
+        manager = get_manager(name="four_particle_system_midpoint")
+        system = manager.system
+        rng = np.random.default_rng(seed=0)
+        state = system.state + 0.05 * rng.normal(size=system.state.shape)
+        system = system.view(state=state)
+
+        gradient = system.internal_potential_gradient()
+        hessian = system.internal_potential_hessian()
+
+        assert scipy.sparse.issparse(hessian)
+
+        def potential_gradient(next_state):
+            new_state = state.copy()
+            new_state[: system.nbr_dof] = next_state
+            return system.view(state=new_state).internal_potential_gradient()
+
+        numerical = get_numerical_tangent(
+            func=potential_gradient,
+            state=state[: system.nbr_dof].copy(),
+            incrementation_factor=1e-6,
+        )
+        assert np.allclose(hessian.toarray(), numerical, rtol=1e-6, atol=1e-6)
+        assert gradient.shape == (system.nbr_dof,)
+
+
+class TestPortHamiltonianMBSMatrices:
+    @pytest.mark.parametrize(
+        "name",
+        [
+            "four_particle_system_ph_discrete_gradient_dissipative",
+            "rigid_body_rotating_quaternion",
+            "multi_rigid_body_quaternions",
+        ],
+    )
+    def test_templates_match_block_assembly(self, name):
+        manager = get_manager(name=name)
+        manager.system = PortHamiltonianMBS(manager=manager)
+        mbs = manager.system.mbs
+        nbr_dof, nbr_constraints = mbs.nbr_dof, mbs.nbr_constraints
+
+        for shift in [0.0, 0.1]:
+            system = manager.system.view(state=manager.system.state + shift)
+            mass_matrix = to_dense(system.mbs.mass_matrix())
+            G = to_dense(system.mbs.constraint_gradient()).reshape(
+                nbr_constraints, nbr_dof
+            )
+            identity = np.eye(nbr_dof)
+            zeros = np.zeros((nbr_dof, nbr_dof))
+
+            assert np.array_equal(
+                system.structure_matrix(),
+                np.block(
+                    [
+                        [zeros, identity, np.zeros((nbr_dof, nbr_constraints))],
+                        [-identity, zeros, -G.T],
+                        [
+                            np.zeros((nbr_constraints, nbr_dof)),
+                            G,
+                            np.zeros((nbr_constraints, nbr_constraints)),
+                        ],
+                    ]
+                ),
+            )
+            assert np.array_equal(
+                system.descriptor_matrix(),
+                block_diag(
+                    identity, mass_matrix, np.zeros((nbr_constraints, nbr_constraints))
+                ),
+            )
+            assert np.array_equal(
+                system.nonsingular_descriptor_matrix(),
+                block_diag(identity, mass_matrix),
+            )
+            assert np.array_equal(
+                system.dissipation_matrix(),
+                block_diag(
+                    zeros,
+                    to_dense(system.mbs.dissipation_matrix()),
+                    np.zeros((nbr_constraints, nbr_constraints)),
+                ),
+            )
+
+    def test_templates_are_read_only(self):
+        manager = get_manager(
+            name="four_particle_system_ph_discrete_gradient_dissipative"
+        )
+        manager.system = PortHamiltonianMBS(manager=manager)
+
+        structure_matrix = manager.system.structure_matrix()
+        structure_matrix[0, 0] = 1.0
+
+        assert manager.system.structure_matrix()[0, 0] == 0.0
+        assert not manager.system.descriptor_matrix().flags.writeable
+
+    def test_constant_matrices_are_not_copied(self):
+        manager = get_manager(name="visco_pendulum")
+        manager.system = PortHamiltonianMBS(manager=manager)
+        system = manager.system
+        view = system.view(state=system.state + 0.1)
+
+        for name in ["structure_matrix", "dissipation_matrix", "descriptor_matrix"]:
+            matrix = getattr(system, name)()
+            assert getattr(view, name)() is matrix
+            assert not matrix.flags.writeable
+
+        nbr_dof = system.mbs.nbr_dof
+        assert np.array_equal(
+            system.dissipation_matrix()[nbr_dof : 2 * nbr_dof, nbr_dof : 2 * nbr_dof],
+            to_dense(system.mbs.dissipation_matrix()),
+        )
+
+    def test_state_dependent_dissipation_matrix(self):
+        manager = get_manager(
+            name="four_particle_system_ph_discrete_gradient_dissipative"
+        )
+        manager.system = PortHamiltonianMBS(manager=manager)
+        system = manager.system
+        rng = np.random.default_rng(seed=0)
+        view = system.view(state=system.state + rng.normal(size=system.state.shape))
+
+        assert not system.mbs.has_constant_dissipation_matrix
+        assert not np.array_equal(
+            system.dissipation_matrix(), view.dissipation_matrix()
+        )
+
+
+class TestDescriptorSolve:
+    def test_block_solve_matches_dense_solve(self):
+        manager = get_manager(
+            name="four_particle_system_ph_discrete_gradient_dissipative"
+        )
+        manager.system = PortHamiltonianMBS(manager=manager)
+        system = manager.system
+        rng = np.random.default_rng(seed=0)
+        rhs = rng.normal(size=(2 * system.mbs.nbr_dof, 3))
+
+        assert np.allclose(
+            system.solve_nonsingular_descriptor_transpose(rhs),
+            np.linalg.solve(system.nonsingular_descriptor_matrix().T, rhs),
+        )
+
+    def test_constant_descriptor_is_factorized_once(self):
+        manager = get_manager(name="pendulum_2d")
+        system = manager.system
+        rhs = np.ones((2, 1))
+
+        solution = system.solve_nonsingular_descriptor_transpose(rhs)
+        factorization = system.factorizations["nonsingular_descriptor_transpose"]
+        system.solve_nonsingular_descriptor_transpose(2 * rhs)
+
+        assert (
+            system.factorizations["nonsingular_descriptor_transpose"] is factorization
+        )
+        assert np.allclose(
+            solution,
+            np.linalg.solve(system.nonsingular_descriptor_matrix().T, rhs),
+        )
+
+
+class TestMultiRigidBodyQuaternions:
+    def get_system(self, seed=0):
+        system = get_manager(name="multi_rigid_body_quaternions").system
+        rng = np.random.default_rng(seed=seed)
+        state = system.state + 0.1 * rng.normal(size=system.state.shape)
+        return system.view(state=state)
+
+    def test_single_body_matches_rigid_body(self):
+        rigid_body = get_manager(name="rigid_body_rotating_quaternion").system
+        content = example_manager.get_example(name="multi_rigid_body_quaternions")
+        content = copy.deepcopy(content)
+        content["system"]["bodies"] = content["system"]["bodies"][:1]
+        content["system"]["bodies"][0]["inertias"] = rigid_body.inertias
+        content["system"]["joints"] = []
+        manager = Manager()
+        manager.configure(configuration=Configuration(**content))
+
+        state = rigid_body.state + np.array(
+            [0.1, 0.2, -0.1, 0.3, 1.0, 2.0, 3.0, 4.0, 0.5]
+        )
+        rigid_body = rigid_body.view(state=state)
+        system = manager.system.view(state=state)
+
+        for name in [
+            "mass_matrix",
+            "inverse_mass_matrix",
+            "constraint_gradient",
+        ]:
+            assert np.allclose(
+                to_dense(getattr(system, name)()),
+                getattr(rigid_body, name)(),
+            )
+        assert np.allclose(system.constraint(), rigid_body.constraint())
+        assert np.allclose(
+            to_dense(system.inverse_mass_matrix_derivative(vector=state[4:8])),
+            rigid_body.inverse_mass_matrix_derivative(vector=state[4:8]),
+        )
+
+    def test_derivatives_match_finite_differences(self):
+        system = self.get_system()
+        nbr_dof = system.nbr_dof
+        state = system.state
+        q, p = state[:nbr_dof], state[nbr_dof : 2 * nbr_dof]
+        multiplier = np.arange(1.0, system.nbr_constraints + 1.0)
+        vector = np.linspace(-1.0, 1.0, nbr_dof)
+
+        def evaluate(position=q, momentum=p):
+            new_state = state.copy()
+            new_state[:nbr_dof] = position
+            new_state[nbr_dof : 2 * nbr_dof] = momentum
+            return system.view(state=new_state)
+
+        def check(func, analytical, argument):
+            numerical = get_numerical_tangent(
+                func=lambda next_state: np.atleast_1d(func(next_state)),
+                state=argument.copy(),
+                incrementation_factor=1e-7,
+            )
+            assert np.allclose(to_dense(analytical), numerical, rtol=1e-5, atol=1e-5)
+
+        check(
+            lambda x: evaluate(position=x).kinetic_energy(),
+            system.kinetic_energy_gradient_from_momentum()[np.newaxis, :],
+            q,
+        )
+        check(
+            lambda x: evaluate(position=x).kinetic_energy_gradient_from_momentum(),
+            system.kinetic_energy_hessian_from_momentum(),
+            q,
+        )
+        check(
+            lambda x: evaluate(momentum=x).kinetic_energy_gradient_from_momentum(),
+            system.kinetic_energy_mixed_hessian_from_momentum(),
+            p,
+        )
+        check(
+            lambda x: evaluate(position=x).inverse_mass_matrix() @ vector,
+            system.inverse_mass_matrix_derivative(vector=vector),
+            q,
+        )
+        check(
+            lambda x: evaluate(position=x).constraint(),
+            system.constraint_gradient(),
+            q,
+        )
+        check(
+            lambda x: evaluate(position=x).constraint_gradient().T @ multiplier,
+            system.constraint_hessian(multiplier=multiplier),
+            q,
+        )
+        check(
+            lambda x: evaluate(position=x).constraint_gradient() @ vector,
+            system.constraint_gradient_derivative(vector=vector),
+            q,
+        )
+
+    def test_inverse_mass_matrix_on_unit_quaternions(self):
+        system = self.get_system()
+        quats = system.decompose_into_bodies(system.decompose_state()["position"])
+        quats = quats / np.linalg.norm(quats, axis=-1, keepdims=True)
+        state = system.state.copy()
+        state[: system.nbr_dof] = quats.ravel()
+        system = system.view(state=state)
+
+        assert isinstance(
+            system.mass_matrix(), mass_operators.BlockDiagonalMassOperator
+        )
+        assert np.allclose(
+            to_dense(system.mass_matrix() @ system.inverse_mass_matrix()),
+            np.eye(system.nbr_dof),
+        )
+
+    @pytest.mark.parametrize(
+        "integrator",
+        [
+            {"class_name": "MidpointMultibody"},
+            {
+                "class_name": "DiscreteGradientMultibody",
+                "discrete_gradient_type": "Gonzalez",
+                "increment_tolerance": 1e-12,
+            },
+        ],
+    )
+    def test_integrators_preserve_constraints_and_energy(self, integrator):
+        content = copy.deepcopy(
+            example_manager.get_example(name="multi_rigid_body_quaternions")
+        )
+        content["integrator"] = integrator
+        content["time_stepper"]["end"] = 0.2
+        manager = Manager()
+        manager.configure(configuration=Configuration(**content))
+        initial_energy = manager.system.total_energy()
+
+        manager.manage()
+
+        assert np.allclose(manager.system.constraint(), 0.0, atol=1e-8)
+        assert np.isclose(manager.system.total_energy(), initial_energy, rtol=1e-4)
+
+    @pytest.mark.parametrize(
+        "integrator",
+        [
+            {"class_name": "MidpointPH"},
+            {
+                "class_name": "DiscreteGradientPHDAE",
+                "discrete_gradient_type": "Gonzalez_decomposed",
+                "increment_tolerance": 1e-12,
+            },
+        ],
+    )
+    def test_port_hamiltonian_integrators(self, integrator):
+        content = copy.deepcopy(
+            example_manager.get_example(name="multi_rigid_body_quaternions")
+        )
+        content["integrator"] = integrator
+        content["time_stepper"]["end"] = 0.05
+        manager = Manager()
+        manager.configure(configuration=Configuration(**content))
+        manager.system = PortHamiltonianMBS(manager=manager)
+        system = manager.system
+        rhs = np.random.default_rng(0).normal(size=2 * system.mbs.nbr_dof)
+
+        assert np.allclose(
+            system.solve_nonsingular_descriptor_transpose(rhs),
+            np.linalg.solve(system.nonsingular_descriptor_matrix().T, rhs),
+        )
+
+        initial_hamiltonian = system.hamiltonian()
+        manager.manage()
+
+        assert np.allclose(manager.system.mbs.constraint(), 0.0, atol=1e-8)
+        assert np.isclose(manager.system.hamiltonian(), initial_hamiltonian, rtol=1e-4)
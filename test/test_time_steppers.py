@@ -0,0 +1,152 @@
+import copy
+
+import numpy as np
+import pytest
+
+import pydykit.examples
+from pydykit.configuration import Configuration
+from pydykit.managers import Manager
+from pydykit.postprocessors import Postprocessor
+from pydykit.utils import PydykitException
+
+example_manager = pydykit.examples.ExampleManager()
+
+
+def get_manager(name, **time_stepper):
+    content_config_file = copy.deepcopy(example_manager.get_example(name=name))
+    content_config_file["time_stepper"].update(time_stepper)
+    manager = Manager()
+    manager.configure(configuration=Configuration(**content_config_file))
+    return manager
+
+
+def get_adaptive_manager(name, tolerance, step_size=None, **adaptive):
+    time_stepper = copy.deepcopy(example_manager.get_example(name=name))["time_stepper"]
+    time_stepper.update(
+        class_name="AdaptiveIncrement",
+        absolute_tolerance=tolerance,
+        relative_tolerance=tolerance,
+        **adaptive,
+    )
+    if step_size is not None:
+        time_stepper["step_size"] = step_size
+    return get_manager(name=name, **time_stepper)
+
+
+class TestAdaptiveIncrement:
+    def test_fewer_steps_and_error_decreasing_with_tolerance(self):
+        reference = get_manager(name="reactor", step_size=1e-4).manage().to_df()
+        fixed = get_manager(name="reactor").manage().to_df()
+
+        errors = []
+        for tolerance in [1e-5, 1e-7]:
+            manager = get_adaptive_manager(name="reactor", tolerance=tolerance)
+            adaptive = manager.manage().to_df()
+
+            assert not manager.simulator.solver.has_failed
+            assert len(adaptive) < len(fixed)
+            assert adaptive["time"].iloc[-1] == 1.0
+            assert np.all(np.diff(adaptive["time"]) > 0.0)
+
+            errors.append(np.abs(adaptive.iloc[-1] - reference.iloc[-1]).max())
+
+        assert errors[1] < 0.1 * errors[0]
+
+    def test_rejected_steps_and_growing_result(self):
+        manager = get_adaptive_manager(name="lorenz", tolerance=1e-4, step_size=0.2)
+        time_stepper = manager.time_stepper
+
+        nbr_rejected = 0
+        accept_step = time_stepper.accept_step
+
+        def counting_accept_step(**kwargs):
+            nonlocal nbr_rejected
+            is_accepted = accept_step(**kwargs)
+            nbr_rejected += not is_accepted
+            return is_accepted
+
+        time_stepper.accept_step = counting_accept_step
+        result = manager.manage()
+        df = result.to_df()
+
+        assert nbr_rejected > 0
+        assert len(df) > time_stepper.nbr_time_points
+        assert np.isclose(df["time"].iloc[-1], 4.0)
+
+    def test_constrained_multibody_system(self):
+        reference = get_manager(name="pendulum_3d", step_size=1e-2).manage().to_df()
+        columns = [column for column in reference if column.startswith("position")]
+
+        errors = []
+        for tolerance in [1e-3, 1e-5]:
+            manager = get_adaptive_manager(name="pendulum_3d", tolerance=tolerance)
+            adaptive = manager.manage().to_df()
+
+            assert not manager.simulator.solver.has_failed
+            assert adaptive["time"].iloc[-1] == 1.3
+            assert np.allclose(manager.system.constraint(), 0.0, atol=1e-10)
+
+            errors.append(
+                np.abs(adaptive[columns].iloc[-1] - reference[columns].iloc[-1]).max()
+            )
+
+        assert errors[1] < 0.5 * errors[0]
+
+    def test_raises_at_minimal_step_size(self):
+        manager = get_adaptive_manager(
+            name="lorenz", tolerance=1e-4, step_size=0.2, min_step_size=0.2
+        )
+
+        with pytest.raises(PydykitException, match="minimal step size"):
+            manager.manage()
+
+    def test_postprocessing(self):
+        manager = get_adaptive_manager(name="pendulum_2d", tolerance=1e-4)
+        df = manager.manage().to_df()
+
+        postprocessor = Postprocessor(manager, state_results_df=df)
+        postprocessor.postprocess(
+            quantities_and_evaluation_points={
+                "hamiltonian": ["current_time", "interval_increment"]
+            }
+        )
+
+        assert np.allclose(
+            postprocessor.results_df["hamiltonian_current_time"],
+            postprocessor.results_df["hamiltonian_current_time"].iloc[0],
+            atol=1e-6,
+        )
+        assert (
+            np.isnan(postprocessor.results_df["hamiltonian_interval_increment"]).sum()
+            == 1
+        )
+
+
+class TestTimeGrid:
+    def test_fixed_increment_cursor(self):
+        manager = get_manager(name="pendulum_3d", class_name="FixedIncrement")
+        time_stepper = manager.time_stepper
+
+        steps = time_stepper.make_steps()
+        first = next(steps)
+        records = [(first.index, first.time, first.increment)]
+        for step in steps:
+            assert step is first
+            assert time_stepper.current_step is first
+            records.append((step.index, step.time, step.increment))
+
+        indices, times, increments = map(np.array, zip(*records))
+        assert np.array_equal(indices, np.arange(time_stepper.nbr_time_points))
+        assert np.array_equal(times, time_stepper.times)
+        assert np.allclose(increments, time_stepper.step_size)
+        assert not hasattr(first, "__dict__")
+
+    def test_hitting_end_increments(self):
+        time_stepper = get_manager(name="pendulum_3d").time_stepper
+
+        assert time_stepper.times[-1] == time_stepper.end
+        assert np.allclose(time_stepper.increments[1:], np.diff(time_stepper.times))
+        assert np.isclose(time_stepper.increments[0], time_stepper.step_size)
+        assert [step.time for step in time_stepper.make_steps()] == list(
+            time_stepper.times
+        )